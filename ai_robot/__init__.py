@@ -2,36 +2,134 @@
 AI机器人包
 
 此包包含了所有AI模型的实现，每个模型都有自己的独立实现文件。
+各提供方的处理器在首次使用时才导入（zhipuai、openai 等 SDK 导入耗时较长，不拖慢应用启动）。
 """
 
 import os
+import sys
 import logging
-from .base import BaseAIProcessor
-from .zhipu import ZhipuAIProcessor
-from .deepseek import DeepseekAIProcessor
+import importlib
+import threading
+from typing import Any, Dict, Optional
+from .base import BaseAIProcessor, request_throttle
+from .metrics import ai_metrics, ai_metrics_snapshot
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 延迟导入的处理器类及其所在模块（通过 ai_robot.ZhipuAIProcessor 等访问时导入）
+_LAZY_EXPORTS = {
+    'ZhipuAIProcessor': '.zhipu',
+    'DeepseekAIProcessor': '.deepseek',
+    'CompositeAIProcessor': '.composite',
+    'create_composite_processor': '.composite',
+    'StubAIProcessor': '.stub',
+}
+
+
+def __getattr__(name: str) -> Any:
+    """首次访问处理器类时导入对应模块"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 def create_ai_processor() -> BaseAIProcessor:
     """
     创建AI处理器实例
     
-    从环境变量 AI_TYPE 读取配置，可选值：'zhipu', 'deepseek'，默认为'zhipu'
+    从环境变量 AI_TYPE 读取配置，可选值：'zhipu', 'deepseek', 'composite', 'stub'，默认为'zhipu'。
+    每次调用都会创建新的客户端，应用内请使用 get_ai_processor 获取共享实例。
         
     Returns:
         BaseAIProcessor: AI处理器实例
     """
     ai_type = os.getenv('AI_TYPE', 'zhipu').lower().strip()
+    return _build_ai_processor(ai_type)
+
+
+def _build_ai_processor(ai_type: str) -> BaseAIProcessor:
+    """根据AI类型创建处理器"""
     logger.info("="*50)
     logger.info(f"正在初始化 AI 处理器...")
     logger.info(f"当前选择的 AI 模型: {ai_type}")
     logger.info("="*50)
     
     if ai_type == 'deepseek':
+        from .deepseek import DeepseekAIProcessor
         return DeepseekAIProcessor()
-    elif ai_type == 'zhipu':
-        return ZhipuAIProcessor()
-    else:
+    elif ai_type == 'stub':
+        from .stub import StubAIProcessor
+        return StubAIProcessor()
+    elif ai_type == 'composite':
+        from .composite import create_composite_processor
+        return create_composite_processor(get_ai_processor)
+
+    from .zhipu import ZhipuAIProcessor
+    if ai_type != 'zhipu':
         logger.warning(f"未知的 AI 类型: {ai_type}，将使用默认的智谱AI")
-        return ZhipuAIProcessor() 
\ No newline at end of file
+    return ZhipuAIProcessor()
+
+
+# 进程内共享的AI处理器（按AI类型缓存），复用SDK客户端及其HTTP连接池
+_processors: Dict[str, BaseAIProcessor] = {}
+# 组合处理器会在创建时获取其他处理器，因此使用可重入锁
+_processors_lock = threading.RLock()
+
+
+def get_ai_processor(ai_type: Optional[str] = None) -> BaseAIProcessor:
+    """
+    获取进程内共享的AI处理器，首次调用时创建
+
+    处理器及其客户端线程安全，可在多个请求和后台线程间复用。
+
+    Args:
+        ai_type: AI类型，不传时从环境变量 AI_TYPE 读取
+
+    Returns:
+        BaseAIProcessor: AI处理器实例
+    """
+    key = (ai_type or os.getenv('AI_TYPE', 'zhipu')).lower().strip()
+    processor = _processors.get(key)
+    if processor is None:
+        with _processors_lock:
+            processor = _processors.get(key)
+            if processor is None:
+                processor = _build_ai_processor(key)
+                _processors[key] = processor
+    return processor
+
+
+def get_composite_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    获取已创建的组合处理器的提供方统计（不会创建新的处理器）
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, Any]]]: AI类型到各提供方统计的映射
+    """
+    # 组合处理器模块未导入时不可能存在组合处理器
+    composite = sys.modules.get(f'{__name__}.composite')
+    if composite is None:
+        return {}
+    with _processors_lock:
+        processors = dict(_processors)
+    return {
+        key: processor.get_stats()
+        for key, processor in processors.items()
+        if isinstance(processor, composite.CompositeAIProcessor)
+    }
+
+
+def shutdown_ai_processors():
+    """关闭所有共享AI处理器的客户端连接，进程退出时调用"""
+    with _processors_lock:
+        processors = list(_processors.values())
+        _processors.clear()
+    for processor in processors:
+        processor.close()
+    if processors:
+        logger.info(f"已关闭 {len(processors)} 个AI处理器")
+
@@ -8,118 +8,300 @@ import os
 import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Callable, List, Tuple, Optional
 import re
+import threading
+import time
 import requests
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from urllib.parse import quote
-from jsonschema import validate, ValidationError
+from .rule_parser import RuleBasedParser
+from .stream_parser import JsonObjectDetector
+from .metrics import ai_metrics, classify_error
+from .prompts import DEFAULT_PROMPT_VERSION, estimate_messages_tokens, estimate_tokens, get_prompt, token_usage
+from .symbol_master import A_SHARE_PATTERN, get_symbol_master
+
+
+# 当前调用链的AI接口请求限流器（由 request_throttle 设置，None 表示不限流）
+_request_throttle: ContextVar[Optional[Any]] = ContextVar('ai_request_throttle', default=None)
+
+
+@contextmanager
+def request_throttle(throttle):
+    """
+    在上下文内限制AI接口请求：每次请求模型（包括重试和组合处理器同时调用的各提供方）前占用一次 throttle
+
+    Args:
+        throttle: 支持 with 语句的限流器（如 ProviderThrottle），为 None 时不限流
+    """
+    token = _request_throttle.set(throttle)
+    try:
+        yield
+    finally:
+        _request_throttle.reset(token)
+
+
+def _compile_schema(schema: Dict[str, Any]):
+    """
+    检查 Schema 并构建验证器
+
+    Args:
+        schema: JSON Schema
+
+    Returns:
+        验证器实例，可重复用于验证
+    """
+    # jsonschema 导入较慢，在首次验证时才导入
+    from jsonschema.validators import validator_for
+
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+class _SchemaValidator:
+    """按类的 schema 构建验证器的描述符，首次访问时构建并缓存到该类上，之后直接读取类属性"""
+
+    def __get__(self, instance, owner):
+        validator = _compile_schema(owner.schema)
+        owner.schema_validator = validator
+        return validator
+
 
 class BaseAIProcessor(ABC):
     """AI处理器基类"""
+    # AI提供方名称和模型名称，由子类覆盖
+    provider_name = 'base'
+    model_name = ''
+    # 默认提示词版本（见 prompts.PROMPTS），修改提示词或 schema 时应新增版本，使旧的解析缓存失效
+    prompt_version = DEFAULT_PROMPT_VERSION
+    # 单次解析的最大尝试次数（含首次调用）
+    max_retries = 3
+    
+    # 重试用尽和调用被取消时返回的错误信息
+    FAILURE_MESSAGE = "AI 服务暂时无法正确解析策略，请稍后重试或提供更详细的信息"
+    CANCELLED_MESSAGE = "AI 调用已取消"
+    
+    # 解析结果的 JSON Schema
+    schema = {
+        "type": "object",
+        "properties": {
+            "error": {"type": "string"},
+            "stock_name": {"type": "string"},
+            "stock_code": {
+                "type": "string",
+                "pattern": "^\\d{4,6}$"  # 支持4-6位数字
+            },
+            "action": {
+                "type": ["string", "null"],
+                "enum": ["buy", "sell", "add", "trim", "hold", None]
+            },
+            "position_ratio": {
+                "type": ["number", "null"],
+                "minimum": 0,
+                "maximum": 100
+            },
+            "price_min": {"type": ["number", "null"]},
+            "price_max": {"type": ["number", "null"]},
+            "take_profit_price": {"type": ["number", "null"]},
+            "stop_loss_price": {"type": ["number", "null"]},
+            "other_conditions": {"type": ["string", "null"]},
+            "reason": {"type": ["string", "null"]}
+        },
+        "oneOf": [
+            {
+                "required": ["error"]
+            },
+            {
+                "required": ["stock_name", "stock_code"]
+            }
+        ],
+        "additionalProperties": False
+    }
+    # 检查并构建一次的 Schema 验证器，避免每次验证都重新构建（首次使用时构建）
+    schema_validator = _SchemaValidator()
+    
+    # 策略文本中的 "（000001）" 形式股票代码
+    STOCK_CODE_PATTERN = re.compile(r'[（(](\d{6})[)）]')
+    # AI响应中的 JSON 对象
+    JSON_OBJECT_PATTERN = re.compile(r'\{[^{]*\}', re.DOTALL)
+    # JSON 中的行注释和块注释
+    LINE_COMMENT_PATTERN = re.compile(r'//.*?\n')
+    BLOCK_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+    
     def __init__(self):
-        # 配置日志记录
-        logging.basicConfig(level=logging.INFO)
+        # 日志由应用入口统一配置，这里只获取记录器
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # 系统提示词
-        self.system_prompt = """你是一个专业的股票交易策略分析助手。你的任务是分析用户输入的策略文本，并提取关键信息。
-
-第一步：判断用户输入是否包含以下要素中的至少两个：
-1. 股票名称或股票代码
-2. 交易相关信息（如价格区间、仓位、止盈止损等）
-3. 交易理由或分析（如技术面、基本面分析等）
-
-如果用户输入与股票交易完全无关（比如谈论天气、生活等），请直接返回：
-{
-    "error": "与股票交易无关，暂不处理"
-}
-
-第二步：分析交易动作
-1. 如果文本中明确提到"买入"、"建仓"、"做多"等，设置 action 为 "buy"
-2. 如果文本中明确提到"卖出"、"清仓"、"做空"等，设置 action 为 "sell"
-3. 如果文本中明确提到"加仓"，设置 action 为 "add"
-4. 如果文本中明确提到"减仓"，设置 action 为 "trim"
-5. 如果文本中明确提到"持有"、"持仓待涨"、"观望"等，设置 action 为 "hold"
-6. 如果没有明确提到交易动作，根据以下规则判断：
-   - 如果提到"看好"、"上涨"、"突破"等积极词汇，设置为 "buy"
-   - 如果提到"看空"、"下跌"、"跌破"等消极词汇，设置为 "sell"
-   - 如果实在无法判断，默认设置为 "buy"
-
-第三步：分析仓位比例
-1. 如果文本中明确提到仓位比例（如"30%仓位"、"0.3仓"等），直接使用该数值
-2. 如果文本中提到"轻仓"、"小仓"，设置为 20（表示20%）
-3. 如果文本中提到"半仓"，设置为 50（表示50%）
-4. 如果文本中提到"重仓"、"满仓"，设置为 80（表示80%）
-5. 如果文本中提到"空仓"、“清仓”、“了结”，设置为 100（表示100%）
-6. 如果没有提到仓位信息：
-   - 对于买入操作，默认设置为 10（10%仓位）
-   - 对于卖出操作，默认设置为 50（50%仓位）
-   - 对于加仓操作，默认设置为 10（10%仓位）
-   - 对于减仓操作，默认设置为 30（30%仓位）
-   - 对于持有操作，仓位比例不适用，设置为 0
-
-第四步：将用户输入转换为以下格式的JSON数据：
-
-{
-    "stock_name": "股票名称（字符串）",
-    "stock_code": "股票代码（A股6位数字，港股4-5位数字）",
-    "action": "buy/sell/add/trim/hold（字符串）",
-    "position_ratio": 10,  # 整数，表示百分比，范围0-100
-    "price_min": 10.5,
-    "price_max": 11.0,
-    "take_profit_price": 12.0,
-    "stop_loss_price": 9.5,
-    "other_conditions": "其他交易条件（字符串）",
-    "reason": "操作理由（字符串）"
-}
-
-注意：
-1. position_ratio 字段必须返回，且必须是 0-100 之间的整数，表示百分比。
-2. 对于 trim 操作，需要提醒用户系统会使用特殊的计算方式：减仓交易量 = 当前持股量 × (减仓比例 ÷ 原始买入仓位比例)。
-3. 对于 hold 操作，position_ratio 设置为 0。"""
-
-        # 定义 JSON Schema
-        self.schema = {
-            "type": "object",
-            "properties": {
-                "error": {"type": "string"},
-                "stock_name": {"type": "string"},
-                "stock_code": {
-                    "type": "string",
-                    "pattern": "^\\d{4,6}$"  # 支持4-6位数字
-                },
-                "action": {
-                    "type": ["string", "null"],
-                    "enum": ["buy", "sell", "add", "trim", "hold", None]
-                },
-                "position_ratio": {
-                    "type": ["number", "null"],
-                    "minimum": 0,
-                    "maximum": 100
-                },
-                "price_min": {"type": ["number", "null"]},
-                "price_max": {"type": ["number", "null"]},
-                "take_profit_price": {"type": ["number", "null"]},
-                "stop_loss_price": {"type": ["number", "null"]},
-                "other_conditions": {"type": ["string", "null"]},
-                "reason": {"type": ["string", "null"]}
-            },
-            "oneOf": [
-                {
-                    "required": ["error"]
-                },
-                {
-                    "required": ["stock_name", "stock_code"]
-                }
-            ],
-            "additionalProperties": False
-        }
+        # 是否使用流式输出（检测到完整 JSON 后提前结束读取）
+        self.stream = os.getenv('AI_STREAM', 'false').lower() == 'true'
+        
+        # 结构化文本规则解析器（命中时无需调用 AI）
+        self.rule_parser = RuleBasedParser()
+        
+        # 系统提示词（按版本从提示词注册表获取，可通过 AI_PROMPT_VERSION 切换）
+        self.prompt = get_prompt(os.getenv('AI_PROMPT_VERSION') or self.prompt_version)
+        self.prompt_version = self.prompt.version
+        self.system_prompt = self.prompt.system_prompt
+
+    @abstractmethod
+    def call_ai_api(self, user_input: str, retry_count: int = 0,
+                    cancel_event: Optional[threading.Event] = None,
+                    max_retries: Optional[int] = None,
+                    on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        调用 AI API 并处理响应
+        
+        Args:
+            user_input: 用户输入的策略文本
+            retry_count: 已尝试次数
+            cancel_event: 取消信号，置位后不再发起新的尝试
+            max_retries: 最大尝试次数，不传时使用类属性 max_retries
+            on_progress: 流式输出时的进度回调，参数为本次尝试已收到的全部文本
+            
+        Returns:
+            Dict[str, Any]: 解析结果，失败时 error 为 FAILURE_MESSAGE，取消时为 CANCELLED_MESSAGE
+        """
+        pass
+
+    @classmethod
+    def is_failure(cls, result: Optional[Dict[str, Any]]) -> bool:
+        """
+        判断结果是否为调用失败（区别于模型返回的"与股票交易无关"等业务错误）
+        
+        Args:
+            result: call_ai_api 的返回结果
+            
+        Returns:
+            bool: 是否为重试用尽或已取消
+        """
+        return not result or result.get('error') in (cls.FAILURE_MESSAGE, cls.CANCELLED_MESSAGE)
 
     @abstractmethod
-    def call_ai_api(self, user_input: str, retry_count: int = 0) -> Dict[str, Any]:
-        """调用 AI API 并处理响应"""
+    def create_completion(self, messages: List[Dict[str, str]], stream: bool):
+        """
+        调用聊天补全接口，由子类按各自SDK的参数实现
+        
+        Args:
+            messages: 对话消息
+            stream: 是否流式输出
+            
+        Returns:
+            SDK 返回的响应对象或流
+        """
         pass
 
+    def build_messages(self, user_input: str, attempt: int = 0) -> List[Dict[str, str]]:
+        """
+        构建对话消息
+        
+        Args:
+            user_input: 用户输入的策略文本
+            attempt: 已尝试次数，大于 0 时追加当前提示词版本的重试提示
+            
+        Returns:
+            List[Dict[str, str]]: 对话消息
+        """
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_input}
+        ]
+        if attempt > 0:
+            ai_metrics.increment(self.provider_id, 'retries')
+            messages.append({"role": "user", "content": self.prompt.retry_hint.format(attempt=attempt + 1)})
+        return messages
+
+    def _record_usage(self, messages: List[Dict[str, str]], content: str, usage=None):
+        """记录本次调用的 token 消耗，接口未返回用量时按文本估算"""
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            prompt_tokens = estimate_messages_tokens(messages)
+            completion_tokens = estimate_tokens(content)
+        token_usage.record(self.provider_id, self.prompt_version, prompt_tokens, completion_tokens, estimated)
+
+    def request_completion(self, messages: List[Dict[str, str]],
+                           on_progress: Optional[Callable[[str], None]] = None) -> str:
+        """
+        获取模型回复文本
+        
+        流式模式下逐段读取输出，检测到第一个完整 JSON 对象后立即关闭流，
+        后续的说明文字不再等待。在 request_throttle 上下文中调用时，请求前先占用限流器。
+        
+        Args:
+            messages: 对话消息
+            on_progress: 进度回调，参数为已收到的全部文本
+            
+        Returns:
+            str: 模型回复文本
+        """
+        with _request_throttle.get() or nullcontext():
+            start = time.perf_counter()
+            try:
+                content = self._read_completion(messages, on_progress)
+            except Exception as e:
+                ai_metrics.observe_request(self.provider_id, time.perf_counter() - start, classify_error(e))
+                raise
+            ai_metrics.observe_request(self.provider_id, time.perf_counter() - start)
+        return content
+
+    def _read_completion(self, messages: List[Dict[str, str]],
+                         on_progress: Optional[Callable[[str], None]] = None) -> str:
+        """调用接口并读取回复文本（流式或非流式）"""
+        if not self.stream:
+            response = self.create_completion(messages, stream=False)
+            content = response.choices[0].message.content.strip()
+            self._record_usage(messages, content, getattr(response, 'usage', None))
+            return content
+
+        stream = self.create_completion(messages, stream=True)
+        detector = JsonObjectDetector()
+        content = ''
+        usage = None
+        try:
+            for chunk in stream:
+                # 部分接口在最后一个片段中返回用量
+                usage = getattr(chunk, 'usage', None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                if on_progress is not None:
+                    on_progress(content)
+                if detector.feed(delta):
+                    self.logger.info(f"流式输出已包含完整JSON，提前结束读取（已接收 {len(content)} 字符）")
+                    break
+        finally:
+            self._close_stream(stream)
+        self._record_usage(messages, content, usage)
+        return content.strip()
+
+    @staticmethod
+    def _close_stream(stream):
+        """关闭流式响应，释放连接"""
+        if hasattr(stream, 'close'):
+            stream.close()
+        elif hasattr(stream, 'response'):
+            stream.response.close()
+
+    def close(self):
+        """关闭AI客户端，释放HTTP连接池"""
+        client = getattr(self, 'client', None)
+        if client is not None and hasattr(client, 'close'):
+            try:
+                client.close()
+            except Exception as e:
+                self.logger.warning(f"关闭AI客户端失败: {str(e)}")
+
+    @property
+    def provider_id(self) -> str:
+        """AI提供方标识（提供方:模型），用于缓存键和统计"""
+        return f"{self.provider_name}:{self.model_name}" if self.model_name else self.provider_name
+
     def get_stock_info(self, keyword: str) -> Optional[Tuple[str, str]]:
         """
         查询股票信息
@@ -133,14 +315,31 @@ class BaseAIProcessor(ABC):
         if not keyword.strip():
             return None
 
+        # 优先查询本地代码表
+        symbol_master = get_symbol_master()
+        symbol_master.reload_if_changed()
+        stock_info = symbol_master.lookup(keyword)
+        if stock_info:
+            self.logger.info(f"本地代码表命中: {keyword} -> {stock_info}")
+            return stock_info
+
         try:
             api_url = f"https://suggest3.sinajs.cn/suggest/type=&key={quote(keyword)}"
             response = requests.get(api_url, timeout=5)
             response.raise_for_status()
-            return self._parse_stock_info(response.text)
+            stock_info = self._parse_stock_info(response.text)
+            if stock_info:
+                # 远程查询结果加入内存索引，后续查询无需再请求接口
+                symbol_master.add(*stock_info)
+                return stock_info
         except requests.RequestException as e:
             self.logger.error(f"股票信息查询失败: {str(e)}")
-            return None
+
+        # 远程接口未命中时，本地代码表中唯一的前缀匹配作为兜底
+        stock_info = symbol_master.lookup_prefix(keyword)
+        if stock_info:
+            self.logger.info(f"本地代码表前缀匹配: {keyword} -> {stock_info}")
+        return stock_info
 
     def _parse_stock_info(self, response: str) -> Optional[Tuple[str, str]]:
         """
@@ -174,7 +373,7 @@ class BaseAIProcessor(ABC):
                         continue
                         
                     # 判断是否为 A 股（以 00/60/30/68 开头的6位数字）
-                    if re.match(r'^(00|60|30|68)\d{4}$', stock_code):
+                    if A_SHARE_PATTERN.match(stock_code):
                         if not a_share:  # 记录第一个找到的 A 股
                             a_share = (stock_code, stock_name)
                     elif not other_share:  # 记录第一个找到的其他股票
@@ -200,6 +399,9 @@ class BaseAIProcessor(ABC):
 
     def validate_json_schema(self, data: Dict[str, Any]) -> bool:
         """验证JSON数据是否符合预定义的模式"""
+        from jsonschema import ValidationError
+        from jsonschema.exceptions import best_match
+
         try:
             # 如果缺少股票代码但有股票名称，尝试查询补充
             if data.get('stock_code') is None and data.get('stock_name'):
@@ -215,25 +417,70 @@ class BaseAIProcessor(ABC):
                     data['stock_name'] = stock_info[1]
                     self.logger.info(f"自动补充股票名称: {data['stock_name']}")
 
-            # 验证JSON Schema
-            validate(instance=data, schema=self.schema)
+            # 验证JSON Schema（与 jsonschema.validate 一样报告最相关的错误）
+            error = best_match(self.schema_validator.iter_errors(data))
+            if error is not None:
+                raise error
             return True
             
         except ValidationError as e:
+            ai_metrics.increment(self.provider_id, 'validation_failures')
             self.logger.error(f"Schema验证失败: {str(e)}\n\n{e.absolute_path}\n\nOn instance:\n{e.instance}")
             return False
         except Exception as e:
             self.logger.error(f"验证过程发生错误: {str(e)}")
             return False
 
-    def process_strategy(self, user_input: str) -> Dict[str, Any]:
-        """处理用户输入的策略文本"""
+    def parse_by_rules(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        使用规则解析结构化策略文本
+        
+        Args:
+            user_input: 用户输入的策略文本
+            
+        Returns:
+            Optional[Dict[str, Any]]: 解析成功且通过 Schema 验证时返回结果，否则返回 None
+        """
+        try:
+            result = self.rule_parser.parse(user_input)
+        except ValueError as e:
+            self.logger.warning(f"规则解析失败，将调用AI: {str(e)}")
+            return None
+        
+        if result is None or not self.validate_json_schema(result):
+            return None
+        
+        ai_metrics.increment(self.provider_id, 'rule_hits')
+        self.logger.info(f"规则解析命中，跳过AI调用: {result['stock_name']}({result['stock_code']}) {result['action']}")
+        return result
+
+    def process_strategy(self, user_input: str, use_rules: bool = True,
+                         on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        处理用户输入的策略文本
+        
+        Args:
+            user_input: 用户输入的策略文本
+            use_rules: 是否先尝试规则解析，结构化文本命中时不调用 AI
+            on_progress: 流式输出时的进度回调
+            
+        Returns:
+            Dict[str, Any]: 解析结果
+        """
         try:
             self.logger.info("="*50)
             self.logger.info(f"用户输入: {user_input}")
             
-            # 调用 AI API 并获取结果
-            result = self.call_ai_api(user_input)
+            # 结构化文本优先走规则解析
+            result = self.parse_by_rules(user_input) if use_rules else None
+            if result is not None:
+                self.logger.info("="*50)
+                return result
+            
+            # 调用 AI API 并获取结果（含全部重试的耗时计入解析延迟）
+            start = time.perf_counter()
+            result = self.call_ai_api(user_input, on_progress=on_progress)
+            ai_metrics.observe_parse(self.provider_id, time.perf_counter() - start, not self.is_failure(result))
             
             self.logger.info("处理结果: 策略解析成功")
             self.logger.info(f"{json.dumps(result, ensure_ascii=False, indent=2)}")
@@ -248,20 +495,20 @@ class BaseAIProcessor(ABC):
 
     def extract_stock_code(self, text: str) -> str:
         """从文本中提取股票代码"""
-        pattern = r'[（(](\d{6})[)）]'
-        match = re.search(pattern, text)
+        match = self.STOCK_CODE_PATTERN.search(text)
         return match.group(1) if match else None
 
     def clean_json_content(self, content: str) -> Dict[str, Any]:
         """清理并解析JSON内容"""
-        json_match = re.search(r'\{[^{]*\}', content, re.DOTALL)
+        json_match = self.JSON_OBJECT_PATTERN.search(content)
         if not json_match:
+            ai_metrics.increment(self.provider_id, 'invalid_responses')
             self.logger.error("未找到有效的 JSON 数据")
             raise ValueError("未找到有效的 JSON 数据")
         
         content = json_match.group()
-        content = re.sub(r'//.*?\n', '\n', content)
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+        content = self.LINE_COMMENT_PATTERN.sub('\n', content)
+        content = self.BLOCK_COMMENT_PATTERN.sub('', content)
         content = '\n'.join(line.strip() for line in content.splitlines() if line.strip())
         
         self.logger.info(f"清理后的JSON:\n{content}")
@@ -286,5 +533,6 @@ class BaseAIProcessor(ABC):
             self.logger.info(f"JSON解析成功:\n{json.dumps(result, ensure_ascii=False, indent=2)}")
             return result
         except json.JSONDecodeError as e:
+            ai_metrics.increment(self.provider_id, 'invalid_responses')
             self.logger.error(f"JSON 解析失败: {str(e)}")
             raise 
\ No newline at end of file
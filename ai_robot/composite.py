@@ -0,0 +1,341 @@
+"""
+组合AI处理器模块
+
+此模块将多个AI提供方组合为一个处理器，支持两种调度方式：
+- race：同时调用多个提供方，采用第一个通过 Schema 验证的结果
+- failover：按各提供方的历史延迟和错误率排序依次调用，超时或失败时切换到下一个
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .base import BaseAIProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """单个AI提供方的调用统计（指数移动平均），用于 failover 排序和熔断"""
+
+    # 指数移动平均的平滑系数
+    ALPHA = 0.2
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60):
+        """
+        初始化统计
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断持续时间（秒），期间排在其他提供方之后
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.calls = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, success: bool, latency: float):
+        """
+        记录一次调用结果
+
+        Args:
+            success: 是否成功
+            latency: 调用耗时（秒）
+        """
+        with self._lock:
+            self.calls += 1
+            self.latency = latency if self.latency is None else (
+                self.ALPHA * latency + (1 - self.ALPHA) * self.latency
+            )
+            self.error_rate = (1 - self.ALPHA) * self.error_rate + (0 if success else self.ALPHA)
+            if success:
+                self.consecutive_failures = 0
+                self.open_until = 0.0
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold:
+                    self.open_until = time.monotonic() + self.cooldown
+
+    def record_cancelled(self):
+        """记录一次被取消的调用（不计入错误率）"""
+        with self._lock:
+            self.cancelled += 1
+
+    @property
+    def available(self) -> bool:
+        """是否未处于熔断状态"""
+        return time.monotonic() >= self.open_until
+
+    def sort_key(self) -> Tuple[bool, float, float]:
+        """排序键：未熔断优先，其次错误率低、延迟低（未调用过的视为延迟 0，优先试探）"""
+        return (not self.available, round(self.error_rate, 2), self.latency or 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """将统计转换为字典"""
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'cancelled': self.cancelled,
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'available': self.available
+        }
+
+
+class _ProviderCall:
+    """一次提供方调用的取消信号和截止时间（截止时间从调用实际开始执行时计算）"""
+
+    def __init__(self, timeout: float):
+        """
+        初始化调用状态
+
+        Args:
+            timeout: 调用开始执行后的等待时间（秒）
+        """
+        self.timeout = timeout
+        self.cancel_event = threading.Event()
+        self.started_at: Optional[float] = None
+
+    def start(self) -> bool:
+        """
+        标记调用开始执行
+
+        Returns:
+            bool: 排队期间未被取消时为 True
+        """
+        if self.cancel_event.is_set():
+            return False
+        self.started_at = time.monotonic()
+        return True
+
+    def remaining(self) -> float:
+        """距截止时间的秒数，尚未开始执行时为 timeout"""
+        if self.started_at is None:
+            return self.timeout
+        return self.started_at + self.timeout - time.monotonic()
+
+    def expired(self) -> bool:
+        """是否已开始执行且超过等待时间"""
+        return self.started_at is not None and self.remaining() <= 0
+
+
+class CompositeAIProcessor(BaseAIProcessor):
+    """组合AI处理器"""
+    provider_name = 'composite'
+
+    def __init__(self, providers: List[BaseAIProcessor], mode: str = 'failover',
+                 race_width: int = 2, timeout: float = 60, cancel_losers: bool = True,
+                 provider_retries: int = 1):
+        """
+        初始化组合处理器
+
+        Args:
+            providers: 参与调度的AI处理器，顺序即初始优先级
+            mode: 调度方式，race 或 failover
+            race_width: race 模式下同时调用的提供方数量上限（成本上限）
+            timeout: 单个提供方的等待时间（秒），超时后切换到下一个
+            cancel_losers: race 模式下得到结果后是否取消其他提供方的后续重试
+            provider_retries: 每个提供方的最大尝试次数，避免多个提供方的重试叠加
+        """
+        super().__init__()
+        if not providers:
+            raise ValueError("组合AI处理器至少需要一个提供方")
+        self.providers = providers
+        self.mode = mode if mode in ('race', 'failover') else 'failover'
+        self.race_width = max(1, min(race_width, len(providers)))
+        self.timeout = timeout
+        self.cancel_losers = cancel_losers
+        self.provider_retries = max(1, provider_retries)
+        self.stats: Dict[str, ProviderStats] = {p.provider_id: ProviderStats() for p in providers}
+        self.model_name = '+'.join(p.provider_id for p in providers)
+        # 超时和被取消的调用仍会在后台运行到当前请求结束，线程数按提供方数量预留；
+        # 并发请求较多时调用会在线程池中排队，排队时间不计入提供方的超时和统计
+        self._executor = ThreadPoolExecutor(max_workers=len(providers) * 4,
+                                            thread_name_prefix='ai-composite')
+
+    def close(self):
+        """关闭调度线程池（各提供方的客户端由处理器注册表统一关闭）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各提供方的调用统计
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 提供方标识到统计信息的映射
+        """
+        return {provider_id: stats.to_dict() for provider_id, stats in self.stats.items()}
+
+    def ranked_providers(self) -> List[BaseAIProcessor]:
+        """按历史统计排序的提供方列表"""
+        return sorted(self.providers, key=lambda p: self.stats[p.provider_id].sort_key())
+
+    def create_completion(self, messages: List[Dict[str, str]], stream: bool):
+        """组合处理器不直接请求模型，由 call_ai_api 调度各提供方"""
+        raise TypeError(f"{self.__class__.__name__} 不直接调用聊天补全接口，请通过 call_ai_api 调度各提供方")
+
+    def call_ai_api(self, user_input: str, retry_count: int = 0,
+                    cancel_event: Optional[threading.Event] = None,
+                    max_retries: Optional[int] = None,
+                    on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """按调度方式调用各提供方（race 模式多个提供方同时输出，不转发流式进度）"""
+        providers = self.ranked_providers()
+        if self.mode == 'race':
+            return self._race(providers, user_input, cancel_event)
+        return self._failover(providers, user_input, cancel_event, on_progress)
+
+    def _call_provider(self, provider: BaseAIProcessor, user_input: str,
+                       call: '_ProviderCall',
+                       on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """调用单个提供方并记录统计（在线程池中排队期间已被取消的调用不再执行）"""
+        stats = self.stats[provider.provider_id]
+        if not call.start():
+            stats.record_cancelled()
+            return {'error': self.CANCELLED_MESSAGE}
+
+        try:
+            result = provider.call_ai_api(user_input, cancel_event=call.cancel_event,
+                                          max_retries=self.provider_retries, on_progress=on_progress)
+        except Exception as e:
+            logger.error(f"{provider.provider_id} 调用异常: {str(e)}")
+            result = {'error': self.FAILURE_MESSAGE}
+
+        # 超时或竞速落败后才返回的调用已在调度时处理，不再重复计入统计
+        if call.cancel_event.is_set() or result.get('error') == self.CANCELLED_MESSAGE:
+            stats.record_cancelled()
+        else:
+            stats.record(not self.is_failure(result), time.monotonic() - call.started_at)
+        return result
+
+    def _race(self, providers: List[BaseAIProcessor], user_input: str,
+              cancel_event: Optional[threading.Event]) -> Dict[str, Any]:
+        """同时调用前 race_width 个提供方，失败或超时时补充后备提供方"""
+        pending: Dict[Any, Tuple[BaseAIProcessor, _ProviderCall]] = {}
+        queue = list(providers)
+
+        def cancel_all():
+            for _, call in pending.values():
+                call.cancel_event.set()
+
+        def launch():
+            provider = queue.pop(0)
+            call = _ProviderCall(self.timeout)
+            logger.info(f"竞速调用: {provider.provider_id}")
+            # 在调用方的上下文中执行，使 request_throttle 等上下文设置对各提供方同样生效
+            future = self._executor.submit(contextvars.copy_context().run,
+                                           self._call_provider, provider, user_input, call)
+            pending[future] = (provider, call)
+
+        while queue and len(pending) < self.race_width:
+            launch()
+
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                cancel_all()
+                return {'error': self.CANCELLED_MESSAGE}
+
+            # 尚未开始执行的调用没有截止时间，每秒检查一次
+            next_wait = min(call.remaining() for _, call in pending.values())
+            done, _ = wait(pending, timeout=max(0, min(next_wait, 1)), return_when=FIRST_COMPLETED)
+            for future in done:
+                provider, _ = pending.pop(future)
+                result = future.result()
+                if not self.is_failure(result):
+                    logger.info(f"竞速结果采用 {provider.provider_id}")
+                    if self.cancel_losers:
+                        cancel_all()
+                    return result
+                logger.warning(f"{provider.provider_id} 解析失败")
+
+            # 超时的调用不再等待，停止其后续重试，进行中的请求在后台结束
+            for future, (provider, call) in list(pending.items()):
+                if call.expired() and not future.done():
+                    del pending[future]
+                    call.cancel_event.set()
+                    self.stats[provider.provider_id].record(False, self.timeout)
+                    logger.warning(f"{provider.provider_id} 超过 {self.timeout} 秒未返回")
+
+            # 补充后备提供方，同时进行的调用数不超过 race_width
+            while queue and len(pending) < self.race_width:
+                launch()
+
+        logger.error("所有AI提供方均未返回有效结果")
+        return {'error': self.FAILURE_MESSAGE}
+
+    def _failover(self, providers: List[BaseAIProcessor], user_input: str,
+                  cancel_event: Optional[threading.Event],
+                  on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """按排序依次调用提供方，超时或失败时切换到下一个"""
+        for provider in providers:
+            if cancel_event is not None and cancel_event.is_set():
+                return {'error': self.CANCELLED_MESSAGE}
+
+            call = _ProviderCall(self.timeout)
+            future = self._executor.submit(contextvars.copy_context().run,
+                                           self._call_provider, provider, user_input, call, on_progress)
+            # 等待时间从调用实际开始执行时计算，在线程池中排队的时间不计入
+            while not future.done() and not call.expired():
+                wait([future], timeout=max(0, min(call.remaining(), 1)))
+            if not future.done():
+                # 超时：停止该提供方的后续重试，进行中的请求在后台结束
+                call.cancel_event.set()
+                self.stats[provider.provider_id].record(False, self.timeout)
+                logger.warning(f"{provider.provider_id} 超过 {self.timeout} 秒未返回，切换到下一个提供方")
+                continue
+
+            result = future.result()
+            if not self.is_failure(result):
+                return result
+            logger.warning(f"{provider.provider_id} 解析失败，切换到下一个提供方")
+
+        logger.error("所有AI提供方均未返回有效结果")
+        return {'error': self.FAILURE_MESSAGE}
+
+
+def create_composite_processor(get_processor) -> CompositeAIProcessor:
+    """
+    根据环境变量创建组合处理器
+
+    环境变量:
+        AI_COMPOSITE_PROVIDERS: 参与调度的AI类型，逗号分隔，默认 zhipu,deepseek
+        AI_COMPOSITE_MODE: 调度方式 race/failover，默认 failover
+        AI_COMPOSITE_RACE_WIDTH: race 模式同时调用的提供方数量上限，默认 2
+        AI_COMPOSITE_TIMEOUT: 单个提供方的等待时间（秒），默认 60
+        AI_COMPOSITE_CANCEL_LOSERS: race 模式得到结果后是否取消其他提供方，默认 true
+        AI_COMPOSITE_PROVIDER_RETRIES: 每个提供方的最大尝试次数，默认 1
+
+    Args:
+        get_processor: 按AI类型获取处理器的函数（复用共享的提供方实例）
+
+    Returns:
+        CompositeAIProcessor: 组合处理器
+    """
+    names = [name.strip() for name in os.getenv('AI_COMPOSITE_PROVIDERS', 'zhipu,deepseek').split(',')
+             if name.strip() and name.strip() != 'composite']
+    providers = []
+    for name in names:
+        try:
+            providers.append(get_processor(name))
+        except ValueError as e:
+            # 缺少 API Key 的提供方不参与调度
+            logger.warning(f"AI提供方 {name} 初始化失败，已跳过: {str(e)}")
+
+    return CompositeAIProcessor(
+        providers,
+        mode=os.getenv('AI_COMPOSITE_MODE', 'failover').lower().strip(),
+        race_width=int(os.getenv('AI_COMPOSITE_RACE_WIDTH', '2')),
+        timeout=float(os.getenv('AI_COMPOSITE_TIMEOUT', '60')),
+        cancel_losers=os.getenv('AI_COMPOSITE_CANCEL_LOSERS', 'true').lower() == 'true',
+        provider_retries=int(os.getenv('AI_COMPOSITE_PROVIDER_RETRIES', '1'))
+    )
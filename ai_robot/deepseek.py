@@ -5,7 +5,8 @@ DeepSeek AI处理器模块
 """
 
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Callable, List, Optional
 import httpx
 from openai import OpenAI, APITimeoutError, APIError
 import json
@@ -13,6 +14,9 @@ from .base import BaseAIProcessor
 
 class DeepseekAIProcessor(BaseAIProcessor):
     """DeepSeek AI处理器"""
+    provider_name = 'deepseek'
+    model_name = 'deepseek-chat'
+    
     def __init__(self):
         super().__init__()
         self.api_key = os.getenv('DEEPSEEK_API_KEY')
@@ -45,37 +49,37 @@ class DeepseekAIProcessor(BaseAIProcessor):
             http_client=http_client
         )
 
-    def call_ai_api(self, user_input: str, retry_count: int = 0) -> Dict[str, Any]:
+    def create_completion(self, messages: List[Dict[str, str]], stream: bool):
+        """调用DeepSeek聊天补全接口"""
+        return self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            stream=stream,
+            temperature=0.1  # 降低随机性
+        )
+
+    def call_ai_api(self, user_input: str, retry_count: int = 0,
+                    cancel_event: Optional[threading.Event] = None,
+                    max_retries: Optional[int] = None,
+                    on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """调用DeepSeek API并处理响应"""
-        max_retries = 3
+        max_retries = max_retries or self.max_retries
         current_retry = retry_count
         
         while current_retry < max_retries:
+            # 已被取消（如竞速时其他提供方先返回）时不再发起新的尝试
+            if cancel_event is not None and cancel_event.is_set():
+                self.logger.info("AI 调用已取消")
+                return {"error": self.CANCELLED_MESSAGE}
+            
             try:
-                # 构建请求消息
-                messages = [
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_input}
-                ]
-                
-                # 如果是重试，添加额外提示
-                if current_retry > 0:
-                    messages.append({
-                        "role": "user",
-                        "content": f"请严格按照示例格式返回 JSON 数据，确保返回股票代码。这是第 {current_retry + 1} 次尝试。"
-                    })
+                # 构建请求消息（重试时追加当前提示词版本的重试提示）
+                messages = self.build_messages(user_input, current_retry)
                 
                 # 调用DeepSeek API
                 self.logger.info(f"调用DeepSeek AI (第 {current_retry + 1} 次尝试)")
-                response = self.client.chat.completions.create(
-                    model="deepseek-chat",
-                    messages=messages,
-                    stream=False,
-                    temperature=0.1  # 降低随机性
-                )
-                
-                # 获取返回的文本内容
-                content = response.choices[0].message.content.strip()
+                # 获取返回的文本内容（流式模式下检测到完整 JSON 即停止读取）
+                content = self.request_completion(messages, on_progress)
                 self.logger.info(f"AI响应原始内容:\n{content}")
                 
                 # 清理和验证JSON
@@ -103,5 +107,5 @@ class DeepseekAIProcessor(BaseAIProcessor):
                 
         # 如果达到最大重试次数，返回错误信息
         return {
-            "error": "AI 服务暂时无法正确解析策略，请稍后重试或提供更详细的信息"
+            "error": self.FAILURE_MESSAGE
         } 
\ No newline at end of file
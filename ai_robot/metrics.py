@@ -0,0 +1,185 @@
+"""
+AI调用指标模块
+
+此模块按AI提供方记录结构化指标：调用延迟直方图、重试、Schema 验证失败、超时与接口错误、
+规则解析与缓存命中等，token 消耗取自 prompts.token_usage，供应用的指标接口输出
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .prompts import token_usage
+
+# 延迟直方图的桶上限（秒），与 Prometheus 默认桶的量级一致并覆盖大模型的长尾
+LATENCY_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# 计数器名称及含义
+COUNTERS: Dict[str, str] = {
+    'requests': '接口请求次数（每次尝试计一次）',
+    'retries': '重试次数',
+    'parses': 'AI解析次数',
+    'parse_failures': '重试用尽仍未得到有效结果的解析次数',
+    'validation_failures': 'Schema 验证失败次数',
+    'invalid_responses': '响应中没有可解析 JSON 的次数',
+    'timeouts': '接口超时次数',
+    'api_errors': '其他接口错误次数',
+    'rule_hits': '规则解析命中次数（未调用AI）',
+    'cache_hits': '解析缓存命中次数',
+    'cache_misses': '解析缓存未命中次数',
+}
+
+
+class Histogram:
+    """累积桶直方图"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """初始化直方图"""
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """记录一个观测值（调用方需持有锁）"""
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，buckets 为累积计数"""
+        return {
+            'buckets': [{'le': bound, 'count': count} for bound, count in zip(self.buckets, self.counts)],
+            'sum': round(self.sum, 6),
+            'count': self.count,
+            'avg': round(self.sum / self.count, 6) if self.count else None
+        }
+
+
+class AIMetrics:
+    """AI调用指标（按提供方分组，线程安全）"""
+
+    def __init__(self):
+        """初始化指标"""
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._request_latency: Dict[str, Histogram] = {}
+        self._parse_latency: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _provider_counters(self, provider: str) -> Dict[str, int]:
+        """获取提供方的计数器（调用方需持有锁）"""
+        counters = self._counters.get(provider)
+        if counters is None:
+            counters = self._counters[provider] = dict.fromkeys(COUNTERS, 0)
+            self._request_latency[provider] = Histogram()
+            self._parse_latency[provider] = Histogram()
+        return counters
+
+    def increment(self, provider: str, name: str, amount: int = 1):
+        """
+        计数器加一
+
+        Args:
+            provider: AI提供方标识
+            name: 计数器名称（见 COUNTERS）
+            amount: 增加量
+        """
+        with self._lock:
+            self._provider_counters(provider)[name] += amount
+
+    def observe_request(self, provider: str, seconds: float, error: Optional[str] = None):
+        """
+        记录一次接口请求
+
+        Args:
+            provider: AI提供方标识
+            seconds: 请求耗时（秒）
+            error: 失败类型 timeouts 或 api_errors，成功时为 None
+        """
+        with self._lock:
+            counters = self._provider_counters(provider)
+            counters['requests'] += 1
+            if error:
+                counters[error] += 1
+            self._request_latency[provider].observe(seconds)
+
+    def observe_parse(self, provider: str, seconds: float, success: bool):
+        """
+        记录一次AI解析（含全部重试）
+
+        Args:
+            provider: AI提供方标识
+            seconds: 解析耗时（秒）
+            success: 是否得到有效结果
+        """
+        with self._lock:
+            counters = self._provider_counters(provider)
+            counters['parses'] += 1
+            if not success:
+                counters['parse_failures'] += 1
+            self._parse_latency[provider].observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取全部指标
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 提供方标识到指标的映射，包含计数器、延迟直方图和 token 消耗
+        """
+        with self._lock:
+            result = {
+                provider: {
+                    'counters': dict(counters),
+                    'request_latency_seconds': self._request_latency[provider].to_dict(),
+                    'parse_latency_seconds': self._parse_latency[provider].to_dict(),
+                    'tokens': []
+                }
+                for provider, counters in self._counters.items()
+            }
+
+        for usage in token_usage.snapshot():
+            provider = result.setdefault(usage['provider'], {
+                'counters': dict.fromkeys(COUNTERS, 0),
+                'request_latency_seconds': Histogram().to_dict(),
+                'parse_latency_seconds': Histogram().to_dict(),
+                'tokens': []
+            })
+            provider['tokens'].append({key: value for key, value in usage.items() if key != 'provider'})
+        return result
+
+    def reset(self):
+        """清空指标"""
+        with self._lock:
+            self._counters.clear()
+            self._request_latency.clear()
+            self._parse_latency.clear()
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    区分超时和其他接口错误
+
+    各SDK的超时异常（openai.APITimeoutError、httpx.TimeoutException、zhipuai 的超时等）
+    类名中都包含 Timeout。
+
+    Args:
+        error: 异常
+
+    Returns:
+        str: timeouts 或 api_errors
+    """
+    if isinstance(error, TimeoutError) or any('Timeout' in cls.__name__ for cls in type(error).__mro__):
+        return 'timeouts'
+    return 'api_errors'
+
+
+def ai_metrics_snapshot() -> List[Dict[str, Any]]:
+    """以列表形式返回各提供方的指标，便于接口输出"""
+    return [dict(metrics, provider=provider) for provider, metrics in sorted(ai_metrics.snapshot().items())]
+
+
+# 进程内共享的AI调用指标
+ai_metrics = AIMetrics()
@@ -0,0 +1,202 @@
+"""
+提示词管理模块
+
+此模块集中维护带版本号的系统提示词，并统计各提示词版本的输入/输出 token 消耗，
+便于在不同版本之间比较解析效果、延迟和调用成本
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class PromptVersion(NamedTuple):
+    """提示词版本"""
+    version: str
+    system_prompt: str
+    # 重试时追加的提示，{attempt} 为当前尝试次数
+    retry_hint: str
+    description: str
+
+
+# 原始提示词：分步骤说明规则，示例 JSON 带注释
+PROMPT_V1 = PromptVersion(
+    version='v1',
+    system_prompt="""你是一个专业的股票交易策略分析助手。你的任务是分析用户输入的策略文本，并提取关键信息。
+
+第一步：判断用户输入是否包含以下要素中的至少两个：
+1. 股票名称或股票代码
+2. 交易相关信息（如价格区间、仓位、止盈止损等）
+3. 交易理由或分析（如技术面、基本面分析等）
+
+如果用户输入与股票交易完全无关（比如谈论天气、生活等），请直接返回：
+{
+    "error": "与股票交易无关，暂不处理"
+}
+
+第二步：分析交易动作
+1. 如果文本中明确提到"买入"、"建仓"、"做多"等，设置 action 为 "buy"
+2. 如果文本中明确提到"卖出"、"清仓"、"做空"等，设置 action 为 "sell"
+3. 如果文本中明确提到"加仓"，设置 action 为 "add"
+4. 如果文本中明确提到"减仓"，设置 action 为 "trim"
+5. 如果文本中明确提到"持有"、"持仓待涨"、"观望"等，设置 action 为 "hold"
+6. 如果没有明确提到交易动作，根据以下规则判断：
+   - 如果提到"看好"、"上涨"、"突破"等积极词汇，设置为 "buy"
+   - 如果提到"看空"、"下跌"、"跌破"等消极词汇，设置为 "sell"
+   - 如果实在无法判断，默认设置为 "buy"
+
+第三步：分析仓位比例
+1. 如果文本中明确提到仓位比例（如"30%仓位"、"0.3仓"等），直接使用该数值
+2. 如果文本中提到"轻仓"、"小仓"，设置为 20（表示20%）
+3. 如果文本中提到"半仓"，设置为 50（表示50%）
+4. 如果文本中提到"重仓"、"满仓"，设置为 80（表示80%）
+5. 如果文本中提到"空仓"、“清仓”、“了结”，设置为 100（表示100%）
+6. 如果没有提到仓位信息：
+   - 对于买入操作，默认设置为 10（10%仓位）
+   - 对于卖出操作，默认设置为 50（50%仓位）
+   - 对于加仓操作，默认设置为 10（10%仓位）
+   - 对于减仓操作，默认设置为 30（30%仓位）
+   - 对于持有操作，仓位比例不适用，设置为 0
+
+第四步：将用户输入转换为以下格式的JSON数据：
+
+{
+    "stock_name": "股票名称（字符串）",
+    "stock_code": "股票代码（A股6位数字，港股4-5位数字）",
+    "action": "buy/sell/add/trim/hold（字符串）",
+    "position_ratio": 10,  # 整数，表示百分比，范围0-100
+    "price_min": 10.5,
+    "price_max": 11.0,
+    "take_profit_price": 12.0,
+    "stop_loss_price": 9.5,
+    "other_conditions": "其他交易条件（字符串）",
+    "reason": "操作理由（字符串）"
+}
+
+注意：
+1. position_ratio 字段必须返回，且必须是 0-100 之间的整数，表示百分比。
+2. 对于 trim 操作，需要提醒用户系统会使用特殊的计算方式：减仓交易量 = 当前持股量 × (减仓比例 ÷ 原始买入仓位比例)。
+3. 对于 hold 操作，position_ratio 设置为 0。""",
+    retry_hint="请严格按照示例格式返回 JSON 数据，确保返回股票代码。这是第 {attempt} 次尝试。",
+    description='分步骤完整提示词'
+)
+
+# 精简提示词：规则与 v1 一致，去掉示例和冗余说明，约为 v1 的三分之一
+PROMPT_V2 = PromptVersion(
+    version='v2',
+    system_prompt="""从股票交易策略文本中提取交易信息，只输出一个JSON对象，不要注释或解释。
+与股票交易无关时输出：{"error": "与股票交易无关，暂不处理"}
+字段：stock_name，stock_code（A股6位、港股4-5位数字），action，position_ratio（0-100整数），price_min，price_max，take_profit_price，stop_loss_price（数字或null），other_conditions，reason（字符串或null）。
+action：买入/建仓/做多=buy；卖出/清仓/做空=sell；加仓=add；减仓=trim；持有/持仓待涨/观望=hold；未明确时看好/上涨/突破=buy，看空/下跌/跌破=sell，仍无法判断=buy。
+position_ratio：有明确比例时直接使用（0.3仓=30）；轻仓/小仓20，半仓50，重仓/满仓80，空仓/清仓/了结100；未提及时buy=10，sell=50，add=10，trim=30，hold=0。""",
+    retry_hint="上次输出无效。只输出符合字段要求的JSON对象，必须包含stock_code。",
+    description='精简提示词'
+)
+
+PROMPTS: Dict[str, PromptVersion] = {prompt.version: prompt for prompt in (PROMPT_V1, PROMPT_V2)}
+DEFAULT_PROMPT_VERSION = 'v1'
+
+# 中日韩文字及全角标点，按每字约 1 个 token 估算
+CJK_PATTERN = re.compile(r'[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]')
+
+
+def get_prompt(version: Optional[str] = None) -> PromptVersion:
+    """
+    获取指定版本的提示词
+
+    Args:
+        version: 提示词版本，不传时使用默认版本
+
+    Returns:
+        PromptVersion: 提示词
+
+    Raises:
+        ValueError: 版本不存在时抛出
+    """
+    version = version or DEFAULT_PROMPT_VERSION
+    if version not in PROMPTS:
+        raise ValueError(f"未知的提示词版本: {version}，可选值: {', '.join(PROMPTS)}")
+    return PROMPTS[version]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数（中文每字约 1 个，其余字符每 4 个约 1 个）
+
+    只用于接口未返回用量（如流式输出提前结束）时的估算。
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 估算的 token 数
+    """
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """估算对话消息的输入 token 数（每条消息另加 4 个格式开销）"""
+    return sum(estimate_tokens(message['content']) + 4 for message in messages)
+
+
+class TokenUsageTracker:
+    """按AI提供方和提示词版本累计 token 消耗"""
+
+    def __init__(self):
+        """初始化统计"""
+        self._usage: Dict[tuple, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, version: str, prompt_tokens: int, completion_tokens: int,
+               estimated: bool = False):
+        """
+        记录一次接口调用的 token 消耗
+
+        Args:
+            provider: AI提供方标识
+            version: 提示词版本
+            prompt_tokens: 输入 token 数
+            completion_tokens: 输出 token 数
+            estimated: 是否为估算值
+        """
+        with self._lock:
+            usage = self._usage.setdefault((provider, version), {
+                'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'estimated_requests': 0
+            })
+            usage['requests'] += 1
+            usage['prompt_tokens'] += prompt_tokens
+            usage['completion_tokens'] += completion_tokens
+            if estimated:
+                usage['estimated_requests'] += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        获取累计统计
+
+        Returns:
+            List[Dict[str, Any]]: 每个提供方/提示词版本的请求数、token 总数和平均值
+        """
+        with self._lock:
+            items = [(key, dict(usage)) for key, usage in self._usage.items()]
+        result = []
+        for (provider, version), usage in sorted(items):
+            requests = usage['requests'] or 1
+            result.append(dict(
+                usage,
+                provider=provider,
+                prompt_version=version,
+                avg_prompt_tokens=round(usage['prompt_tokens'] / requests, 1),
+                avg_completion_tokens=round(usage['completion_tokens'] / requests, 1)
+            ))
+        return result
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._usage.clear()
+
+
+# 进程内共享的 token 统计
+token_usage = TokenUsageTracker()
@@ -0,0 +1,165 @@
+"""
+规则解析器模块
+
+此模块提供结构化策略文本（Markdown 模板格式）的确定性解析，
+能完整识别时直接生成与 BaseAIProcessor.schema 一致的结果，无需调用 AI
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class RuleBasedParser:
+    """结构化策略文本规则解析器"""
+
+    # 股票名称段落：### 股票名称 下一行的 "名称（代码）"
+    STOCK_PATTERN = re.compile(
+        r'#{2,4}\s*股票名称\s*\n+\s*([^\n（(]+?)\s*[（(]\s*(\d{4,6})\s*[)）]'
+    )
+    # 字段行："- **字段**：值"
+    FIELD_PATTERN = re.compile(r'\*\*\s*(操作要求|交易价格|建议数量|止损价格|止盈价格)\s*\*\*\s*[：:]\s*([^\n]+)')
+    # 价格区间：12.5-13.2元、12.5~13.2元、12.5至13.2元
+    PRICE_RANGE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:-|－|~|～|至|到)\s*(\d+(?:\.\d+)?)')
+    # 单个价格
+    PRICE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+    # 仓位百分比：20%仓位
+    PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*[%％]')
+    # 操作理由段落
+    REASON_SECTION_PATTERN = re.compile(r'\*\*\s*操作理由\s*\*\*\s*\n((?:[ \t]*[-*][^\n]*\n?)+)')
+    # 列表项
+    BULLET_PATTERN = re.compile(r'^[ \t]*[-*]\s*(.+?)\s*$', re.MULTILINE)
+
+    # 操作要求到 action 的映射（与系统提示词第二步一致）
+    ACTION_KEYWORDS: Tuple[Tuple[str, str], ...] = (
+        ('加仓', 'add'),
+        ('减仓', 'trim'),
+        ('清仓', 'sell'),
+        ('卖出', 'sell'),
+        ('买入', 'buy'),
+        ('建仓', 'buy'),
+        ('持有', 'hold'),
+        ('观望', 'hold'),
+    )
+
+    # 仓位描述词（与系统提示词第三步一致）
+    POSITION_KEYWORDS: Tuple[Tuple[str, int], ...] = (
+        ('轻仓', 20),
+        ('小仓', 20),
+        ('半仓', 50),
+        ('重仓', 80),
+        ('满仓', 80),
+        ('空仓', 100),
+        ('清仓', 100),
+        ('了结', 100),
+    )
+
+    # 未给出仓位时的默认值（与系统提示词第三步一致）
+    DEFAULT_POSITION_RATIO = {'buy': 10, 'sell': 50, 'add': 10, 'trim': 30, 'hold': 0}
+
+    def parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        解析结构化策略文本
+
+        Args:
+            text: 策略文本
+
+        Returns:
+            Optional[Dict[str, Any]]: 识别出全部必填字段时返回解析结果，否则返回 None
+        """
+        if not text or '股票名称' not in text or '操作要求' not in text:
+            return None
+        # 一段文本包含多只股票时交给 AI 处理
+        if text.count('股票名称') > 1:
+            return None
+
+        stock_match = self.STOCK_PATTERN.search(text)
+        if not stock_match:
+            return None
+
+        fields = self._extract_fields(text)
+        action = self._parse_action(fields.get('操作要求'))
+        if action is None:
+            return None
+
+        price_min, price_max = self._parse_price_range(fields.get('交易价格'))
+        position_ratio = self._parse_position_ratio(fields.get('建议数量'), action, fields.get('操作要求'))
+        if position_ratio is None:
+            return None
+
+        reasons = self._extract_reasons(text)
+        return {
+            'stock_name': stock_match.group(1).strip(),
+            'stock_code': stock_match.group(2),
+            'action': action,
+            'position_ratio': position_ratio,
+            'price_min': price_min,
+            'price_max': price_max,
+            'take_profit_price': self._parse_price(fields.get('止盈价格')),
+            'stop_loss_price': self._parse_price(fields.get('止损价格')),
+            'other_conditions': None,
+            'reason': '；'.join(reasons) if reasons else None
+        }
+
+    def _extract_fields(self, text: str) -> Dict[str, str]:
+        """提取 "**字段**：值" 形式的字段，同名字段只取第一个"""
+        fields: Dict[str, str] = {}
+        for name, value in self.FIELD_PATTERN.findall(text):
+            fields.setdefault(name, value.strip())
+        return fields
+
+    def _parse_action(self, value: Optional[str]) -> Optional[str]:
+        """解析操作要求"""
+        if not value:
+            return None
+        for keyword, action in self.ACTION_KEYWORDS:
+            if keyword in value:
+                return action
+        return None
+
+    def _parse_price_range(self, value: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+        """解析交易价格区间，单个价格时上下限相同"""
+        if not value:
+            return None, None
+        match = self.PRICE_RANGE_PATTERN.search(value)
+        if match:
+            low, high = float(match.group(1)), float(match.group(2))
+            return min(low, high), max(low, high)
+        price = self._parse_price(value)
+        return price, price
+
+    def _parse_price(self, value: Optional[str]) -> Optional[float]:
+        """解析单个价格"""
+        if not value:
+            return None
+        match = self.PRICE_PATTERN.search(value)
+        return float(match.group(1)) if match else None
+
+    def _parse_position_ratio(self, value: Optional[str], action: str,
+                              action_text: Optional[str] = None) -> Optional[float]:
+        """解析建议仓位，未给出时按操作要求中的仓位描述词（如清仓为 100）或默认值，无法识别时返回 None"""
+        if action == 'hold':
+            return 0
+        if not value:
+            for keyword, ratio in self.POSITION_KEYWORDS:
+                if action_text and keyword in action_text:
+                    return ratio
+            return self.DEFAULT_POSITION_RATIO[action]
+
+        match = self.PERCENT_PATTERN.search(value)
+        if match:
+            ratio = float(match.group(1))
+            if 0 <= ratio <= 100:
+                return int(ratio) if ratio.is_integer() else ratio
+            return None
+
+        for keyword, ratio in self.POSITION_KEYWORDS:
+            if keyword in value:
+                return ratio
+        return None
+
+    def _extract_reasons(self, text: str) -> List[str]:
+        """提取操作理由列表"""
+        match = self.REASON_SECTION_PATTERN.search(text)
+        if not match:
+            return []
+        return [item for item in self.BULLET_PATTERN.findall(match.group(1)) if item]
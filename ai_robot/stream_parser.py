@@ -0,0 +1,79 @@
+"""
+流式响应解析模块
+
+此模块逐段扫描AI的流式输出，检测第一个完整的 JSON 对象何时输出完毕，
+使调用方可以提前结束流式读取，不必等待模型输出后续的说明文字
+"""
+
+
+class JsonObjectDetector:
+    """增量检测完整 JSON 对象（跳过字符串内容和 // 、/* */ 注释中的括号）"""
+
+    __slots__ = ('depth', 'started', 'complete', '_in_string', '_escape', '_comment', '_prev')
+
+    def __init__(self):
+        """初始化扫描状态"""
+        self.depth = 0
+        self.started = False
+        self.complete = False
+        self._in_string = False
+        self._escape = False
+        self._comment = None  # None、'line' 或 'block'
+        self._prev = ''
+
+    def feed(self, text: str) -> bool:
+        """
+        输入一段流式文本
+
+        Args:
+            text: 新收到的文本片段
+
+        Returns:
+            bool: 第一个 JSON 对象是否已经完整
+        """
+        if self.complete:
+            return True
+
+        for char in text:
+            prev, self._prev = self._prev, char
+
+            if self._comment == 'line':
+                if char == '\n':
+                    self._comment = None
+                continue
+            if self._comment == 'block':
+                if prev == '*' and char == '/':
+                    self._comment = None
+                    self._prev = ''
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if prev == '/' and char == '/':
+                self._comment = 'line'
+            elif prev == '/' and char == '*':
+                self._comment = 'block'
+                self._prev = ''
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    return True
+        return False
@@ -0,0 +1,168 @@
+"""
+本地模拟AI处理器模块
+
+此模块提供不访问网络的AI处理器（AI_TYPE=stub），按配置模拟延迟、格式错误和超时，
+用于压测和基准测试AI解析链路（重试、JSON清理、Schema验证、流式读取）
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+from .base import BaseAIProcessor
+
+
+class StubAIProcessor(BaseAIProcessor):
+    """本地模拟AI处理器"""
+    provider_name = 'stub'
+    model_name = 'stub'
+
+    # 模拟的格式错误输出：JSON 不完整、字段不符合 Schema、没有 JSON
+    MALFORMED_TEMPLATES = (
+        '```json\n{{"stock_name": "{stock_name}", "stock_code": "{stock_code}", "action": ',
+        '```json\n{{"stock_name": "{stock_name}", "stock_code": "N/A", "action": "buy"}}\n```',
+        '抱歉，我无法确定这段文本中的股票信息。',
+    )
+
+    def __init__(self, latency: Optional[float] = None, jitter: Optional[float] = None,
+                 malformed_rate: Optional[float] = None, timeout_rate: Optional[float] = None,
+                 timeout: Optional[float] = None, seed: Optional[int] = None):
+        """
+        初始化模拟处理器，未传入的参数从环境变量读取
+
+        Args:
+            latency: 平均响应延迟（秒），环境变量 AI_STUB_LATENCY，默认 0.5
+            jitter: 延迟抖动比例（0-1），环境变量 AI_STUB_JITTER，默认 0.2
+            malformed_rate: 返回格式错误输出的概率，环境变量 AI_STUB_MALFORMED_RATE，默认 0
+            timeout_rate: 调用超时的概率，环境变量 AI_STUB_TIMEOUT_RATE，默认 0
+            timeout: 超时前的等待时间（秒），环境变量 AI_STUB_TIMEOUT，默认 5
+            seed: 随机种子，环境变量 AI_STUB_SEED，不设置时每次运行结果不同
+        """
+        super().__init__()
+        self.latency = latency if latency is not None else float(os.getenv('AI_STUB_LATENCY', '0.5'))
+        self.jitter = jitter if jitter is not None else float(os.getenv('AI_STUB_JITTER', '0.2'))
+        self.malformed_rate = malformed_rate if malformed_rate is not None else float(
+            os.getenv('AI_STUB_MALFORMED_RATE', '0'))
+        self.timeout_rate = timeout_rate if timeout_rate is not None else float(
+            os.getenv('AI_STUB_TIMEOUT_RATE', '0'))
+        self.timeout = timeout if timeout is not None else float(os.getenv('AI_STUB_TIMEOUT', '5'))
+        if seed is None and os.getenv('AI_STUB_SEED'):
+            seed = int(os.getenv('AI_STUB_SEED'))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'attempts': 0, 'malformed': 0, 'timeouts': 0}
+
+    def reset_counters(self):
+        """清零调用计数"""
+        with self._lock:
+            for key in self.counters:
+                self.counters[key] = 0
+
+    def _count(self, key: str):
+        """调用计数加一"""
+        with self._lock:
+            self.counters[key] += 1
+
+    def _draw(self):
+        """抽取本次调用的随机结果：(是否超时, 是否格式错误, 延迟)"""
+        with self._lock:
+            timed_out = self._random.random() < self.timeout_rate
+            malformed = self._random.random() < self.malformed_rate
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+            template = self._random.choice(self.MALFORMED_TEMPLATES)
+        return timed_out, malformed, max(0.0, delay), template
+
+    def build_result(self, user_input: str) -> Dict[str, Any]:
+        """
+        根据输入生成模拟的解析结果
+
+        模板格式文本使用规则解析结果，其余文本按关键词生成。
+
+        Args:
+            user_input: 策略文本
+
+        Returns:
+            Dict[str, Any]: 符合 Schema 的解析结果
+        """
+        result = self.rule_parser.parse(user_input)
+        if result is not None:
+            return result
+
+        action = next((value for keyword, value in self.rule_parser.ACTION_KEYWORDS if keyword in user_input), 'buy')
+        return {
+            'stock_name': '平安银行',
+            'stock_code': self.extract_stock_code(user_input) or '000001',
+            'action': action,
+            'position_ratio': self.rule_parser.DEFAULT_POSITION_RATIO[action],
+            'price_min': None,
+            'price_max': None,
+            'take_profit_price': None,
+            'stop_loss_price': None,
+            'other_conditions': None,
+            'reason': None
+        }
+
+    def create_completion(self, messages: List[Dict[str, str]], stream: bool):
+        """模拟聊天补全接口，返回与SDK结构一致的响应或流"""
+        self._count('attempts')
+        user_input = next(message['content'] for message in messages if message['role'] == 'user')
+        timed_out, malformed, delay, template = self._draw()
+
+        if timed_out:
+            self._count('timeouts')
+            time.sleep(self.timeout)
+            raise TimeoutError(f"模拟AI调用超时（{self.timeout}秒）")
+
+        result = self.build_result(user_input)
+        if malformed:
+            self._count('malformed')
+            content = template.format(**result)
+        else:
+            content = f"```json\n{json.dumps(result, ensure_ascii=False, indent=2)}\n```\n以上为策略解析结果。"
+
+        if stream:
+            return self._stream_chunks(content, delay)
+        time.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    @staticmethod
+    def _stream_chunks(content: str, delay: float, chunk_size: int = 8) -> Iterator[SimpleNamespace]:
+        """将回复拆成若干片段，按总延迟均匀输出"""
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        interval = delay / max(1, len(chunks))
+        for chunk in chunks:
+            time.sleep(interval)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+    def call_ai_api(self, user_input: str, retry_count: int = 0,
+                    cancel_event: Optional[threading.Event] = None,
+                    max_retries: Optional[int] = None,
+                    on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """调用模拟AI并处理响应（重试逻辑与真实处理器一致）"""
+        self._count('calls')
+        max_retries = max_retries or self.max_retries
+        current_retry = retry_count
+
+        while current_retry < max_retries:
+            if cancel_event is not None and cancel_event.is_set():
+                return {"error": self.CANCELLED_MESSAGE}
+
+            try:
+                messages = self.build_messages(user_input, current_retry)
+                content = self.request_completion(messages, on_progress)
+                result = self.clean_json_content(content)
+                if self.validate_json_schema(result):
+                    return result
+                current_retry += 1
+
+            except Exception as e:
+                self.logger.warning(f"模拟AI调用失败: {str(e)}")
+                current_retry += 1
+
+        return {
+            "error": self.FAILURE_MESSAGE
+        }
@@ -0,0 +1,302 @@
+"""
+股票代码表模块
+
+此模块维护本地股票代码表（代码、名称、拼音首字母、市场），
+启动时加载到内存哈希表和前缀树中，名称与代码的精确互查无需请求远程接口
+"""
+
+import csv
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认代码表文件
+DEFAULT_SYMBOL_PATH = Path(__file__).parent / 'data' / 'stock_symbols.csv'
+
+# A股代码（与 BaseAIProcessor._parse_stock_info 的判断一致）
+A_SHARE_PATTERN = re.compile(r'^(00|60|30|68)\d{4}$')
+
+
+class SymbolRecord(NamedTuple):
+    """股票代码表记录"""
+    code: str
+    name: str
+    pinyin: str
+    market: str
+
+
+class PrefixTrie:
+    """前缀树，节点上记录以该前缀开头的股票代码"""
+
+    __slots__ = ('children', 'codes')
+
+    def __init__(self):
+        """初始化节点"""
+        self.children: Dict[str, 'PrefixTrie'] = {}
+        self.codes: List[str] = []
+
+    def insert(self, key: str, code: str):
+        """
+        插入关键字
+
+        Args:
+            key: 关键字（名称、拼音或代码）
+            code: 关键字对应的股票代码
+        """
+        node = self
+        for char in key:
+            node = node.children.setdefault(char, PrefixTrie())
+            # 同一记录的多个关键字连续插入，只需与最后一个代码比较即可去重
+            if not node.codes or node.codes[-1] != code:
+                node.codes.append(code)
+
+    def search(self, prefix: str) -> List[str]:
+        """
+        查询以指定前缀开头的股票代码
+
+        Args:
+            prefix: 前缀
+
+        Returns:
+            List[str]: 股票代码列表，按插入顺序排列
+        """
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.codes
+
+
+class _SymbolIndex:
+    """代码表索引（整体替换以保证刷新时的线程安全）"""
+
+    def __init__(self, records: List[SymbolRecord]):
+        """根据记录构建哈希索引和前缀树"""
+        self.by_code: Dict[str, SymbolRecord] = {}
+        self.by_name: Dict[str, SymbolRecord] = {}
+        self.by_pinyin: Dict[str, List[SymbolRecord]] = {}
+        self.trie = PrefixTrie()
+        for record in records:
+            self.add(record)
+
+    def add(self, record: SymbolRecord):
+        """添加一条记录（A股与港股同名时，名称查询保留A股）"""
+        self.by_code[record.code] = record
+        existing = self.by_name.get(record.name)
+        if existing is None or not A_SHARE_PATTERN.match(existing.code) or A_SHARE_PATTERN.match(record.code):
+            self.by_name[record.name] = record
+        self.trie.insert(record.code, record.code)
+        self.trie.insert(record.name, record.code)
+        if record.pinyin:
+            self.by_pinyin.setdefault(record.pinyin, []).append(record)
+            self.trie.insert(record.pinyin, record.code)
+
+
+class SymbolMaster:
+    """本地股票代码表"""
+
+    # 检查代码表文件是否更新的最小间隔（秒）
+    RELOAD_CHECK_INTERVAL = 60
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        初始化代码表
+
+        Args:
+            path: 代码表 CSV 文件路径（表头：code,name,pinyin,market）
+        """
+        self.path = Path(path) if path else DEFAULT_SYMBOL_PATH
+        self._index = _SymbolIndex([])
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        """代码表记录数"""
+        return len(self._index.by_code)
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """
+        从文件加载代码表，替换当前索引
+
+        Args:
+            path: 代码表文件路径，不传时使用初始化时的路径
+
+        Returns:
+            int: 加载的记录数
+        """
+        if path:
+            self.path = Path(path)
+
+        records = []
+        try:
+            with open(self.path, encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    code = (row.get('code') or '').strip()
+                    name = (row.get('name') or '').strip()
+                    if not code or not name:
+                        continue
+                    records.append(SymbolRecord(
+                        code=code,
+                        name=name,
+                        pinyin=(row.get('pinyin') or '').strip().upper(),
+                        market=(row.get('market') or '').strip().upper()
+                    ))
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.warning(f"加载股票代码表失败: {self.path}, {str(e)}")
+            return 0
+
+        index = _SymbolIndex(records)
+        with self._lock:
+            self._index = index
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+        logger.info(f"股票代码表加载完成: {self.path}，共 {len(records)} 条记录")
+        return len(records)
+
+    def reload_if_changed(self) -> bool:
+        """
+        代码表文件有更新时重新加载
+
+        每 RELOAD_CHECK_INTERVAL 秒最多检查一次文件修改时间。
+
+        Returns:
+            bool: 是否重新加载
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_CHECK_INTERVAL:
+            return False
+        self._checked_at = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if self._mtime is not None and mtime <= self._mtime:
+            return False
+        return self.load() > 0
+
+    def add(self, code: str, name: str, market: str = '') -> None:
+        """
+        将远程查询到的股票加入内存索引
+
+        Args:
+            code: 股票代码
+            name: 股票名称
+            market: 市场
+        """
+        with self._lock:
+            self._index.add(SymbolRecord(code=code, name=name, pinyin='', market=market.upper()))
+
+    def get_by_code(self, code: str) -> Optional[SymbolRecord]:
+        """按代码精确查询"""
+        return self._index.by_code.get(code)
+
+    def get_by_name(self, name: str) -> Optional[SymbolRecord]:
+        """按名称精确查询"""
+        return self._index.by_name.get(name)
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[SymbolRecord]:
+        """
+        按名称、拼音首字母或代码前缀查询
+
+        Args:
+            prefix: 前缀
+            limit: 最大返回条数
+
+        Returns:
+            List[SymbolRecord]: 匹配的记录
+        """
+        index = self._index
+        codes = index.trie.search(prefix.upper() if prefix.isascii() else prefix)
+        return [index.by_code[code] for code in codes[:limit]]
+
+    def lookup(self, keyword: str) -> Optional[Tuple[str, str]]:
+        """
+        查询股票信息，依次尝试代码、名称、拼音首字母的精确匹配
+
+        不做前缀匹配（"京东" 不会匹配到 "京东方A"），部分代码也不会命中，
+        未命中时由调用方查询远程接口。
+
+        Args:
+            keyword: 股票名称、代码或拼音首字母
+
+        Returns:
+            Optional[Tuple[str, str]]: (股票代码, 股票名称) 或 None
+        """
+        keyword = keyword.strip()
+        if not keyword:
+            return None
+
+        index = self._index
+        record = index.by_code.get(keyword) or index.by_name.get(keyword)
+        if record is None and keyword.isascii():
+            record = _unique_match(index.by_pinyin.get(keyword.upper()) or [])
+
+        return (record.code, record.name) if record else None
+
+    def lookup_prefix(self, keyword: str) -> Optional[Tuple[str, str]]:
+        """
+        按名称或拼音首字母前缀查询，仅在唯一匹配（或唯一的A股）时返回（用于远程接口未命中后的兜底）
+
+        纯数字的关键字（部分代码）和单个字符不做前缀匹配。
+
+        Args:
+            keyword: 股票名称或拼音首字母前缀
+
+        Returns:
+            Optional[Tuple[str, str]]: (股票代码, 股票名称)，无匹配或有多个匹配时为 None
+        """
+        keyword = keyword.strip()
+        if len(keyword) < 2 or keyword.isdigit():
+            return None
+
+        record = _unique_match(self.search_prefix(keyword, limit=len(self)))
+        return (record.code, record.name) if record else None
+
+
+def _unique_match(candidates: List[SymbolRecord]) -> Optional[SymbolRecord]:
+    """
+    从候选记录中选出唯一匹配（同时在A股和港股上市时取唯一的A股）
+
+    Args:
+        candidates: 候选记录
+
+    Returns:
+        Optional[SymbolRecord]: 唯一匹配的记录，无法确定时为 None
+    """
+    if len(candidates) == 1:
+        return candidates[0]
+    a_shares = [record for record in candidates if A_SHARE_PATTERN.match(record.code)]
+    return a_shares[0] if len(a_shares) == 1 else None
+
+
+_symbol_master: Optional[SymbolMaster] = None
+_symbol_master_lock = threading.Lock()
+
+
+def get_symbol_master() -> SymbolMaster:
+    """
+    获取进程内共享的股票代码表，首次调用时加载
+
+    代码表文件路径可通过环境变量 SYMBOL_MASTER_PATH 指定。
+
+    Returns:
+        SymbolMaster: 股票代码表
+    """
+    global _symbol_master
+    if _symbol_master is None:
+        with _symbol_master_lock:
+            if _symbol_master is None:
+                master = SymbolMaster(os.getenv('SYMBOL_MASTER_PATH') or None)
+                master.load()
+                _symbol_master = master
+    return _symbol_master
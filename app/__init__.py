@@ -4,13 +4,29 @@
 此模块负责初始化Flask应用
 """
 
+import time
+
+# 启动耗时统计的起点（导入本包依赖的耗时计入“导入模块”阶段）
+_IMPORT_STARTED = time.perf_counter()
+
 import os
+import atexit
 from pathlib import Path
 from flask import Flask
 from dotenv import load_dotenv
 from config import config
 from .models import db
 from .utils.logger import setup_logger
+from .utils.serializer import FastJSONProvider
+from .utils.compression import init_compression
+from .utils.metrics import init_metrics
+from .utils.query_stats import init_query_stats
+from .utils.profiler import init_profiling
+from .services.analysis_job import init_analysis_jobs
+from .utils.rate_limit import create_ai_throttle
+from .utils.startup import StartupTimer
+from .utils.db_pool import configure_pool, warm_up_pool
+from .utils.db_routing import init_read_replicas
 from flask_cors import CORS
 from datetime import timedelta
 import logging
@@ -20,43 +36,30 @@ from sqlalchemy import text
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path, override=True)
 
-def create_app(config_name=None):
-    """
-    创建并配置Flask应用
+# 所有响应统一添加的跨域和安全响应头（异步接口见 app/asgi.py）
+SECURITY_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'SAMEORIGIN',
+    'X-XSS-Protection': '1; mode=block',
+}
+
+# 是否已将导入耗时计入启动统计（只计入进程内首次创建的应用）
+_import_recorded = False
+
+
+def bootstrap_database(app):
     """
-    if config_name is None:
-        config_name = os.getenv('FLASK_CONFIG', 'development')
-        
-    # 创建Flask应用实例
-    app = Flask(__name__,
-                static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'static'),
-                template_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'templates'))
-    
-    # 加载配置
-    app.config.from_object(config[config_name])
-    config[config_name].init_app(app)
+    检查数据库和表结构：数据库不存在时创建数据库，并创建缺少的表（不修改已有表）
     
-    # 配置CORS - 使用最简单的配置
-    CORS(app)
-    
-    # 设置安全头部
-    @app.after_request
-    def add_security_headers(response):
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        return response
-    
-    # 初始化日志
-    setup_logger(app)
+    需要连接 MySQL 服务器并查询 INFORMATION_SCHEMA，应用启动时默认不执行，
+    通过 DB_BOOTSTRAP=true 或 python scripts/init_db.py 执行
     
-    # 初始化扩展
-    db.init_app(app)
-    
-    # 创建数据库表
+    Args:
+        app: Flask应用实例
+    """
     with app.app_context():
         try:
             # 获取数据库连接参数（直接从环境变量获取，避免通过配置读取）
@@ -107,6 +110,94 @@ def create_app(config_name=None):
         except Exception as e:
             logging.error(f"数据库初始化失败: {str(e)}")
             raise
+
+
+def create_app(config_name=None):
+    """
+    创建并配置Flask应用
+    
+    各阶段耗时在启动完成后汇总输出到日志，并保存在 app.extensions['startup_timings']
+    """
+    global _import_recorded
+    # 进程内首次创建应用时，计入导入本包及其依赖的耗时
+    timer = StartupTimer(None if _import_recorded else _IMPORT_STARTED)
+    if not _import_recorded:
+        timer.mark('导入模块')
+        _import_recorded = True
+    
+    if config_name is None:
+        config_name = os.getenv('FLASK_CONFIG', 'development')
+        
+    # 创建Flask应用实例
+    app = Flask(__name__,
+                static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'static'),
+                template_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'templates'))
+    
+    # 加载配置
+    app.config.from_object(config[config_name])
+    config[config_name].init_app(app)
+    timer.mark('加载配置')
+    
+    # 使用高性能JSON编码器（优先orjson），所有 jsonify 响应统一生效
+    app.json = FastJSONProvider(app)
+    
+    # 配置CORS - 使用最简单的配置
+    CORS(app)
+    
+    # 设置安全头部
+    @app.after_request
+    def add_security_headers(response):
+        response.headers.update(SECURITY_HEADERS)
+        return response
+    
+    # 请求数、延迟和进行中请求数指标（/metrics 接口输出）
+    init_metrics(app)
+    
+    # 大体积JSON响应压缩（gzip/brotli）
+    init_compression(app)
+    
+    # 初始化日志
+    setup_logger(app)
+    
+    # 初始化扩展（MySQL 连接池使用记录获取连接耗时的 TimedQueuePool，配置了只读副本时启用读写分离）
+    configure_pool(app)
+    db.init_app(app)
+    init_read_replicas(app)
+    
+    # SQL 查询次数、耗时统计和慢查询日志
+    init_query_stats(app)
+    
+    # 按采样或请求头剖析单个请求（在查询统计之后注册，使剖析结果包含本次请求的 SQL 次数）
+    init_profiling(app)
+    timer.mark('初始化扩展')
+    
+    # 检查数据库和表结构（需连接 MySQL，默认跳过，首次部署或模型变更后通过 DB_BOOTSTRAP=true 执行）
+    if app.config.get('DB_BOOTSTRAP', False):
+        bootstrap_database(app)
+        timer.mark('数据库初始化')
+    
+    # 预先建立数据库连接（Gunicorn 部署时改为在每个工作进程启动后预热）
+    if app.config.get('DB_POOL_WARMUP') and app.config.get('DB_POOL_WARMUP_ON_CREATE', True):
+        warm_up_pool(app)
+        timer.mark('连接池预热')
+    
+    # 预加载本地股票代码表，避免首次解析策略时再加载
+    from ai_robot.symbol_master import get_symbol_master
+    get_symbol_master()
+    timer.mark('加载股票代码表')
+    
+    # 进程退出时关闭共享AI处理器的客户端连接
+    # atexit 按注册的逆序执行，先注册以保证在任务线程池关闭之后执行
+    from ai_robot import shutdown_ai_processors
+    atexit.register(shutdown_ai_processors)
+    
+    # 异步策略分析任务线程池
+    analysis_jobs = init_analysis_jobs(app)
+    atexit.register(analysis_jobs.shutdown)
+    
+    # AI调用并发上限和速率限制（批量分析共用，Gunicorn 部署时在每个工作进程启动后按工作进程数平分）
+    app.extensions['ai_throttle'] = create_ai_throttle(app.config)
+    timer.mark('初始化后台任务')
     
     # 注册蓝图
     from .routes import strategy_bp, execution_bp, home_bp, position_bp, account_bp, health_bp, root_health_bp
@@ -117,11 +208,19 @@ def create_app(config_name=None):
     app.register_blueprint(account_bp, url_prefix='/api/v1')
     app.register_blueprint(health_bp)
     app.register_blueprint(root_health_bp)
+    timer.mark('注册蓝图')
     
-    # 启动股价自动更新
-    from .tasks.price_updater import PriceUpdater
-    price_updater = PriceUpdater(app=app)  # 移除固定的interval参数，使用自动调整的更新间隔
-    price_updater.start()
-    app.price_updater = price_updater  # 保存到应用实例中，方便后续管理
+    # 启动股价自动更新（Gunicorn 多进程部署时由独立进程运行，请求工作进程不启动）
+    app.price_updater = None
+    if app.config.get('PRICE_UPDATER_ENABLED', True):
+        from .tasks.price_updater import PriceUpdater
+        price_updater = PriceUpdater(app=app)  # 移除固定的interval参数，使用自动调整的更新间隔
+        price_updater.start()
+        app.price_updater = price_updater  # 保存到应用实例中，方便后续管理
+    else:
+        logging.info("股价自动更新未在当前进程启动（PRICE_UPDATER_ENABLED=false）")
+    timer.mark('启动股价更新')
     
+    timer.log_summary()
+    app.extensions['startup_timings'] = timer.snapshot()
     return app 
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+异步接口模块
+
+此模块以 ASGI 方式提供以等待外部 HTTP 为主的接口，单个进程可以同时处理大量慢请求：
+
+    GET  /api/v1/positions               更新并返回全部持仓（行情请求并发进行）
+    GET  /api/v1/positions/<stock_code>  更新并返回单个持仓
+    POST /api/v1/analyze_strategy        AI策略分析
+
+请求参数和响应格式与同名的同步接口一致。行情请求使用共享的 httpx 异步客户端；
+数据库读写和AI解析复用现有同步服务，在限定数量的工作线程中执行，等待中的请求只占用协程。
+其余请求（包括上述路径的其他方法）转交给 Flask 应用处理。
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import anyio
+import httpx
+from a2wsgi import WSGIMiddleware
+from flask import Flask
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from . import SECURITY_HEADERS
+from .models import StockPosition
+from .services.position import PositionService
+from .services.strategy import StrategyService
+from .utils.async_support import pool_capacity, run_in_app_context
+from .utils.compression import choose_encoding, compress_body
+from .utils.metrics import HTTP_IN_PROGRESS, HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from .utils.serializer import dumps_bytes, parse_fields
+
+logger = logging.getLogger(__name__)
+
+position_service = PositionService()
+strategy_service = StrategyService()
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+def json_response(flask_app: Flask, request: Request, payload: Dict[str, Any], status_code: int = 200) -> Response:
+    """
+    生成 JSON 响应，按应用的压缩配置和客户端 Accept-Encoding 压缩响应体
+
+    Args:
+        flask_app: Flask应用实例（读取压缩配置）
+        request: 请求对象
+        payload: 响应数据
+        status_code: HTTP 状态码
+
+    Returns:
+        Response: 响应对象
+    """
+    body = dumps_bytes(payload)
+    headers = {}
+    config = flask_app.config
+    if config.get('COMPRESS_ENABLED', True) and 200 <= status_code < 300:
+        headers['Vary'] = 'Accept-Encoding'
+        encoding = choose_encoding(parse_accept_header(request.headers.get('accept-encoding'), Accept))
+        if encoding and len(body) >= config.get('COMPRESS_MIN_SIZE', 1024):
+            body = compress_body(body, encoding, config.get('COMPRESS_LEVEL', 6), config.get('COMPRESS_BR_LEVEL', 4))
+            headers['Content-Encoding'] = encoding
+    return Response(body, status_code=status_code, headers=headers, media_type='application/json')
+
+
+def instrument(endpoint: str, handler: Handler) -> Handler:
+    """为异步接口记录请求指标并添加安全响应头（与 Flask 接口使用相同的指标）"""
+    async def wrapper(request: Request) -> Response:
+        start = time.perf_counter()
+        status = 500
+        HTTP_IN_PROGRESS.labels(endpoint).inc()
+        try:
+            response = await handler(request)
+            status = response.status_code
+            response.headers.update(SECURITY_HEADERS)
+            return response
+        finally:
+            HTTP_IN_PROGRESS.labels(endpoint).dec()
+            HTTP_REQUESTS.labels(endpoint, request.method, status).inc()
+            HTTP_REQUEST_DURATION.labels(endpoint, request.method, status).observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def create_asgi_app(flask_app: Flask, http_client: Optional[httpx.AsyncClient] = None) -> Starlette:
+    """
+    创建 ASGI 应用
+
+    相关配置:
+        ASYNC_AI_THREADS: 同时执行AI解析的线程数，其余请求以协程等待
+        ASYNC_HTTP_MAX_CONNECTIONS: 行情请求的最大连接数
+        ASGI_WSGI_THREADS: 处理转交给 Flask 的请求的线程数，为 0 时等于连接池 pool_size
+
+    Args:
+        flask_app: Flask应用实例
+        http_client: 行情请求使用的异步客户端，不传时在启动时创建、关闭时释放
+
+    Returns:
+        Starlette: ASGI 应用
+    """
+    config = flask_app.config
+    # 数据库线程数不超过连接池可提供的连接数，避免线程在池中排队等待连接
+    db_limiter = anyio.CapacityLimiter(pool_capacity(flask_app))
+    ai_limiter = anyio.CapacityLimiter(max(1, config.get('ASYNC_AI_THREADS', 32)))
+    engine_options = config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    wsgi_threads = config.get('ASGI_WSGI_THREADS') or engine_options.get('pool_size', 10)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        """创建并在关闭时释放共享的异步 HTTP 客户端"""
+        if http_client is not None:
+            app.state.http_client = http_client
+            yield
+            return
+        max_connections = config.get('ASYNC_HTTP_MAX_CONNECTIONS', 100)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        async with httpx.AsyncClient(limits=limits) as client:
+            app.state.http_client = client
+            yield
+
+    async def get_positions(request: Request) -> Response:
+        """更新并返回全部持仓"""
+        try:
+            fields = parse_fields(request.query_params.get('fields'), StockPosition)
+        except ValueError as e:
+            logger.warning(f"【前端触发】获取持仓列表参数错误: {str(e)}")
+            return json_response(flask_app, request, {'code': 400, 'message': str(e), 'data': None}, 400)
+
+        try:
+            positions = await position_service.update_all_positions_async(
+                flask_app, request.app.state.http_client, fields, limiter=db_limiter)
+        except Exception as e:
+            logger.error(f"【前端触发】获取持仓列表失败: {str(e)}")
+            return json_response(flask_app, request, {
+                'code': 500, 'message': f'获取持仓列表失败: {str(e)}', 'data': None}, 500)
+
+        logger.info(f"【前端触发】成功获取并更新 {len(positions)} 条持仓记录")
+        return json_response(flask_app, request, {'code': 200, 'message': 'success', 'data': positions})
+
+    async def get_position(request: Request) -> Response:
+        """更新并返回单个持仓"""
+        stock_code = request.path_params['stock_code']
+        try:
+            position = await position_service.refresh_position_async(
+                flask_app, request.app.state.http_client, stock_code, limiter=db_limiter)
+        except Exception as e:
+            logger.error(f"【前端触发】获取股票 {stock_code} 的持仓信息失败: {str(e)}")
+            return json_response(flask_app, request, {
+                'code': 500, 'message': f'获取持仓信息失败: {str(e)}', 'data': None}, 500)
+
+        if not position:
+            logger.warning(f"【前端触发】未找到股票代码为 {stock_code} 的持仓记录")
+            return json_response(flask_app, request, {
+                'code': 404, 'message': f'未找到股票代码为 {stock_code} 的持仓记录', 'data': None}, 404)
+        return json_response(flask_app, request, {'code': 200, 'message': 'success', 'data': position})
+
+    async def analyze_strategy(request: Request) -> Response:
+        """AI策略分析"""
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or 'strategy_text' not in data:
+            return json_response(flask_app, request, {'code': 400, 'message': '缺少策略文本', 'data': None}, 400)
+
+        try:
+            result = await run_in_app_context(
+                flask_app, strategy_service.analyze_strategy, data['strategy_text'], limiter=ai_limiter)
+        except Exception as e:
+            logger.error(f"策略分析失败: {str(e)}", exc_info=True)
+            return json_response(flask_app, request, {
+                'code': 500, 'message': f'策略分析失败: {str(e)}', 'data': None}, 500)
+
+        if 'error' in result:
+            return json_response(flask_app, request, {'code': 400, 'message': result['error'], 'data': None}, 400)
+        return json_response(flask_app, request, {'code': 200, 'message': '策略分析成功', 'data': result})
+
+    routes = [
+        Route('/api/v1/positions', instrument('async.get_positions', get_positions), methods=['GET']),
+        Route('/api/v1/positions/{stock_code}', instrument('async.get_position', get_position), methods=['GET']),
+        Route('/api/v1/analyze_strategy', instrument('async.analyze_strategy', analyze_strategy), methods=['POST']),
+        # 路径相同但方法不匹配的请求（如 OPTIONS 预检）也由 Flask 处理
+        Mount('/', app=WSGIMiddleware(flask_app, workers=wsgi_threads)),
+    ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.flask_app = flask_app
+    logger.info(f"ASGI 应用已创建：AI线程 {ai_limiter.total_tokens} 个，数据库线程 {db_limiter.total_tokens} 个，"
+                f"WSGI 线程 {wsgi_threads} 个")
+    return app
@@ -6,13 +6,19 @@
 
 from flask_sqlalchemy import SQLAlchemy
 
-# 初始化数据库
-db = SQLAlchemy()
+from ..utils.db_routing import RoutingSession
+
+# 初始化数据库（会话按读写类型选择主库或只读副本，见 app/utils/db_routing.py）
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # 导入所有模型
 from .stock import StockStrategy
 from .execution import StrategyExecution
 from .position import StockPosition
+from .parse_cache import StrategyParseCache
+from .account import AccountFunds
+from .analysis_job import AnalysisJobRecord
 
 # 导出所有模型
-__all__ = ['db', 'StockStrategy', 'StrategyExecution', 'StockPosition'] 
\ No newline at end of file
+__all__ = ['db', 'StockStrategy', 'StrategyExecution', 'StockPosition', 'StrategyParseCache', 'AccountFunds',
+           'AnalysisJobRecord'] 
\ No newline at end of file
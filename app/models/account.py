@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import Dict, Any
 import pytz
 from . import db
+from ..utils.serializer import format_datetime
 
 # 设置中国时区
 CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
@@ -47,8 +48,8 @@ class AccountFunds(db.Model):
             'frozen_funds': self.frozen_funds,
             'total_profit': self.total_profit,
             'total_profit_ratio': self.total_profit_ratio,
-            'created_at': self.created_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.updated_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at)
         }
 
     def update_profit(self):
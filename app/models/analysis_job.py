@@ -0,0 +1,40 @@
+"""
+策略分析任务模型模块
+
+此模块定义了异步策略分析任务状态相关的数据库模型，
+多进程部署时任何工作进程都可以查询其他进程提交的任务
+"""
+
+from datetime import datetime
+import pytz
+from . import db
+
+# 设置中国时区
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+
+
+class AnalysisJobRecord(db.Model):
+    """策略分析任务模型"""
+    __tablename__ = 'analysis_jobs'
+
+    # 设置表的字符集和排序规则
+    __table_args__ = (
+        db.Index('idx_finished_at', 'finished_at'),
+        {
+            'mysql_engine': 'InnoDB',
+            'mysql_charset': 'utf8mb4',
+            'mysql_collate': 'utf8mb4_unicode_ci'
+        }
+    )
+
+    id = db.Column(db.String(32), primary_key=True, comment='任务ID')
+    status = db.Column(db.String(20), nullable=False, comment='任务状态：pending/running/succeeded/failed')
+    result = db.Column(db.Text(collation='utf8mb4_unicode_ci'), comment='解析结果JSON')
+    error = db.Column(db.Text(collation='utf8mb4_unicode_ci'), comment='错误信息')
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(CN_TIMEZONE), comment='提交时间')
+    started_at = db.Column(db.DateTime, comment='开始执行时间')
+    finished_at = db.Column(db.DateTime, comment='结束时间')
+
+    def __repr__(self):
+        """返回任务的字符串表示"""
+        return f'<AnalysisJobRecord {self.id}: {self.status}>'
@@ -8,6 +8,7 @@ from datetime import datetime
 import pytz
 from typing import Dict, Any
 from . import db
+from ..utils.serializer import format_datetime
 
 # 设置中国时区
 CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
@@ -50,9 +51,9 @@ class StrategyExecution(db.Model):
             'volume': self.volume,
             'position_ratio': self.position_ratio,
             'original_position_ratio': self.original_position_ratio,
-            'execution_time': self.execution_time.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
+            'execution_time': format_datetime(self.execution_time),
             'execution_result': self.execution_result,
             'remarks': self.remarks,
-            'created_at': self.created_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.updated_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at)
         } 
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+策略解析缓存模型模块
+
+此模块定义了AI策略解析结果缓存相关的数据库模型
+"""
+
+from datetime import datetime
+from typing import Dict, Any
+import pytz
+from . import db
+from ..utils.serializer import format_datetime
+
+# 设置中国时区
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+
+class StrategyParseCache(db.Model):
+    """策略解析缓存模型"""
+    __tablename__ = 'strategy_parse_cache'
+
+    # 设置表的字符集和排序规则
+    __table_args__ = (
+        db.Index('idx_last_hit_at', 'last_hit_at'),
+        db.Index('idx_expires_at', 'expires_at'),
+        {
+            'mysql_engine': 'InnoDB',
+            'mysql_charset': 'utf8mb4',
+            'mysql_collate': 'utf8mb4_unicode_ci'
+        }
+    )
+
+    id = db.Column(db.Integer, primary_key=True, comment='缓存ID')
+    cache_key = db.Column(db.String(64), nullable=False, unique=True, comment='缓存键（规范化文本+模型+提示词版本的SHA256）')
+    provider = db.Column(db.String(255), nullable=False, comment='AI提供方及模型（组合处理器为各提供方标识的组合）')
+    prompt_version = db.Column(db.String(20), nullable=False, comment='提示词版本')
+    result = db.Column(db.Text(collation='utf8mb4_unicode_ci'), nullable=False, comment='解析结果JSON')
+    hit_count = db.Column(db.Integer, nullable=False, default=0, comment='命中次数')
+    expires_at = db.Column(db.DateTime, nullable=False, comment='过期时间')
+    last_hit_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(CN_TIMEZONE), comment='最近命中时间')
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(CN_TIMEZONE), comment='创建时间')
+
+    def __repr__(self):
+        """返回缓存记录的字符串表示"""
+        return f'<StrategyParseCache {self.id}: {self.provider}/{self.prompt_version} - 命中{self.hit_count}次>'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """将模型转换为字典"""
+        return {
+            'id': self.id,
+            'cache_key': self.cache_key,
+            'provider': self.provider,
+            'prompt_version': self.prompt_version,
+            'result': self.result,
+            'hit_count': self.hit_count,
+            'expires_at': format_datetime(self.expires_at),
+            'last_hit_at': format_datetime(self.last_hit_at),
+            'created_at': format_datetime(self.created_at)
+        }
@@ -9,6 +9,7 @@ from typing import Dict, Any
 import pytz
 from decimal import Decimal, getcontext
 from . import db
+from ..utils.serializer import format_datetime
 
 # 设置中国时区
 CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
@@ -61,8 +62,8 @@ class StockPosition(db.Model):
             'floating_profit': self.floating_profit,
             'floating_profit_ratio': self.floating_profit_ratio,
             'original_position_ratio': self.original_position_ratio,
-            'created_at': self.created_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.updated_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at)
         }
 
     def update_position(self, volume: int, price: float, action: str):
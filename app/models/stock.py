@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import Dict, Any
 import pytz
 from . import db
+from ..utils.serializer import format_datetime
 from sqlalchemy import Enum
 
 # 设置中国时区
@@ -75,7 +76,7 @@ class StockStrategy(db.Model):
             'other_conditions': self.other_conditions,
             'reason': self.reason,
             'execution_status': self.execution_status,
-            'created_at': self.created_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.updated_at.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at),
             'is_active': self.is_active
         } 
\ No newline at end of file
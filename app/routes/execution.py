@@ -10,7 +10,8 @@ from typing import Dict, Any
 from ..services.execution import ExecutionService
 from ..utils.response import success_response, error_response
 from ..utils.decorators import handle_exceptions
-from ..models import db, StrategyExecution
+from ..models import StrategyExecution
+from ..utils.serializer import parse_fields
 
 # 创建蓝图
 execution_bp = Blueprint('execution', __name__)
@@ -61,6 +62,7 @@ def get_executions():
         result = request.args.get('result', type=str)
         sort_by = request.args.get('sort_by', 'execution_time', type=str)
         order = request.args.get('order', 'desc', type=str)
+        fields = parse_fields(request.args.get('fields'), StrategyExecution)
         
         results = execution_service.get_executions(
             strategy_id=strategy_id,
@@ -70,9 +72,12 @@ def get_executions():
             action=action,
             result=result,
             sort_by=sort_by,
-            order=order
+            order=order,
+            fields=fields
         )
         return success_response(data=results)
+    except ValueError as e:
+        return error_response(str(e), code=400)
     except Exception as e:
         logger.error(f"查询执行记录列表失败: {str(e)}", exc_info=True)
         return error_response("查询执行记录列表失败", code=500)
@@ -146,28 +151,22 @@ def batch_get_executions():
                 'message': 'strategy_ids必须是一个列表'
             })
         
-        result = {}
-        for strategy_id in strategy_ids:
-            query = db.session.query(StrategyExecution).filter(
-                StrategyExecution.strategy_id == strategy_id
-            ).order_by(StrategyExecution.execution_time.desc())
-            
-            if limit:
-                query = query.limit(limit)
-            
-            executions = query.all()
-            result[strategy_id] = [
-                {
-                    'execution_id': execution.execution_id,
-                    'strategy_id': execution.strategy_id,
-                    'execution_time': execution.execution_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'execution_price': execution.execution_price,
-                    'volume': execution.volume,
-                    'execution_result': execution.execution_result,
-                    'created_at': execution.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                for execution in executions
-            ]
+        # 策略ID和数量上限统一转换为整数（兼容 ["1", "2"] 形式），无法转换时返回 400
+        try:
+            strategy_ids = list(dict.fromkeys(int(strategy_id) for strategy_id in strategy_ids))
+            limit = int(limit) if limit is not None else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'code': 400,
+                'message': 'strategy_ids必须是整数列表，limit必须是整数'
+            })
+        if limit is not None and limit <= 0:
+            return jsonify({
+                'code': 400,
+                'message': 'limit必须大于0'
+            })
+        
+        result = execution_service.get_executions_by_strategies(strategy_ids, limit)
         
         return jsonify({
             'code': 200,
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 import time
 import platform
 import os
+from ai_robot import ai_metrics_snapshot, get_composite_stats
+from ..utils.metrics import render_metrics
 
 # 记录服务启动时间
 START_TIME = time.time()
@@ -48,7 +50,9 @@ def health_check():
             "python_version": platform.python_version(),
             "platform": platform.platform(),
             "process_id": os.getpid()
-        }
+        },
+        # 应用启动各阶段耗时（毫秒）
+        "startup": current_app.extensions.get('startup_timings')
     }
     
     return jsonify(response_data), 200
@@ -68,6 +72,27 @@ def ping():
         "timestamp": current_time
     }), 200
 
+@health_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    运行指标接口
+    
+    按AI提供方返回调用延迟直方图、token 消耗、重试、Schema 验证失败、超时与接口错误、缓存命中等指标，
+    使用组合处理器时附带各提供方的路由统计
+    
+    Returns:
+        JSON响应，包含各项指标和时间戳
+    """
+    current_time = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    return jsonify({
+        "ai": {
+            "providers": ai_metrics_snapshot(),
+            "composite": get_composite_stats()
+        },
+        "timestamp": current_time
+    }), 200
+
 # 添加根路径的健康检查接口
 @root_health_bp.route('/health', methods=['GET'])
 def root_health_check():
@@ -101,4 +126,17 @@ def root():
         "status": "running",
         "message": "QMT Server is running",
         "timestamp": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
-    }), 200 
\ No newline at end of file
+    }), 200 
+
+@root_health_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus 指标接口
+    
+    以文本格式输出接口请求数与延迟直方图、进行中的请求数、数据库连接池占用、
+    股价更新周期耗时、行情数据源成功率与延迟、AI调用指标
+    
+    Returns:
+        text/plain 响应（Prometheus 文本格式）
+    """
+    return render_metrics()
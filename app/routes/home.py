@@ -12,13 +12,13 @@ logger = logging.getLogger(__name__)
 
 # 创建蓝图
 home_bp = Blueprint('home', __name__)
+strategy_service = StrategyService()
 
 @home_bp.route('/')
 def index():
     """渲染主页"""
     try:
         # 获取策略列表
-        strategy_service = StrategyService()
         strategies = strategy_service.get_all_strategies()
         
         # 渲染模板
@@ -8,6 +8,7 @@ from flask import Blueprint, jsonify, request, current_app
 from ..models import StockPosition, db
 from ..services.position import PositionService
 from ..utils.logger import setup_logger
+from ..utils.serializer import parse_fields
 from datetime import datetime
 
 position_bp = Blueprint('position', __name__, url_prefix='/api/v1')
@@ -19,13 +20,17 @@ def get_positions():
     """
     获取所有持仓信息
     
+    查询参数:
+        fields: 可选，逗号分隔的返回字段列表
+    
     Returns:
         JSON响应，包含所有持仓信息
     """
     try:
         logger.info("【前端触发】开始获取所有持仓信息...")
+        fields = parse_fields(request.args.get('fields'), StockPosition)
         # 获取并更新所有持仓信息
-        positions = position_service.update_all_positions()
+        positions = position_service.update_all_positions(fields)
         
         logger.info(f"【前端触发】成功获取并更新 {len(positions)} 条持仓记录")
         return jsonify({
@@ -34,6 +39,14 @@ def get_positions():
             'data': positions
         })
         
+    except ValueError as e:
+        logger.warning(f"【前端触发】获取持仓列表参数错误: {str(e)}")
+        return jsonify({
+            'code': 400,
+            'message': str(e),
+            'data': None
+        }), 400
+        
     except Exception as e:
         logger.error(f"【前端触发】获取持仓列表失败: {str(e)}")
         return jsonify({
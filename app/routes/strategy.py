@@ -5,11 +5,13 @@
 """
 
 import logging
-from flask import Blueprint, request, render_template, jsonify
+import time
+from flask import Blueprint, Response, current_app, request, render_template, jsonify, stream_with_context
 from ..services.strategy import StrategyService
 from ..utils.response import success_response, error_response
 from ..utils.decorators import handle_exceptions
 from ..models import StockStrategy
+from ..utils.serializer import parse_fields
 
 # 创建蓝图
 strategy_bp = Blueprint('strategy', __name__)
@@ -92,6 +94,176 @@ def analyze_strategy():
         log_response_info(error_response)
         return jsonify(error_response), 500
 
+@strategy_bp.route('/analyze_strategy/batch', methods=['POST'])
+def analyze_strategy_batch():
+    """
+    批量分析策略接口
+
+    以 NDJSON（每行一个 JSON 对象）逐条返回结果：规则解析和缓存命中的结果立即返回，
+    其余按完成顺序返回，最后一行为汇总信息。
+    """
+    log_request_info(request)
+
+    data = request.get_json(silent=True)
+    texts = data.get('strategy_texts') if isinstance(data, dict) else None
+    if not isinstance(texts, list) or not texts or not all(isinstance(item, str) and item.strip() for item in texts):
+        response_data = {
+            'code': 400,
+            'message': 'strategy_texts 必须是非空的策略文本列表',
+            'data': None
+        }
+        log_response_info(response_data)
+        return jsonify(response_data), 400
+
+    max_items = current_app.config.get('AI_BATCH_MAX_ITEMS', 100)
+    if len(texts) > max_items:
+        response_data = {
+            'code': 400,
+            'message': f'单次最多分析 {max_items} 条策略',
+            'data': None
+        }
+        log_response_info(response_data)
+        return jsonify(response_data), 400
+
+    throttle = current_app.extensions['ai_throttle']
+    dumps = current_app.json.dumps
+
+    def generate():
+        succeeded = 0
+        for item in strategy_service.analyze_strategies_batch(texts, throttle):
+            if 'error' not in item:
+                succeeded += 1
+            yield dumps(item) + '\n'
+        logger.info(f"批量分析完成: 共 {len(texts)} 条，成功 {succeeded} 条")
+        yield dumps({'done': True, 'total': len(texts), 'succeeded': succeeded,
+                     'failed': len(texts) - succeeded}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def get_job_manager():
+    """获取当前应用的策略分析任务管理器"""
+    return current_app.extensions['analysis_jobs']
+
+@strategy_bp.route('/analyze_strategy/jobs', methods=['POST'])
+def submit_analysis_job():
+    """提交异步策略分析任务接口，立即返回任务ID"""
+    log_request_info(request)
+
+    data = request.get_json(silent=True)
+    if not data or not data.get('strategy_text'):
+        response_data = {
+            'code': 400,
+            'message': '缺少策略文本',
+            'data': None
+        }
+        log_response_info(response_data)
+        return jsonify(response_data), 400
+
+    try:
+        job = get_job_manager().submit(data['strategy_text'], strategy_service.analyze_strategy)
+    except RuntimeError as e:
+        response_data = {
+            'code': 429,
+            'message': str(e),
+            'data': None
+        }
+        log_response_info(response_data)
+        return jsonify(response_data), 429
+
+    response_data = {
+        'code': 202,
+        'message': '策略分析任务已提交',
+        'data': {
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'{request.path}/{job.id}',
+            'events_url': f'{request.path}/{job.id}/events'
+        }
+    }
+    log_response_info(response_data)
+    return jsonify(response_data), 202
+
+@strategy_bp.route('/analyze_strategy/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """查询策略分析任务状态及结果接口"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({
+            'code': 404,
+            'message': '任务不存在或已过期',
+            'data': None
+        }), 404
+
+    return jsonify({
+        'code': 200,
+        'message': '查询成功',
+        'data': job.to_dict()
+    })
+
+@strategy_bp.route('/analyze_strategy/jobs/<job_id>/events', methods=['GET'])
+def stream_analysis_job(job_id):
+    """
+    以 Server-Sent Events 推送策略分析任务结果
+
+    连接建立后先推送一次 status 事件；启用AI流式输出（AI_STREAM=true）时推送 progress 事件，
+    包含已收到的模型输出；任务结束时推送 result 事件并关闭连接。
+    等待期间定时发送注释行作为心跳，超过最长等待时间后推送 timeout 事件。
+    每个连接占用一个工作线程，连接数达到 AI_JOB_SSE_MAX_SUBSCRIBERS 时返回 429，客户端改为轮询任务状态。
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'code': 404,
+            'message': '任务不存在或已过期',
+            'data': None
+        }), 404
+    if not manager.acquire_subscriber():
+        return jsonify({
+            'code': 429,
+            'message': '任务推送连接数已满，请轮询任务状态',
+            'data': {'job_id': job.id, 'status_url': request.path.rsplit('/', 1)[0]}
+        }), 429
+
+    heartbeat = current_app.config.get('AI_JOB_SSE_HEARTBEAT', 15)
+    timeout = current_app.config.get('AI_JOB_SSE_TIMEOUT', 120)
+    progress_interval = current_app.config.get('AI_JOB_SSE_PROGRESS_INTERVAL', 0.2)
+    dumps = current_app.json.dumps
+
+    def format_event(event, data):
+        return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+    def generate():
+        yield format_event('status', {'job_id': job.id, 'status': job.status})
+        deadline = time.monotonic() + timeout
+        version = job.version
+        while not job.done:
+            current = job.wait_for_update(version, heartbeat)
+            if job.done:
+                break
+            if current == version:
+                if time.monotonic() >= deadline:
+                    yield format_event('timeout', {'job_id': job.id, 'status': job.status})
+                    return
+                yield ': keep-alive\n\n'
+                continue
+            version = current
+            yield format_event('progress', {'job_id': job.id, 'status': job.status, 'partial': job.partial})
+            # 合并短时间内的多次进度更新，任务结束时立即返回
+            job.wait(progress_interval)
+        yield format_event('result', job.to_dict())
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # 推送结束或客户端断开连接时释放名额
+    response.call_on_close(manager.release_subscriber)
+    return response
+
 @strategy_bp.route('/strategies', methods=['GET'])
 @handle_exceptions
 def get_strategies():
@@ -102,9 +274,22 @@ def get_strategies():
         # 获取排序参数，默认按更新时间降序
         sort_by = request.args.get('sort_by', 'updated_at')  # 可选值: updated_at, created_at
         order = request.args.get('order', 'desc')  # 可选值: desc, asc
+        # 只返回指定字段，如 fields=id,stock_code,action
+        fields = parse_fields(request.args.get('fields'), StockStrategy)
         
         # 获取策略列表
-        strategies = strategy_service.get_all_strategies(sort_by, order)
+        strategies = strategy_service.get_all_strategies(sort_by, order, fields)
+        
+        response_data = {
+            'code': 200,
+            'message': 'success',
+            'data': strategies
+        }
+        
+        # 指定字段时返回的数据不完整，跳过逐条日志
+        if fields:
+            log_response_info(response_data)
+            return jsonify(response_data)
         
         # 记录详细日志
         logger.info("获取所有策略列表（排序规则：1.是否有效 2.更新时间 3.创建时间）:")
@@ -122,12 +307,16 @@ def get_strategies():
         logger.info(f"共获取到 {len(strategies)} 条记录")
         logger.info("="*50)
         
+        return jsonify(response_data)
+        
+    except ValueError as e:
         response_data = {
-            'code': 200,
-            'message': 'success',
-            'data': strategies
+            'code': 400,
+            'message': str(e),
+            'data': None
         }
-        return jsonify(response_data)
+        log_response_info(response_data)
+        return jsonify(response_data), 400
         
     except Exception as e:
         error_data = {
@@ -317,7 +506,8 @@ def search_strategies():
             'action': request.args.get('action'),
             'sort_by': request.args.get('sort_by', 'updated_at'),
             'order': request.args.get('order', 'desc'),
-            'is_active': None if request.args.get('is_active') is None else request.args.get('is_active').lower() == 'true'
+            'is_active': None if request.args.get('is_active') is None else request.args.get('is_active').lower() == 'true',
+            'fields': parse_fields(request.args.get('fields'), StockStrategy)
         }
         
         # 调用服务层方法
@@ -327,6 +517,10 @@ def search_strategies():
         log_response_info(response.get_json())
         return response
         
+    except ValueError as e:
+        response = error_response(str(e), 400)
+        log_response_info(response[0].get_json())
+        return response
     except Exception as e:
         response = error_response(f'查询策略列表失败: {str(e)}', 500)
         log_response_info(response.get_json())
@@ -6,6 +6,7 @@
 
 import logging
 from typing import Dict, Any, Optional
+from sqlalchemy import func
 from ..models import db
 from ..models.account import AccountFunds
 from ..models.position import StockPosition
@@ -15,6 +16,12 @@ logger = logging.getLogger(__name__)
 class AccountService:
     """账户资金服务类"""
     
+    @staticmethod
+    def _total_market_value() -> float:
+        """在数据库中汇总所有持仓的市值，不加载持仓记录"""
+        query = db.select(func.coalesce(func.sum(StockPosition.market_value), 0))
+        return db.session.execute(query).scalar()
+    
     def get_account_funds(self) -> Dict[str, Any]:
         """
         获取账户资金信息，同时更新资产总值
@@ -39,8 +46,7 @@ class AccountService:
                 db.session.commit()
             
             # 计算所有持仓的市值总和
-            positions = StockPosition.query.all()
-            total_market_value = sum(position.market_value or 0 for position in positions)
+            total_market_value = self._total_market_value()
             
             # 更新资产总值（可用资金 + 冻结资金 + 持仓市值）
             account.total_assets = account.available_funds + account.frozen_funds + total_market_value
@@ -76,8 +82,7 @@ class AccountService:
             account.frozen_funds = frozen_funds
             
             # 更新总资产
-            positions = StockPosition.query.all()
-            total_market_value = sum(position.market_value or 0 for position in positions)
+            total_market_value = self._total_market_value()
             account.total_assets = available_funds + frozen_funds + total_market_value
             # 更新总盈亏和收益率
             account.update_profit()
@@ -0,0 +1,428 @@
+"""
+策略分析任务服务模块
+
+此模块提供异步策略分析任务：提交后立即返回任务ID，由有界线程池在后台调用AI解析，
+客户端通过轮询或 Server-Sent Events 获取结果，避免长时间占用 Web 工作线程。
+
+任务在提交它的进程中执行，状态和结果同时写入 analysis_jobs 表，
+多进程部署时其他工作进程收到的查询从数据库读取（流式进度只在提交任务的进程中可见）
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+import pytz
+from flask import Flask
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..models import db
+from ..models.analysis_job import AnalysisJobRecord
+from ..utils.serializer import format_datetime
+
+logger = logging.getLogger(__name__)
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+
+
+def _localize(value: Optional[datetime]) -> Optional[datetime]:
+    """将数据库读取的时间（不带时区，按中国时区保存）转换为带时区的时间"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return CN_TIMEZONE.localize(value)
+
+
+class AnalysisJob:
+    """策略分析任务"""
+
+    def __init__(self, strategy_text: str):
+        """
+        初始化任务
+
+        Args:
+            strategy_text: 策略文本
+        """
+        self.id = uuid.uuid4().hex
+        self.strategy_text = strategy_text
+        self.status = 'pending'  # pending/running/succeeded/failed
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(CN_TIMEZONE)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        # AI流式输出时已收到的文本，version 在进度或状态变化时递增
+        self.partial = ''
+        self.version = 0
+        self._done = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        """任务是否已结束"""
+        return self._done.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待任务结束
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 任务是否已结束
+        """
+        return self._done.wait(timeout)
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """
+        等待任务进度或状态变化
+
+        Args:
+            version: 调用方已处理的版本号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            int: 当前版本号，与传入值相同表示超时未变化
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def update_progress(self, partial: str):
+        """
+        更新AI流式输出进度
+
+        Args:
+            partial: 已收到的全部文本
+        """
+        with self._changed:
+            self.partial = partial
+            self.version += 1
+            self._changed.notify_all()
+
+    def finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+               finished_at: Optional[datetime] = None):
+        """标记任务结束"""
+        with self._changed:
+            self.result = result
+            self.error = error
+            self.status = 'failed' if error else 'succeeded'
+            self.finished_at = finished_at or datetime.now(CN_TIMEZONE)
+            self.version += 1
+            self._done.set()
+            self._changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """将任务转换为字典"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'partial': None if self.done else self.partial,
+            'created_at': format_datetime(self.created_at),
+            'started_at': format_datetime(self.started_at),
+            'finished_at': format_datetime(self.finished_at),
+            'duration': round((self.finished_at - self.created_at).total_seconds(), 3) if self.finished_at else None
+        }
+
+
+class StoredAnalysisJob(AnalysisJob):
+    """其他进程提交的任务（从数据库读取的快照，等待更新时定时重新读取）"""
+
+    def __init__(self, manager: 'AnalysisJobManager', record: AnalysisJobRecord):
+        """
+        根据数据库记录创建任务快照
+
+        Args:
+            manager: 任务管理器（用于重新读取任务状态）
+            record: 任务记录
+        """
+        super().__init__('')
+        self.id = record.id
+        self._manager = manager
+        self._apply(record)
+
+    def _apply(self, record: AnalysisJobRecord):
+        """使用数据库记录更新任务状态，状态变化时递增版本号"""
+        if record.status != self.status:
+            self.version += 1
+        self.status = record.status
+        self.result = json.loads(record.result) if record.result else None
+        self.error = record.error
+        self.created_at = _localize(record.created_at)
+        self.started_at = _localize(record.started_at)
+        self.finished_at = _localize(record.finished_at)
+        if record.finished_at is not None:
+            self._done.set()
+
+    def refresh(self):
+        """重新读取任务状态（任务已过期被清理时保持当前状态）"""
+        record = self._manager.load_record(self.id)
+        if record is not None:
+            self._apply(record)
+
+    def wait(self, timeout: float) -> bool:
+        """按 poll_interval 重新读取状态，直到任务结束或超时"""
+        deadline = time.monotonic() + timeout
+        while not self.done and time.monotonic() < deadline:
+            time.sleep(max(0, min(self._manager.poll_interval, deadline - time.monotonic())))
+            self.refresh()
+        return self.done
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """按 poll_interval 重新读取状态，直到状态变化或超时"""
+        deadline = time.monotonic() + timeout
+        while self.version == version and time.monotonic() < deadline:
+            time.sleep(max(0, min(self._manager.poll_interval, deadline - time.monotonic())))
+            self.refresh()
+        return self.version
+
+
+class AnalysisJobManager:
+    """策略分析任务管理器"""
+
+    # 每提交多少个任务清理一次数据库中的过期任务
+    PURGE_EVERY = 50
+
+    def __init__(self, app: Flask, max_workers: int = 4, max_pending: int = 100, result_ttl: int = 3600,
+                 poll_interval: float = 1.0, max_subscribers: int = 4):
+        """
+        初始化任务管理器
+
+        Args:
+            app: Flask应用实例，后台任务在其应用上下文中运行
+            max_workers: 并发执行的任务数
+            max_pending: 本进程未完成任务的上限，超出时拒绝提交
+            result_ttl: 已完成任务的保留时间（秒）
+            poll_interval: 等待其他进程的任务时重新读取数据库的间隔（秒）
+            max_subscribers: 本进程同时保持的 SSE 连接数上限（每个连接占用一个 Web 工作线程）
+        """
+        self.app = app
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+        self._subscribers = 0
+        self._submitted = 0
+
+    def submit(self, strategy_text: str, analyze: Callable[..., Dict[str, Any]]) -> AnalysisJob:
+        """
+        提交分析任务
+
+        Args:
+            strategy_text: 策略文本
+            analyze: 分析函数，如 StrategyService.analyze_strategy，第二个参数为进度回调
+
+        Returns:
+            AnalysisJob: 新建的任务
+
+        Raises:
+            RuntimeError: 未完成任务数达到上限时抛出
+        """
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise RuntimeError(f"分析任务排队已满（{pending}个未完成），请稍后重试")
+            job = AnalysisJob(strategy_text)
+            self._jobs[job.id] = job
+            self._submitted += 1
+            purge = self._submitted % self.PURGE_EVERY == 0
+
+        if purge:
+            self.purge_expired_records()
+        self._save(job)
+        self._executor.submit(self._run, job, analyze)
+        logger.info(f"提交策略分析任务: {job.id}（未完成任务 {pending + 1} 个）")
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Optional[AnalysisJob]: 任务，不存在或已过期时返回 None；
+                其他进程提交的任务返回从数据库读取的 StoredAnalysisJob
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        record = self.load_record(job_id)
+        if record is None:
+            return None
+        if record.finished_at is not None and _localize(record.finished_at) < self._expire_deadline():
+            return None
+        return StoredAnalysisJob(self, record)
+
+    def load_record(self, job_id: str) -> Optional[AnalysisJobRecord]:
+        """
+        从数据库读取任务记录
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Optional[AnalysisJobRecord]: 任务记录，不存在或读取失败时返回 None
+        """
+        with self.app.app_context():
+            try:
+                record = db.session.get(AnalysisJobRecord, job_id)
+                if record is not None:
+                    db.session.expunge(record)
+                return record
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.warning(f"读取策略分析任务失败: {job_id}, {str(e)}")
+                return None
+
+    def acquire_subscriber(self) -> bool:
+        """
+        占用一个 SSE 连接名额
+
+        Returns:
+            bool: 未达到 max_subscribers 时为 True，调用方结束时需调用 release_subscriber
+        """
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                return False
+            self._subscribers += 1
+            return True
+
+    def release_subscriber(self):
+        """释放 SSE 连接名额"""
+        with self._lock:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def shutdown(self, wait: bool = False):
+        """
+        关闭任务线程池
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("策略分析任务线程池已关闭")
+
+    def _run(self, job: AnalysisJob, analyze: Callable[..., Dict[str, Any]]):
+        """在应用上下文中执行任务，结果先写入数据库再通知本进程的等待方"""
+        job.status = 'running'
+        job.started_at = datetime.now(CN_TIMEZONE)
+        self._save(job)
+        try:
+            with self.app.app_context():
+                result = analyze(job.strategy_text, job.update_progress)
+            outcome = {'error': result['error']} if 'error' in result else {'result': result}
+        except Exception as e:
+            logger.error(f"策略分析任务失败: {job.id}, {str(e)}", exc_info=True)
+            outcome = {'error': f"策略分析失败: {str(e)}"}
+
+        finished_at = datetime.now(CN_TIMEZONE)
+        self._save(job, status='failed' if 'error' in outcome else 'succeeded', finished_at=finished_at, **outcome)
+        job.finish(finished_at=finished_at, **outcome)
+        logger.info(f"策略分析任务完成: {job.id}，状态: {job.status}，耗时 {(job.finished_at - job.started_at).total_seconds():.2f}秒")
+
+    def _save(self, job: AnalysisJob, **changes):
+        """
+        将任务状态写入数据库，写入失败时只记录警告（本进程内的查询不受影响）
+
+        Args:
+            job: 任务
+            **changes: 尚未设置到任务上的字段（status、result、error、finished_at）
+        """
+        values = {
+            'status': job.status,
+            'result': job.result,
+            'error': job.error,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+            **changes
+        }
+        result = values.pop('result')
+        with self.app.app_context():
+            try:
+                db.session.merge(AnalysisJobRecord(
+                    id=job.id,
+                    created_at=job.created_at,
+                    result=json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    **values
+                ))
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.warning(f"保存策略分析任务失败: {job.id}, {str(e)}")
+
+    def _expire_deadline(self) -> datetime:
+        """已完成任务的过期时间点，结束时间早于该时间的任务视为过期"""
+        return datetime.now(CN_TIMEZONE) - timedelta(seconds=self.result_ttl)
+
+    def _purge_expired(self):
+        """清理过期的已完成任务（调用方需持有锁）"""
+        deadline = self._expire_deadline()
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < deadline]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def purge_expired_records(self) -> int:
+        """
+        删除数据库中过期的任务记录（包括进程退出后未能结束、提交时间早于保留时间的任务）
+
+        Returns:
+            int: 删除的记录数
+        """
+        # 数据库中的时间不带时区，按中国时区比较
+        deadline = self._expire_deadline().replace(tzinfo=None)
+        with self.app.app_context():
+            try:
+                removed = AnalysisJobRecord.query.filter(or_(
+                    AnalysisJobRecord.finished_at < deadline,
+                    and_(AnalysisJobRecord.finished_at.is_(None), AnalysisJobRecord.created_at < deadline)
+                )).delete(synchronize_session=False)
+                db.session.commit()
+                return removed
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.warning(f"清理策略分析任务失败: {str(e)}")
+                return 0
+
+
+def init_analysis_jobs(app: Flask) -> AnalysisJobManager:
+    """
+    为应用创建策略分析任务管理器
+
+    相关配置:
+        AI_JOB_WORKERS: 并发执行的任务数
+        AI_JOB_MAX_PENDING: 未完成任务的上限
+        AI_JOB_RESULT_TTL: 已完成任务的保留时间（秒）
+        AI_JOB_POLL_INTERVAL: 查询其他进程的任务时重新读取数据库的间隔（秒）
+        AI_JOB_SSE_MAX_SUBSCRIBERS: 每个进程同时保持的 SSE 连接数上限
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        AnalysisJobManager: 任务管理器
+    """
+    manager = AnalysisJobManager(
+        app,
+        max_workers=app.config.get('AI_JOB_WORKERS', 4),
+        max_pending=app.config.get('AI_JOB_MAX_PENDING', 100),
+        result_ttl=app.config.get('AI_JOB_RESULT_TTL', 3600),
+        poll_interval=app.config.get('AI_JOB_POLL_INTERVAL', 1.0),
+        max_subscribers=app.config.get('AI_JOB_SSE_MAX_SUBSCRIBERS', 4)
+    )
+    app.extensions['analysis_jobs'] = manager
+    return manager
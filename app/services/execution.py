@@ -7,10 +7,13 @@
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from sqlalchemy import func
 from ..models import db
 from ..models.execution import StrategyExecution
 from ..models.stock import StockStrategy
 from ..models.position import StockPosition
+from ..utils.serializer import serialize_rows, load_only_option
+from ..utils.db_routing import use_read_replica
 from .position import PositionService
 
 logger = logging.getLogger(__name__)
@@ -124,15 +127,12 @@ class ExecutionService:
                 db.session.commit()
                 return execution.to_dict()
             
-            # 获取该策略的所有执行记录（包括当前新增的）
-            query = db.select(StrategyExecution).filter_by(
-                strategy_id=strategy.id,
-                execution_result='success'
+            # 计算该策略已执行的总量（包括当前新增的记录，查询前会自动 flush）
+            query = db.select(func.coalesce(func.sum(StrategyExecution.volume), 0)).where(
+                StrategyExecution.strategy_id == strategy.id,
+                StrategyExecution.execution_result == 'success'
             )
-            all_executions = db.session.execute(query).scalars().all()
-            
-            # 计算已执行的总量（包括当前执行量）
-            total_executed_volume = sum(e.volume for e in all_executions)
+            total_executed_volume = db.session.execute(query).scalar()
             
             # 计算目标交易量
             target_volume = self._calculate_trade_volume(strategy, data['execution_price'])
@@ -286,6 +286,7 @@ class ExecutionService:
             logger.error(f"获取执行记录失败: {str(e)}", exc_info=True)
             raise
     
+    @use_read_replica
     def get_executions(self, 
         strategy_id: int = None,
         stock_code: str = None,
@@ -295,7 +296,8 @@ class ExecutionService:
         result: str = None,
         sort_by: str = 'execution_time',
         order: str = 'desc',
-        limit: int = None
+        limit: int = None,
+        fields: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
         查询执行记录列表
@@ -310,6 +312,7 @@ class ExecutionService:
             sort_by: 排序字段
             order: 排序方式
             limit: 限制返回数量
+            fields: 只返回指定字段，为 None 时返回全部字段
             
         Returns:
             List[Dict[str, Any]]: 执行记录列表
@@ -318,6 +321,10 @@ class ExecutionService:
             # 构建查询
             query = db.select(StrategyExecution)
             
+            # 字段投影下推到 SELECT
+            if fields:
+                query = query.options(load_only_option(StrategyExecution, fields))
+            
             # 添加过滤条件
             if strategy_id:
                 query = query.filter(StrategyExecution.strategy_id == strategy_id)
@@ -348,12 +355,58 @@ class ExecutionService:
             
             # 执行查询
             executions = db.session.execute(query).scalars().all()
-            return [execution.to_dict() for execution in executions]
+            return serialize_rows(executions, fields)
             
         except Exception as e:
             logger.error(f"查询执行记录列表失败: {str(e)}", exc_info=True)
             raise
     
+    @use_read_replica
+    def get_executions_by_strategies(self, strategy_ids: List[int],
+                                     limit: int = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        批量查询多个策略的执行记录
+        
+        使用一条 IN 查询取出全部策略的记录，再按策略分组，避免逐个策略查询；
+        指定 limit 时在 SQL 中按策略分区编号（ROW_NUMBER），每个策略只取最近的 limit 条。
+        
+        Args:
+            strategy_ids: 策略ID列表
+            limit: 每个策略返回的记录数上限
+            
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: 策略ID到执行记录列表的映射（按执行时间倒序），没有记录的策略为空列表
+        """
+        result = {strategy_id: [] for strategy_id in strategy_ids}
+        if not result:
+            return result
+        
+        newest_first = (StrategyExecution.execution_time.desc(), StrategyExecution.id.desc())
+        query = db.select(StrategyExecution).filter(
+            StrategyExecution.strategy_id.in_(list(result))
+        )
+        if limit:
+            row_number = func.row_number().over(
+                partition_by=StrategyExecution.strategy_id, order_by=newest_first
+            ).label('row_number')
+            ranked = db.select(StrategyExecution.id, row_number).filter(
+                StrategyExecution.strategy_id.in_(list(result))
+            ).subquery()
+            query = query.join(ranked, StrategyExecution.id == ranked.c.id).filter(ranked.c.row_number <= limit)
+        query = query.order_by(StrategyExecution.strategy_id, *newest_first)
+        
+        for execution in db.session.execute(query).scalars():
+            result[execution.strategy_id].append({
+                'execution_id': execution.id,
+                'strategy_id': execution.strategy_id,
+                'execution_time': execution.execution_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'execution_price': execution.execution_price,
+                'volume': execution.volume,
+                'execution_result': execution.execution_result,
+                'created_at': execution.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        return result
+    
     def update_execution(self, execution_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         更新执行记录
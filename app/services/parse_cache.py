@@ -0,0 +1,189 @@
+"""
+策略解析缓存服务模块
+
+此模块提供AI策略解析结果的持久化缓存，缓存键由规范化文本、AI提供方和提示词版本共同决定
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+import pytz
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..models import db
+from ..models.parse_cache import StrategyParseCache
+
+logger = logging.getLogger(__name__)
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+
+# 连续空白字符
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_strategy_text(text: str) -> str:
+    """
+    规范化策略文本
+
+    统一全角/半角字符，并将连续空白压缩为单个空格，使仅空白不同的文本得到相同的缓存键。
+
+    Args:
+        text: 原始策略文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def make_cache_key(text: str, provider: str, prompt_version: str) -> str:
+    """
+    计算缓存键
+
+    Args:
+        text: 原始策略文本
+        provider: AI提供方及模型
+        prompt_version: 提示词版本
+
+    Returns:
+        str: 64位十六进制SHA256摘要
+    """
+    raw = f"{provider}\n{prompt_version}\n{normalize_strategy_text(text)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ParseCacheService:
+    """策略解析缓存服务类"""
+
+    # 每写入多少次执行一次过期清理和容量淘汰
+    EVICT_EVERY = 50
+
+    def __init__(self):
+        """初始化写入计数"""
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用解析缓存"""
+        return current_app.config.get('AI_CACHE_ENABLED', True)
+
+    def get(self, text: str, provider: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的解析结果
+
+        Args:
+            text: 原始策略文本
+            provider: AI提供方及模型
+            prompt_version: 提示词版本
+
+        Returns:
+            Optional[Dict[str, Any]]: 命中时返回解析结果，未命中或已过期返回 None
+        """
+        if not self.enabled:
+            return None
+
+        cache_key = make_cache_key(text, provider, prompt_version)
+        try:
+            entry = StrategyParseCache.query.filter_by(cache_key=cache_key).first()
+            if entry is None:
+                return None
+
+            now = datetime.now(CN_TIMEZONE)
+            if entry.expires_at <= now.replace(tzinfo=None):
+                logger.info(f"解析缓存已过期: {cache_key[:12]}")
+                db.session.delete(entry)
+                db.session.commit()
+                return None
+
+            # 更新命中统计，用于LRU淘汰
+            entry.hit_count += 1
+            entry.last_hit_at = now
+            result = json.loads(entry.result)
+            db.session.commit()
+            logger.info(f"命中解析缓存: {cache_key[:12]}（{provider}/{prompt_version}，累计命中 {entry.hit_count} 次）")
+            return result
+
+        except (SQLAlchemyError, ValueError) as e:
+            db.session.rollback()
+            logger.warning(f"读取解析缓存失败，将直接调用AI: {str(e)}")
+            return None
+
+    def set(self, text: str, provider: str, prompt_version: str, result: Dict[str, Any]):
+        """
+        写入解析结果
+
+        只缓存成功的解析结果，包含 error 字段的结果不缓存。
+
+        Args:
+            text: 原始策略文本
+            provider: AI提供方及模型
+            prompt_version: 提示词版本
+            result: 解析结果
+        """
+        if not self.enabled or not result or 'error' in result:
+            return
+
+        cache_key = make_cache_key(text, provider, prompt_version)
+        now = datetime.now(CN_TIMEZONE)
+        ttl = current_app.config.get('AI_CACHE_TTL', 7 * 24 * 3600)
+        try:
+            entry = StrategyParseCache.query.filter_by(cache_key=cache_key).first()
+            if entry is None:
+                entry = StrategyParseCache(cache_key=cache_key, provider=provider, prompt_version=prompt_version)
+                db.session.add(entry)
+            entry.result = json.dumps(result, ensure_ascii=False)
+            entry.expires_at = now + timedelta(seconds=ttl)
+            entry.last_hit_at = now
+            db.session.commit()
+        except IntegrityError:
+            # 并发请求已写入相同的缓存键
+            db.session.rollback()
+            return
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"写入解析缓存失败: {str(e)}")
+            return
+
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        清理过期缓存，并按最近命中时间淘汰超出容量的缓存
+
+        Returns:
+            int: 删除的记录数
+        """
+        max_entries = current_app.config.get('AI_CACHE_MAX_ENTRIES', 10000)
+        now = datetime.now(CN_TIMEZONE).replace(tzinfo=None)
+        try:
+            removed = StrategyParseCache.query.filter(
+                StrategyParseCache.expires_at <= now
+            ).delete(synchronize_session=False)
+
+            overflow = StrategyParseCache.query.count() - max_entries
+            if overflow > 0:
+                stale_ids = [
+                    row.id for row in db.session.query(StrategyParseCache.id)
+                    .order_by(StrategyParseCache.last_hit_at.asc())
+                    .limit(overflow)
+                ]
+                removed += StrategyParseCache.query.filter(
+                    StrategyParseCache.id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+
+            db.session.commit()
+            if removed:
+                logger.info(f"解析缓存清理完成，共删除 {removed} 条记录")
+            return removed
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"清理解析缓存失败: {str(e)}")
+            return 0
@@ -4,25 +4,200 @@
 此模块提供持仓相关的业务逻辑处理
 """
 
+import asyncio
+import json
 import logging
 import requests
 import time
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Callable, Tuple
+
+from flask import Flask
 from ..models import db
 from ..models.position import StockPosition
+from ..utils.serializer import serialize_rows, load_only_option
+from ..utils.db_routing import use_read_replica
+from ..utils.async_support import run_in_app_context
+from ..utils.metrics import observe_quote_latency, record_quote_result
 import random
 from decimal import Decimal
 
+if TYPE_CHECKING:
+    # 仅异步接口使用，运行时在异步方法内导入，同步部署无需加载
+    import anyio
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 class PositionService:
     """持仓服务类"""
     
+    # 更新市值时必须加载的字段
+    MARKET_VALUE_COLUMNS = ('stock_code', 'total_volume', 'dynamic_cost')
+    
     # 股票价格缓存
     __price_cache = {}
     # 缓存过期时间（秒）
     CACHE_EXPIRY = 60  # 1分钟缓存
     
+    # 行情请求的通用请求头
+    QUOTE_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+        'Connection': 'keep-alive'
+    }
+    # 数据源名称（日志使用）
+    QUOTE_SOURCE_NAMES = {'sina': '新浪', 'tencent': '腾讯', 'eastmoney': '东方财富'}
+    # 异步批量获取价格时同时进行的行情请求数
+    ASYNC_QUOTE_CONCURRENCY = 20
+    
+    @staticmethod
+    def _request_quote(source: str, url: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        请求行情数据源并记录请求耗时，超时和请求异常计入该数据源的对应结果
+        
+        Args:
+            source: 数据源名称
+            url: 请求地址
+            headers: 请求头
+            
+        Returns:
+            requests.Response: 响应对象
+        """
+        start = time.perf_counter()
+        try:
+            return requests.get(url, headers=headers, timeout=5)  # 设置5秒超时
+        except requests.Timeout:
+            record_quote_result(source, 'timeout')
+            raise
+        except requests.RequestException:
+            record_quote_result(source, 'error')
+            raise
+        finally:
+            observe_quote_latency(source, time.perf_counter() - start)
+    
+    @staticmethod
+    async def _request_quote_async(source: str, url: str, headers: Dict[str, str],
+                                   client: 'httpx.AsyncClient') -> 'httpx.Response':
+        """
+        异步请求行情数据源，记录方式与 _request_quote 相同
+        
+        Args:
+            source: 数据源名称
+            url: 请求地址
+            headers: 请求头
+            client: 共享的异步 HTTP 客户端
+            
+        Returns:
+            httpx.Response: 响应对象
+        """
+        import httpx
+
+        start = time.perf_counter()
+        try:
+            return await client.get(url, headers=headers, timeout=5)
+        except httpx.TimeoutException:
+            record_quote_result(source, 'timeout')
+            raise
+        except httpx.HTTPError:
+            record_quote_result(source, 'error')
+            raise
+        finally:
+            observe_quote_latency(source, time.perf_counter() - start)
+    
+    def _quote_requests(self, stock_code: str) -> List[Tuple[str, str, Dict[str, str], Callable[[bytes], float]]]:
+        """
+        按优先顺序生成各数据源的请求（新浪、腾讯、东方财富）
+        
+        Args:
+            stock_code: 股票代码
+            
+        Returns:
+            List[Tuple]: (数据源名称, 请求地址, 请求头, 从响应内容解析价格的函数)，解析不到价格时函数返回 0
+        """
+        # 处理港股代码
+        if len(stock_code) == 4 and stock_code.isdigit():
+            stock_code = f"hk0{stock_code}"
+        elif len(stock_code) == 5 and stock_code.startswith('0') and stock_code[1:].isdigit():
+            stock_code = f"hk{stock_code}"
+        
+        # 判断股票市场
+        if stock_code.startswith('hk'):
+            market = "hk"
+            full_code = stock_code
+        else:
+            market = "sh" if stock_code.startswith(('6', '9')) else "sz"
+            full_code = f"{market}{stock_code}"
+        
+        def parse_sina(content: bytes) -> float:
+            text = content.decode('gbk')  # 新浪接口使用GBK编码
+            if 'FAILED' in text:
+                return 0
+            data = text.split('=')[1].strip('"').split(',')
+            if len(data) <= 3:
+                return 0
+            return float(data[6] if market == "hk" else data[3])  # 港股价格在第7个位置
+        
+        def parse_tencent(content: bytes) -> float:
+            text = content.decode('gbk')  # 腾讯接口也使用GBK编码
+            if 'v_' not in text:  # 确认返回了有效数据
+                return 0
+            data = text.split('~')
+            return float(data[3]) if len(data) > 3 else 0
+        
+        def parse_eastmoney(content: bytes) -> float:
+            data = json.loads(content)
+            if 'data' in data and 'f43' in data['data']:
+                return float(data['data']['f43']) / 100  # 东方财富的价格需要除以100
+            return 0
+        
+        market_id = '1' if market == 'sh' else ('0' if market == 'sz' else '116')  # 港股市场ID为116
+        return [
+            ('sina', f"https://hq.sinajs.cn/list={full_code}",
+             {**self.QUOTE_HEADERS, 'Referer': 'https://finance.sina.com.cn'}, parse_sina),
+            ('tencent', f"https://qt.gtimg.cn/q={full_code}",
+             {**self.QUOTE_HEADERS, 'Referer': 'https://finance.qq.com'}, parse_tencent),
+            ('eastmoney', f"https://push2.eastmoney.com/api/qt/stock/get?secid={market_id}.{stock_code.replace('hk', '')}",
+             {**self.QUOTE_HEADERS, 'Referer': 'https://quote.eastmoney.com'}, parse_eastmoney),
+        ]
+    
+    def _get_cached_price(self, stock_code: str) -> Optional[float]:
+        """读取未过期的缓存价格"""
+        cache_item = self.__price_cache.get(stock_code)
+        # 如果缓存未过期，返回缓存的价格
+        if cache_item and time.time() - cache_item['timestamp'] < self.CACHE_EXPIRY:
+            logger.debug(f"从缓存获取股票 {stock_code} 的价格: {cache_item['price']}")
+            return cache_item['price']
+        return None
+    
+    def _read_quote(self, stock_code: str, source: str, response, parse: Callable[[bytes], float]) -> Optional[float]:
+        """
+        从行情响应中解析价格，有效时写入缓存
+        
+        Args:
+            stock_code: 股票代码
+            source: 数据源名称
+            response: requests 或 httpx 的响应对象
+            parse: 价格解析函数
+            
+        Returns:
+            Optional[float]: 有效价格，响应中没有有效价格时返回 None
+        """
+        if response.status_code == 200:
+            latest_price = parse(response.content)
+            if latest_price > 0:  # 确保价格有效
+                logger.info(f"从{self.QUOTE_SOURCE_NAMES[source]}获取到股票 {stock_code} 的最新价格: {latest_price}")
+                record_quote_result(source, 'success')
+                # 更新缓存
+                self.__price_cache[stock_code] = {
+                    'price': latest_price,
+                    'timestamp': time.time()
+                }
+                return latest_price
+        
+        record_quote_result(source, 'empty')
+        return None
+    
     def get_real_time_price(self, stock_code: str) -> Optional[float]:
         """
         获取股票实时价格
@@ -33,125 +208,65 @@ class PositionService:
         Returns:
             Optional[float]: 股票最新价格，如果获取失败则返回 None
         """
-        # 检查缓存
-        if stock_code in self.__price_cache:
-            cache_item = self.__price_cache[stock_code]
-            # 如果缓存未过期，返回缓存的价格
-            if time.time() - cache_item['timestamp'] < self.CACHE_EXPIRY:
-                logger.debug(f"从缓存获取股票 {stock_code} 的价格: {cache_item['price']}")
-                return cache_item['price']
+        cached_price = self._get_cached_price(stock_code)
+        if cached_price is not None:
+            return cached_price
         
         try:
-            # 处理港股代码
-            if len(stock_code) == 4 and stock_code.isdigit():
-                stock_code = f"hk0{stock_code}"
-            elif len(stock_code) == 5 and stock_code.startswith('0') and stock_code[1:].isdigit():
-                stock_code = f"hk{stock_code}"
-            
-            # 判断股票市场
-            if stock_code.startswith('hk'):
-                market = "hk"
-                full_code = stock_code
-            else:
-                market = "sh" if stock_code.startswith(('6', '9')) else "sz"
-                full_code = f"{market}{stock_code}"
+            # 依次尝试新浪、腾讯、东方财富接口
+            for source, url, headers, parse in self._quote_requests(stock_code):
+                response = self._request_quote(source, url, headers)
+                latest_price = self._read_quote(stock_code, source, response, parse)
+                if latest_price is not None:
+                    return latest_price
             
-            # 设置通用请求头
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Connection': 'keep-alive'
-            }
-            
-            # 尝试从新浪接口获取数据
-            sina_headers = headers.copy()
-            sina_headers.update({
-                'Referer': 'https://finance.sina.com.cn'
-            })
-            
-            response = requests.get(
-                f"https://hq.sinajs.cn/list={full_code}",
-                headers=sina_headers,
-                timeout=5  # 设置5秒超时
-            )
-            
-            if response.status_code == 200:
-                # 解析返回数据
-                content = response.content.decode('gbk')  # 新浪接口使用GBK编码
-                if 'FAILED' not in content:
-                    data = content.split('=')[1].strip('"').split(',')
-                    if len(data) > 3:
-                        latest_price = float(data[6] if market == "hk" else data[3])  # 港股价格在第7个位置
-                        if latest_price > 0:  # 确保价格有效
-                            logger.info(f"从新浪获取到股票 {stock_code} 的最新价格: {latest_price}")
-                            # 更新缓存
-                            self.__price_cache[stock_code] = {
-                                'price': latest_price,
-                                'timestamp': time.time()
-                            }
-                            return latest_price
-            
-            # 如果新浪接口失败，尝试腾讯接口
-            tencent_headers = headers.copy()
-            tencent_headers.update({
-                'Referer': 'https://finance.qq.com'
-            })
-            
-            response = requests.get(
-                f"https://qt.gtimg.cn/q={full_code}",
-                headers=tencent_headers,
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                content = response.content.decode('gbk')  # 腾讯接口也使用GBK编码
-                if 'v_' in content:  # 确认返回了有效数据
-                    data = content.split('~')
-                    if len(data) > 3:
-                        latest_price = float(data[3])
-                        if latest_price > 0:  # 确保价格有效
-                            logger.info(f"从腾讯获取到股票 {stock_code} 的最新价格: {latest_price}")
-                            # 更新缓存
-                            self.__price_cache[stock_code] = {
-                                'price': latest_price,
-                                'timestamp': time.time()
-                            }
-                            return latest_price
-            
-            # 如果都失败了，尝试东方财富接口
-            eastmoney_headers = headers.copy()
-            eastmoney_headers.update({
-                'Referer': 'https://quote.eastmoney.com'
-            })
+            logger.warning(f"无法从任何数据源获取股票 {stock_code} 的实时价格")
+            return None
             
-            market_id = '1' if market == 'sh' else ('0' if market == 'sz' else '116')  # 港股市场ID为116
-            response = requests.get(
-                f"https://push2.eastmoney.com/api/qt/stock/get?secid={market_id}.{stock_code.replace('hk', '')}",
-                headers=eastmoney_headers,
-                timeout=5
-            )
+        except requests.Timeout:
+            logger.error(f"获取股票 {stock_code} 实时价格超时")
+            return None
+        except requests.RequestException as e:
+            logger.error(f"获取股票 {stock_code} 实时价格请求异常: {str(e)}")
+            return None
+        except ValueError as e:
+            logger.error(f"解析股票 {stock_code} 价格数据失败: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"获取股票 {stock_code} 实时价格发生未知错误: {str(e)}")
+            return None
+    
+    async def get_real_time_price_async(self, stock_code: str, client: 'httpx.AsyncClient') -> Optional[float]:
+        """
+        异步获取股票实时价格（数据源顺序、缓存和结果与 get_real_time_price 相同）
+        
+        Args:
+            stock_code: 股票代码
+            client: 共享的异步 HTTP 客户端
             
-            if response.status_code == 200:
-                data = response.json()
-                if 'data' in data and 'f43' in data['data']:
-                    latest_price = float(data['data']['f43']) / 100  # 东方财富的价格需要除以100
-                    if latest_price > 0:
-                        logger.info(f"从东方财富获取到股票 {stock_code} 的最新价格: {latest_price}")
-                        # 更新缓存
-                        self.__price_cache[stock_code] = {
-                            'price': latest_price,
-                            'timestamp': time.time()
-                        }
-                        return latest_price
+        Returns:
+            Optional[float]: 股票最新价格，如果获取失败则返回 None
+        """
+        import httpx
+
+        cached_price = self._get_cached_price(stock_code)
+        if cached_price is not None:
+            return cached_price
+        
+        try:
+            for source, url, headers, parse in self._quote_requests(stock_code):
+                response = await self._request_quote_async(source, url, headers, client)
+                latest_price = self._read_quote(stock_code, source, response, parse)
+                if latest_price is not None:
+                    return latest_price
             
             logger.warning(f"无法从任何数据源获取股票 {stock_code} 的实时价格")
             return None
             
-        except requests.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"获取股票 {stock_code} 实时价格超时")
             return None
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"获取股票 {stock_code} 实时价格请求异常: {str(e)}")
             return None
         except ValueError as e:
@@ -161,44 +276,146 @@ class PositionService:
             logger.error(f"获取股票 {stock_code} 实时价格发生未知错误: {str(e)}")
             return None
     
-    def update_all_positions(self) -> List[Dict[str, Any]]:
+    async def get_prices_async(self, stock_codes: List[str], client: 'httpx.AsyncClient') -> Dict[str, float]:
+        """
+        并发获取多只股票的实时价格
+        
+        Args:
+            stock_codes: 股票代码列表
+            client: 共享的异步 HTTP 客户端
+            
+        Returns:
+            Dict[str, float]: 股票代码到最新价格的映射，不包含获取失败的股票
+        """
+        semaphore = asyncio.Semaphore(self.ASYNC_QUOTE_CONCURRENCY)
+        
+        async def fetch(stock_code: str):
+            async with semaphore:
+                return stock_code, await self.get_real_time_price_async(stock_code, client)
+        
+        results = await asyncio.gather(*(fetch(stock_code) for stock_code in stock_codes))
+        return {stock_code: price for stock_code, price in results if price}
+    
+    def _load_positions(self, fields: List[str] = None) -> List[StockPosition]:
+        """加载全部持仓，指定返回字段时只加载返回字段和计算市值所需的字段"""
+        query = StockPosition.query
+        if fields:
+            load_fields = list(dict.fromkeys([*self.MARKET_VALUE_COLUMNS, *fields]))
+            query = query.options(load_only_option(StockPosition, load_fields))
+        return query.all()
+    
+    def _apply_prices(self, positions: List[StockPosition], price_map: Dict[str, float],
+                      fields: List[str] = None) -> List[Dict[str, Any]]:
+        """按价格更新持仓市值并提交，返回序列化后的持仓列表"""
+        for position in positions:
+            if position.stock_code in price_map:
+                position.update_market_value(price_map[position.stock_code])
+        
+        # 提交前完成序列化，避免提交后逐行刷新过期对象
+        db.session.flush()
+        results = serialize_rows(positions, fields)
+        db.session.commit()
+        return results
+    
+    def update_all_positions(self, fields: List[str] = None) -> List[Dict[str, Any]]:
         """
         更新所有持仓的市值信息
         
+        Args:
+            fields: 只返回指定字段，为 None 时返回全部字段
+        
         Returns:
             List[Dict[str, Any]]: 更新后的持仓列表
         """
         try:
-            positions = StockPosition.query.all()
-            
-            # 优化：一次性收集所有股票代码
-            stock_codes = list(set([position.stock_code for position in positions]))
+            positions = self._load_positions(fields)
             
             # 先获取所有价格，再更新持仓，减少API请求和数据库操作
             price_map = {}
-            for stock_code in stock_codes:
+            for stock_code in set(position.stock_code for position in positions):
                 latest_price = self.get_real_time_price(stock_code)
                 if latest_price:
                     price_map[stock_code] = latest_price
             
-            # 更新所有持仓
-            for position in positions:
-                if position.stock_code in price_map:
-                    position.update_market_value(price_map[position.stock_code])
-            
-            db.session.commit()
-            return [position.to_dict() for position in positions]
+            return self._apply_prices(positions, price_map, fields)
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"更新所有持仓市值失败: {str(e)}")
             raise
+    
+    def get_position_codes(self) -> List[str]:
+        """获取全部持仓的股票代码"""
+        return [row[0] for row in db.session.query(StockPosition.stock_code).distinct()]
+    
+    def apply_market_prices(self, price_map: Dict[str, float], fields: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        按已获取的价格更新全部持仓市值（异步接口获取价格后在工作线程中调用）
+        
+        Args:
+            price_map: 股票代码到最新价格的映射
+            fields: 只返回指定字段，为 None 时返回全部字段
+        
+        Returns:
+            List[Dict[str, Any]]: 更新后的持仓列表
+        """
+        try:
+            return self._apply_prices(self._load_positions(fields), price_map, fields)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"更新所有持仓市值失败: {str(e)}")
+            raise
+
+    async def update_all_positions_async(self, app: Flask, client: 'httpx.AsyncClient', fields: List[str] = None,
+                                         limiter: Optional['anyio.CapacityLimiter'] = None) -> List[Dict[str, Any]]:
+        """
+        异步更新所有持仓的市值信息：数据库读写在工作线程中执行，行情请求并发进行
+        
+        Args:
+            app: Flask应用实例
+            client: 共享的异步 HTTP 客户端
+            fields: 只返回指定字段，为 None 时返回全部字段
+            limiter: 数据库线程容量限制器
+        
+        Returns:
+            List[Dict[str, Any]]: 更新后的持仓列表
+        """
+        stock_codes = await run_in_app_context(app, self.get_position_codes, limiter=limiter)
+        price_map = await self.get_prices_async(stock_codes, client)
+        return await run_in_app_context(app, self.apply_market_prices, price_map, fields, limiter=limiter)
+    
+    async def refresh_position_async(self, app: Flask, client: 'httpx.AsyncClient', stock_code: str,
+                                     limiter: Optional['anyio.CapacityLimiter'] = None) -> Optional[Dict[str, Any]]:
+        """
+        异步获取单个持仓并按最新价格更新市值
+        
+        Args:
+            app: Flask应用实例
+            client: 共享的异步 HTTP 客户端
+            stock_code: 股票代码
+            limiter: 数据库线程容量限制器
+        
+        Returns:
+            Optional[Dict[str, Any]]: 持仓信息，没有持仓时返回 None；获取不到价格时返回未更新的持仓
+        """
+        position = await run_in_app_context(app, self.get_position, stock_code, limiter=limiter)
+        if not position:
+            return None
+        
+        latest_price = await self.get_real_time_price_async(stock_code, client)
+        if not latest_price:
+            return position
+        return await run_in_app_context(app, self.update_market_value, stock_code, latest_price, limiter=limiter)
 
-    def get_all_positions(self) -> List[Dict[str, Any]]:
+    @use_read_replica
+    def get_all_positions(self, fields: List[str] = None) -> List[Dict[str, Any]]:
         """获取所有持仓"""
         try:
-            positions = StockPosition.query.all()
-            return [position.to_dict() for position in positions]
+            query = StockPosition.query
+            if fields:
+                query = query.options(load_only_option(StockPosition, fields))
+            positions = query.all()
+            return serialize_rows(positions, fields)
         except Exception as e:
             logger.error(f"获取持仓列表失败: {str(e)}", exc_info=True)
             raise
@@ -5,12 +5,19 @@
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from flask import current_app
 from ..models import db
 from ..models.stock import StockStrategy
-from ai_robot import create_ai_processor
+from ai_robot import BaseAIProcessor, get_ai_processor, request_throttle
+from ai_robot.metrics import ai_metrics
 from ..models.execution import StrategyExecution
+from ..utils.serializer import serialize_rows, load_only_option
+from ..utils.db_routing import use_read_replica
 from .execution import ExecutionService
+from .parse_cache import ParseCacheService, normalize_strategy_text
+from ..utils.rate_limit import ProviderThrottle
 
 logger = logging.getLogger(__name__)
 
@@ -18,24 +25,167 @@ class StrategyService:
     """策略服务类"""
     
     def __init__(self):
-        """初始化AI处理器"""
-        self.ai_processor = create_ai_processor()
+        """初始化依赖的服务，AI处理器在首次使用时获取"""
         self.execution_service = ExecutionService()
+        self.parse_cache = ParseCacheService()
     
-    def analyze_strategy(self, strategy_text: str) -> Dict[str, Any]:
-        """分析策略文本"""
+    @property
+    def ai_processor(self) -> BaseAIProcessor:
+        """进程内共享的AI处理器"""
+        return get_ai_processor()
+    
+    def analyze_strategy(self, strategy_text: str,
+                         on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        分析策略文本
+        
+        结构化模板文本直接使用规则解析；其余文本（或仅空白不同的文本）优先从解析缓存返回，
+        未命中时才调用AI。
+        
+        Args:
+            strategy_text: 策略文本
+            on_progress: AI流式输出的进度回调，参数为已收到的全部文本
+            
+        Returns:
+            Dict[str, Any]: 解析结果，解析失败时包含 error 字段
+        """
         try:
-            return self.ai_processor.process_strategy(strategy_text)
+            result, _ = self.analyze_local(strategy_text)
+            if result is not None:
+                return result
+            return self.analyze_with_ai(strategy_text, on_progress)
         except Exception as e:
             logger.error(f"策略分析失败: {str(e)}", exc_info=True)
             raise
     
-    def get_all_strategies(self, sort_by: str = 'updated_at', order: str = 'desc') -> List[Dict[str, Any]]:
-        """获取所有策略"""
+    def analyze_local(self, strategy_text: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        不调用AI分析策略文本（规则解析、解析缓存）
+        
+        Args:
+            strategy_text: 策略文本
+            
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[str]]: (解析结果, 来源 rule/cache)，均未命中时返回 (None, None)
+        """
+        result = self.ai_processor.parse_by_rules(strategy_text)
+        if result is not None:
+            return result, 'rule'
+        
+        if not self.parse_cache.enabled:
+            return None, None
+        
+        provider_id = self.ai_processor.provider_id
+        cached = self.parse_cache.get(strategy_text, provider_id, self.ai_processor.prompt_version)
+        ai_metrics.increment(provider_id, 'cache_misses' if cached is None else 'cache_hits')
+        if cached is not None:
+            return cached, 'cache'
+        return None, None
+    
+    def analyze_with_ai(self, strategy_text: str,
+                        on_progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        调用AI分析策略文本，并写入解析缓存
+        
+        Args:
+            strategy_text: 策略文本
+            on_progress: AI流式输出的进度回调
+            
+        Returns:
+            Dict[str, Any]: 解析结果，解析失败时包含 error 字段
+        """
+        result = self.ai_processor.process_strategy(strategy_text, use_rules=False, on_progress=on_progress)
+        self.parse_cache.set(strategy_text, self.ai_processor.provider_id, self.ai_processor.prompt_version, result)
+        return result
+    
+    def analyze_strategies_batch(self, strategy_texts: List[str],
+                                 throttle: ProviderThrottle) -> Iterator[Dict[str, Any]]:
+        """
+        批量分析策略文本，按完成顺序逐条返回结果
+        
+        先在当前线程完成规则解析和缓存查询，其余文本按规范化内容去重后并发调用AI，
+        每次AI接口请求（包括重试和组合处理器的并发调用）受 throttle 的并发上限和速率限制约束。
+        需在应用上下文中调用。
+        
+        Args:
+            strategy_texts: 策略文本列表
+            throttle: AI调用限流器
+            
+        Returns:
+            Iterator[Dict[str, Any]]: 每条结果包含 index、source（rule/cache/ai，本地解析出错时为 local）、data 或 error
+        """
+        pending: Dict[str, List[int]] = {}
+        for index, text in enumerate(strategy_texts):
+            try:
+                result, source = self.analyze_local(text)
+            except Exception as e:
+                logger.error(f"批量分析第 {index} 条策略失败: {str(e)}", exc_info=True)
+                yield {'index': index, 'source': 'local', 'error': f"策略分析失败: {str(e)}"}
+                continue
+            if result is not None:
+                yield self._batch_item(index, source, result)
+            else:
+                pending.setdefault(normalize_strategy_text(text), []).append(index)
+        
+        if not pending:
+            return
+        
+        logger.info(f"批量分析: {len(strategy_texts)} 条策略中 {len(pending)} 条需要调用AI"
+                    f"（并发上限 {throttle.max_concurrency}）")
+        app = current_app._get_current_object()
+        
+        def run(text: str) -> Dict[str, Any]:
+            with request_throttle(throttle), app.app_context():
+                return self.analyze_with_ai(text)
+        
+        executor = ThreadPoolExecutor(max_workers=min(throttle.max_concurrency, len(pending)),
+                                      thread_name_prefix='batch-analyze')
+        try:
+            futures = {
+                executor.submit(run, strategy_texts[indexes[0]]): indexes
+                for indexes in pending.values()
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"批量分析调用AI失败: {str(e)}", exc_info=True)
+                    result = {'error': f"策略分析失败: {str(e)}"}
+                for index in futures[future]:
+                    yield self._batch_item(index, 'ai', result)
+        finally:
+            # 客户端提前断开时取消尚未开始的AI调用
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _batch_item(index: int, source: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """构造批量分析的单条结果"""
+        if 'error' in result:
+            return {'index': index, 'source': source, 'error': result['error']}
+        return {'index': index, 'source': source, 'data': result}
+    
+    @use_read_replica
+    def get_all_strategies(self, sort_by: str = 'updated_at', order: str = 'desc',
+                           fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        获取所有策略
+        
+        Args:
+            sort_by: 排序字段，可选值: updated_at, created_at
+            order: 排序方式，可选值: desc, asc
+            fields: 只返回指定字段，为 None 时返回全部字段
+            
+        Returns:
+            List[Dict[str, Any]]: 策略列表
+        """
         try:
             # 构建基础查询
             query = db.select(StockStrategy)
             
+            # 字段投影下推到 SELECT，避免加载大文本字段
+            if fields:
+                query = query.options(load_only_option(StockStrategy, fields))
+            
             # 组合排序条件
             sort_conditions = [
                 StockStrategy.is_active.desc(),  # 有效的排在前面
@@ -49,6 +199,11 @@ class StrategyService:
             # 执行查询
             strategies = db.session.execute(query).scalars().all()
             
+            # 指定字段时只记录数量，避免逐行访问未加载的字段
+            if fields:
+                logger.info(f"获取策略列表（字段: {','.join(fields)}），共 {len(strategies)} 条记录")
+                return serialize_rows(strategies, fields)
+            
             # 记录详细日志
             logger.info("="*50)
             logger.info("获取所有策略列表（排序规则：1.是否有效 2.更新时间 3.创建时间）:")
@@ -67,7 +222,7 @@ class StrategyService:
             logger.info(f"共获取到 {len(strategies)} 条记录")
             logger.info("="*50)
             
-            return [strategy.to_dict() for strategy in strategies]
+            return serialize_rows(strategies)
             
         except Exception as e:
             logger.error(f"获取策略列表失败: {str(e)}", exc_info=True)
@@ -307,6 +462,7 @@ class StrategyService:
             logger.error(f"设置策略有效失败: {str(e)}", exc_info=True)
             raise
     
+    @use_read_replica
     def search_strategies(self, 
         start_time: str = None, 
         end_time: str = None, 
@@ -315,7 +471,8 @@ class StrategyService:
         action: str = None,
         sort_by: str = 'updated_at',
         order: str = 'desc',
-        is_active: bool = None
+        is_active: bool = None,
+        fields: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
         高级查询策略列表
@@ -329,6 +486,7 @@ class StrategyService:
             sort_by: 排序字段，可选值: updated_at, created_at
             order: 排序方式，可选值: desc, asc
             is_active: 是否只查询有效策略，None表示查询所有
+            fields: 只返回指定字段，为 None 时返回全部字段
             
         Returns:
             List[Dict[str, Any]]: 策略列表
@@ -337,6 +495,10 @@ class StrategyService:
             # 构建基础查询
             query = StockStrategy.query
             
+            # 字段投影下推到 SELECT，避免加载大文本字段
+            if fields:
+                query = query.options(load_only_option(StockStrategy, fields))
+            
             # 添加时间范围过滤
             if start_time:
                 query = query.filter(StockStrategy.created_at >= start_time)
@@ -384,6 +546,13 @@ class StrategyService:
             logger.info(f"  排序字段: {sort_by}")
             logger.info(f"  排序方式: {order}")
             logger.info("-"*50)
+            
+            # 指定字段时只记录数量，避免逐行访问未加载的字段
+            if fields:
+                logger.info(f"返回字段: {','.join(fields)}，共获取到 {len(strategies)} 条记录")
+                logger.info("="*50)
+                return serialize_rows(strategies, fields)
+            
             logger.info("搜索结果:")
             for strategy in strategies:
                 logger.info(
@@ -399,7 +568,7 @@ class StrategyService:
             logger.info(f"共获取到 {len(strategies)} 条记录")
             logger.info("="*50)
             
-            return [strategy.to_dict() for strategy in strategies]
+            return serialize_rows(strategies)
             
         except Exception as e:
             logger.error(f"查询策略列表失败: {str(e)}", exc_info=True)
@@ -11,6 +11,7 @@ import pytz
 from flask import current_app
 from ..services.position import PositionService
 from ..utils.logger import setup_logger
+from ..utils.metrics import PRICE_UPDATE_DURATION
 
 logger = setup_logger('price_updater')
 CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
@@ -108,6 +109,7 @@ class PriceUpdater(threading.Thread):
         logger.info(f"【后端自动】股价更新器启动")
         
         while self.running:
+            cycle_start = None
             try:
                 # 获取当前应该使用的更新间隔
                 current_interval = self.get_current_interval()
@@ -116,6 +118,7 @@ class PriceUpdater(threading.Thread):
                 
                 # 判断是否需要更新
                 if self.should_update_now():
+                    cycle_start = time.perf_counter()
                     # 在应用上下文中执行更新操作
                     with self.app.app_context():
                         position_service = PositionService()
@@ -135,11 +138,14 @@ class PriceUpdater(threading.Thread):
                         
                         # 更新上次更新时间
                         self._last_update_time = time.time()
+                    PRICE_UPDATE_DURATION.labels('success').observe(time.perf_counter() - cycle_start)
                 
                 # 短暂睡眠后再检查，避免CPU占用过高
                 time.sleep(5)
                         
             except Exception as e:
+                if cycle_start is not None:
+                    PRICE_UPDATE_DURATION.labels('failure').observe(time.perf_counter() - cycle_start)
                 logger.error(f"【后端自动】更新市值失败: {str(e)}")
                 # 出错后休息一段时间再重试
                 time.sleep(30)
@@ -147,4 +153,34 @@ class PriceUpdater(threading.Thread):
     def stop(self):
         """停止更新任务"""
         self.running = False
-        logger.info("【后端自动】股价更新器已停止") 
\ No newline at end of file
+        logger.info("【后端自动】股价更新器已停止")
+
+
+def main():
+    """
+    以独立进程运行股价自动更新
+
+    Gunicorn 多进程部署时由 gunicorn.conf.py 在主进程就绪后启动，保证只有一个进程更新股价：
+        python -m app.tasks.price_updater
+    """
+    import signal
+    from .. import create_app
+
+    app = create_app()
+    updater = app.price_updater
+    if updater is None:
+        # 从 Gunicorn 继承了 PRICE_UPDATER_ENABLED=false 时由本进程自行启动
+        updater = PriceUpdater(app=app)
+        updater.start()
+
+    def handle_signal(signum, frame):
+        updater.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    while updater.running and updater.is_alive():
+        updater.join(timeout=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+异步调用工具模块
+
+此模块让异步接口复用现有的同步服务：数据库操作和同步AI调用在工作线程中执行，
+并在线程内推入 Flask 应用上下文（Flask-SQLAlchemy 的会话按应用上下文隔离），
+通过容量限制器控制同时占用的线程数，等待中的请求只占用协程而不占用线程
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from flask import Flask
+
+if TYPE_CHECKING:
+    import anyio
+
+
+async def run_in_app_context(app: Flask, func: Callable[..., Any], *args,
+                             limiter: Optional['anyio.CapacityLimiter'] = None, **kwargs) -> Any:
+    """
+    在工作线程中以应用上下文调用同步函数
+
+    Args:
+        app: Flask应用实例
+        func: 同步函数
+        *args: 位置参数
+        limiter: 线程容量限制器，为 None 时使用 anyio 默认限制器（40 个线程）
+        **kwargs: 关键字参数
+
+    Returns:
+        Any: 函数返回值
+    """
+    # 仅异步接口使用，同步部署不加载 anyio
+    import anyio.to_thread
+
+    def call():
+        with app.app_context():
+            return func(*args, **kwargs)
+
+    return await anyio.to_thread.run_sync(call, limiter=limiter)
+
+
+def pool_capacity(app: Flask) -> int:
+    """
+    计算数据库连接池最多提供的连接数（pool_size + max_overflow），用作数据库线程的容量上限
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        int: 连接数
+    """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    return options.get('pool_size', 5) + options.get('max_overflow', 10)
+
@@ -0,0 +1,155 @@
+"""
+响应压缩工具模块
+
+此模块在 after_request 阶段根据 Accept-Encoding 协商对响应体进行 gzip/brotli 压缩，
+并缓存相同内容的压缩结果，避免重复压缩未变化的列表数据
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 未安装 brotli 时只支持 gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionCache:
+    """压缩结果缓存（按内容摘要和编码方式缓存，LRU淘汰）"""
+
+    def __init__(self, max_entries: int = 128):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大缓存条目数，为 0 时不缓存
+        """
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[bytes]:
+        """读取缓存的压缩结果"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[bytes, str], value: bytes):
+        """写入压缩结果，超过容量时淘汰最久未使用的条目"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._items.clear()
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    根据客户端 Accept-Encoding 选择压缩方式
+
+    Args:
+        accept_encodings: 请求的 Accept-Encoding 解析结果
+
+    Returns:
+        Optional[str]: 'br'、'gzip' 或 None（不压缩）
+    """
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(data: bytes, encoding: str, gzip_level: int, br_level: int) -> bytes:
+    """
+    压缩响应体
+
+    Args:
+        data: 原始响应体
+        encoding: 压缩方式（br/gzip）
+        gzip_level: gzip 压缩级别（1-9）
+        br_level: brotli 压缩级别（0-11）
+
+    Returns:
+        bytes: 压缩后的数据
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=br_level)
+    # mtime 固定为 0，使相同内容的压缩结果一致
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def init_compression(app: Flask):
+    """
+    为应用注册响应压缩处理
+
+    相关配置:
+        COMPRESS_ENABLED: 是否启用压缩
+        COMPRESS_MIN_SIZE: 启用压缩的最小响应体大小（字节）
+        COMPRESS_LEVEL: gzip 压缩级别
+        COMPRESS_BR_LEVEL: brotli 压缩级别
+        COMPRESS_MIMETYPES: 允许压缩的内容类型
+        COMPRESS_CACHE_SIZE: 压缩结果缓存条目数
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        logger.info("响应压缩未启用")
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_LEVEL', 6)
+    br_level = app.config.get('COMPRESS_BR_LEVEL', 4)
+    mimetypes = set(app.config.get('COMPRESS_MIMETYPES', ['application/json']))
+    cache = CompressionCache(app.config.get('COMPRESS_CACHE_SIZE', 128))
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        """按协商结果压缩响应体"""
+        if (response.direct_passthrough
+                or response.is_streamed
+                or not 200 <= response.status_code < 300
+                or response.status_code == 204
+                or response.mimetype not in mimetypes
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress_body(data, encoding, gzip_level, br_level)
+            cache.set(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,138 @@
+"""
+数据库连接池工具模块
+
+此模块为 MySQL 连接池记录获取连接的耗时和超时次数（用于按工作线程数评估 pool_size 是否足够），
+并在启动时预先建立连接，避免启动后的首批请求承担建立连接的耗时
+"""
+
+import logging
+import time
+from typing import Optional
+
+from flask import Flask
+from prometheus_client import Counter, Histogram
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from ..models import db
+from .db_routing import REPLICA_BIND_PREFIX
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 主库连接池在指标中的名称
+DEFAULT_POOL_LABEL = 'default'
+
+DB_POOL_WAIT = Histogram(
+    'qmt_db_pool_wait_seconds', '从连接池获取连接的耗时（含排队等待、新建连接和 pre-ping）',
+    ['bind'], buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), registry=REGISTRY
+)
+DB_POOL_TIMEOUTS = Counter(
+    'qmt_db_pool_timeouts_total', '等待空闲连接超过 pool_timeout 的次数', ['bind'], registry=REGISTRY
+)
+
+
+class TimedQueuePool(QueuePool):
+    """记录获取连接耗时的 QueuePool"""
+
+    def __init__(self, creator, metrics_label: str = DEFAULT_POOL_LABEL, **kw):
+        """
+        初始化连接池
+
+        Args:
+            creator: 创建 DBAPI 连接的函数
+            metrics_label: 指标中的连接池名称（通过引擎参数 metrics_label 传入）
+            **kw: QueuePool 的其他参数
+        """
+        super().__init__(creator, **kw)
+        self.metrics_label = metrics_label
+
+    def connect(self):
+        """借出连接并记录耗时，等待超时时计数"""
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+    def recreate(self) -> 'TimedQueuePool':
+        """重建连接池（engine.dispose() 时调用），保留指标名称"""
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def _timed_options(uri, options: dict, label: str) -> dict:
+    """为非 SQLite 数据库的引擎参数设置 TimedQueuePool（SQLite 使用 Flask-SQLAlchemy 的默认连接池）"""
+    if not uri or make_url(uri).get_backend_name() == 'sqlite' or 'poolclass' in options:
+        return options
+    return {**options, 'poolclass': TimedQueuePool, 'metrics_label': label}
+
+
+def configure_pool(app: Flask):
+    """
+    设置主库连接池使用 TimedQueuePool，并将 DB_READ_REPLICA_URLS 中的只读副本注册为 bind
+    （replica_0、replica_1...，连接池配置与主库相同），需在 db.init_app 之前调用
+
+    Args:
+        app: Flask应用实例
+    """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _timed_options(
+        app.config.get('SQLALCHEMY_DATABASE_URI'), options, DEFAULT_POOL_LABEL)
+
+    replica_urls = app.config.get('DB_READ_REPLICA_URLS') or []
+    if replica_urls:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        for index, url in enumerate(replica_urls):
+            key = f'{REPLICA_BIND_PREFIX}{index}'
+            binds[key] = {**_timed_options(url, options, key), 'url': url}
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def warm_up_pool(app: Flask, connections: Optional[int] = None) -> int:
+    """
+    预先建立数据库连接并放回连接池
+
+    同时借出多个连接使连接池建立不同的连接，每个连接执行一次 SELECT 1 确认可用。
+    数据库暂时不可用时只记录警告，不影响应用启动
+
+    Args:
+        app: Flask应用实例
+        connections: 每个连接池建立的连接数，不传时使用 DB_POOL_WARMUP 配置，不超过 pool_size
+
+    Returns:
+        int: 建立的连接总数
+    """
+    if connections is None:
+        connections = app.config.get('DB_POOL_WARMUP', 0)
+    if connections <= 0:
+        return 0
+
+    start = time.perf_counter()
+    total = 0
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            if not isinstance(engine.pool, QueuePool):
+                continue
+            opened = []
+            warmed = 0
+            try:
+                for _ in range(min(connections, engine.pool.size())):
+                    conn = engine.connect()
+                    opened.append(conn)
+                    conn.exec_driver_sql('SELECT 1')
+                    warmed += 1
+            except Exception as e:
+                logger.warning(f"连接池预热失败（{bind or DEFAULT_POOL_LABEL}，已建立 {warmed} 个连接）: {str(e)}")
+            finally:
+                for conn in opened:
+                    conn.close()
+            total += warmed
+
+    logger.info(f"连接池预热完成：建立 {total} 个连接，耗时 {(time.perf_counter() - start) * 1000:.0f}ms")
+    return total
@@ -0,0 +1,134 @@
+"""
+数据库读写分离工具模块
+
+此模块让标记为只读的服务方法（列表、搜索、批量查询等）在只读副本上执行查询，写入始终使用主库：
+
+- 配置 DB_READ_REPLICA_URLS 后，每个副本注册为一个 bind（replica_0、replica_1...），未配置时全部使用主库
+- 使用 @use_read_replica 装饰的方法内的 SELECT 发往副本（多个副本时轮流使用）
+- 读己之写：本次请求有过写入，或客户端在 DB_REPLICA_STICKY_SECONDS 秒内写入过（通过 Cookie 记录，
+  多个工作进程间同样生效）时，只读方法也使用主库，避免读到尚未同步到副本的旧数据
+- 会话中有未提交的修改、flush 过程以及 INSERT/UPDATE/DELETE 语句始终使用主库
+"""
+
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, List
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+# 只读副本的 bind 名称前缀
+REPLICA_BIND_PREFIX = 'replica_'
+# 记录客户端最近写入后应使用主库截止时间的 Cookie
+STICKY_COOKIE = 'qmt_db_primary_until'
+
+# 当前调用是否允许使用只读副本（由 use_read_replica 设置）
+_replica_allowed: ContextVar[bool] = ContextVar('replica_allowed', default=False)
+# 轮流选择副本的计数器
+_replica_counter = itertools.count()
+
+
+def replica_bind_keys(app: Flask) -> List[str]:
+    """
+    获取应用配置的只读副本 bind 名称
+
+    Args:
+        app: Flask应用实例
+
+    Returns:
+        List[str]: bind 名称列表，未配置副本时为空
+    """
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+    return [key for key in binds if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def use_read_replica(func: Callable[..., Any]) -> Callable[..., Any]:
+    """只读服务方法装饰器：方法内的查询可以使用只读副本"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _replica_allowed.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _replica_allowed.reset(token)
+
+    return wrapper
+
+
+def mark_write():
+    """记录本次请求写入过数据库，之后的只读方法使用主库，响应时下发 Cookie"""
+    if has_request_context():
+        g.db_wrote = True
+
+
+def primary_required() -> bool:
+    """
+    判断当前请求是否需要从主库读取（读己之写）
+
+    Returns:
+        bool: 本次请求写入过，或客户端的 Cookie 尚未过期时为 True
+    """
+    if not has_request_context():
+        return False
+    if g.get('db_wrote'):
+        return True
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class RoutingSession(Session):
+    """按读写类型选择主库或只读副本的会话"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """写入和未标记只读的查询使用主库，只读方法内对主库表的查询轮流使用副本"""
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        if self._flushing or isinstance(clause, UpdateBase):
+            mark_write()
+        elif _replica_allowed.get() and has_app_context() and engine is self._db.engines.get(None):
+            return self._choose_replica() or engine
+        return engine
+
+    def _choose_replica(self):
+        """选择只读副本，需要使用主库时返回 None"""
+        keys = current_app.extensions.get('db_read_replicas')
+        if not keys or self.new or self.dirty or self.deleted or primary_required():
+            return None
+        return self._db.engines[keys[next(_replica_counter) % len(keys)]]
+
+
+def init_read_replicas(app: Flask):
+    """
+    启用只读副本路由（需在 db.init_app 之后调用，未配置副本时不做任何处理）
+
+    相关配置:
+        DB_READ_REPLICA_URLS: 只读副本的数据库地址列表
+        DB_REPLICA_STICKY_SECONDS: 客户端写入后继续使用主库读取的时间（秒），应大于副本的复制延迟
+
+    Args:
+        app: Flask应用实例
+    """
+    keys = replica_bind_keys(app)
+    if not keys:
+        return
+    app.extensions['db_read_replicas'] = keys
+    sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', 5)
+
+    @app.after_request
+    def set_primary_cookie(response: Response) -> Response:
+        """本次请求写入过数据库时下发 Cookie，客户端在复制延迟内的后续读取使用主库"""
+        if g.get('db_wrote') and sticky_seconds > 0:
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + sticky_seconds:.3f}',
+                                max_age=int(sticky_seconds) + 1, httponly=True, samesite='Lax')
+        return response
+
+    logger.info(f"已启用只读副本: {', '.join(keys)}（写入后 {sticky_seconds} 秒内从主库读取）")
@@ -0,0 +1,214 @@
+"""
+运行指标工具模块
+
+此模块维护应用的 Prometheus 指标注册表：按接口和状态码统计请求数与延迟、进行中的请求数、
+数据库连接池占用、股价更新周期耗时、行情数据源成功率与延迟，以及AI调用指标，
+由 /metrics 接口以文本格式输出。
+
+Gunicorn 多进程部署时（设置了 PROMETHEUS_MULTIPROC_DIR），请求、行情和股价更新指标由各进程写入该目录，
+/metrics 汇总全部进程；连接池和AI调用指标仍只反映处理本次抓取的工作进程
+"""
+
+import os
+import time
+from functools import partial
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from sqlalchemy.pool import QueuePool
+
+from ai_robot.metrics import COUNTERS, ai_metrics
+from ..models import db
+
+# 应用独立的注册表，不包含 prometheus_client 默认注册的进程和平台指标
+REGISTRY = CollectorRegistry()
+
+# 接口延迟的桶上限（秒）
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 行情数据源请求延迟的桶上限（秒），请求超时为 5 秒
+QUOTE_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+# 股价更新周期耗时的桶上限（秒）
+PRICE_UPDATE_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# 未匹配到路由的请求（404 等）统一使用该接口名，避免按原始路径产生大量标签
+UNMATCHED_ENDPOINT = 'unmatched'
+
+HTTP_REQUESTS = Counter(
+    'qmt_http_requests_total', 'HTTP 请求数',
+    ['endpoint', 'method', 'status'], registry=REGISTRY
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'qmt_http_request_duration_seconds', 'HTTP 请求耗时（流式响应包含响应体输出时间）',
+    ['endpoint', 'method', 'status'], buckets=HTTP_LATENCY_BUCKETS, registry=REGISTRY
+)
+HTTP_IN_PROGRESS = Gauge(
+    'qmt_http_requests_in_progress', '正在处理的 HTTP 请求数',
+    ['endpoint'], registry=REGISTRY, multiprocess_mode='livesum'
+)
+PRICE_UPDATE_DURATION = Histogram(
+    'qmt_price_update_cycle_seconds', '股价自动更新单个周期的耗时',
+    ['result'], buckets=PRICE_UPDATE_BUCKETS, registry=REGISTRY
+)
+QUOTE_SOURCE_REQUESTS = Counter(
+    'qmt_quote_source_requests_total', '行情数据源请求数（result: success/empty/timeout/error）',
+    ['source', 'result'], registry=REGISTRY
+)
+QUOTE_SOURCE_LATENCY = Histogram(
+    'qmt_quote_source_latency_seconds', '行情数据源请求耗时',
+    ['source'], buckets=QUOTE_LATENCY_BUCKETS, registry=REGISTRY
+)
+
+
+class DatabasePoolCollector:
+    """数据库连接池指标（抓取时从当前应用的各数据库引擎读取）"""
+
+    def collect(self):
+        """生成连接池指标"""
+        size = GaugeMetricFamily('qmt_db_pool_size', '连接池容量', labels=['bind'])
+        checked_out = GaugeMetricFamily('qmt_db_pool_checked_out', '已借出的连接数', labels=['bind'])
+        checked_in = GaugeMetricFamily('qmt_db_pool_checked_in', '池中空闲的连接数', labels=['bind'])
+        overflow = GaugeMetricFamily('qmt_db_pool_overflow', '超出容量的溢出连接数', labels=['bind'])
+
+        if has_app_context() and 'sqlalchemy' in current_app.extensions:
+            for bind, engine in db.engines.items():
+                pool = engine.pool
+                # SQLite 等使用的连接池没有容量概念，只统计 QueuePool
+                if not isinstance(pool, QueuePool):
+                    continue
+                labels = [bind or 'default']
+                size.add_metric(labels, pool.size())
+                checked_out.add_metric(labels, pool.checkedout())
+                checked_in.add_metric(labels, pool.checkedin())
+                overflow.add_metric(labels, max(pool.overflow(), 0))
+
+        return [size, checked_out, checked_in, overflow]
+
+
+class AIMetricsCollector:
+    """AI调用指标（抓取时从 ai_robot.metrics 读取，按提供方输出）"""
+
+    def collect(self):
+        """生成AI调用指标"""
+        snapshot = ai_metrics.snapshot()
+        counters = {
+            name: CounterMetricFamily(f'qmt_ai_{name}', description, labels=['provider'])
+            for name, description in COUNTERS.items()
+        }
+        request_latency = HistogramMetricFamily(
+            'qmt_ai_request_duration_seconds', 'AI接口单次请求耗时', labels=['provider'])
+        parse_latency = HistogramMetricFamily(
+            'qmt_ai_parse_duration_seconds', 'AI单次解析耗时（含全部重试）', labels=['provider'])
+        prompt_tokens = CounterMetricFamily(
+            'qmt_ai_prompt_tokens', 'AI输入 token 数', labels=['provider', 'prompt_version'])
+        completion_tokens = CounterMetricFamily(
+            'qmt_ai_completion_tokens', 'AI输出 token 数', labels=['provider', 'prompt_version'])
+
+        for provider, metrics in sorted(snapshot.items()):
+            for name, value in metrics['counters'].items():
+                counters[name].add_metric([provider], value)
+            for family, key in ((request_latency, 'request_latency_seconds'),
+                                (parse_latency, 'parse_latency_seconds')):
+                histogram = metrics[key]
+                buckets = [(str(bucket['le']), bucket['count']) for bucket in histogram['buckets']]
+                buckets.append(('+Inf', histogram['count']))
+                family.add_metric([provider], buckets, histogram['sum'])
+            for usage in metrics['tokens']:
+                labels = [provider, usage['prompt_version']]
+                prompt_tokens.add_metric(labels, usage['prompt_tokens'])
+                completion_tokens.add_metric(labels, usage['completion_tokens'])
+
+        return [*counters.values(), request_latency, parse_latency, prompt_tokens, completion_tokens]
+
+
+REGISTRY.register(DatabasePoolCollector())
+REGISTRY.register(AIMetricsCollector())
+
+
+def record_quote_result(source: str, result: str):
+    """
+    记录一次行情数据源请求的结果
+
+    Args:
+        source: 数据源名称（sina/tencent/eastmoney）
+        result: success、empty（响应中没有有效价格）、timeout 或 error
+    """
+    QUOTE_SOURCE_REQUESTS.labels(source, result).inc()
+
+
+def observe_quote_latency(source: str, seconds: float):
+    """
+    记录一次行情数据源请求的耗时
+
+    Args:
+        source: 数据源名称
+        seconds: 请求耗时（秒）
+    """
+    QUOTE_SOURCE_LATENCY.labels(source).observe(seconds)
+
+
+_multiprocess_registry = None
+
+
+def get_scrape_registry() -> CollectorRegistry:
+    """
+    获取 /metrics 输出使用的注册表
+
+    Returns:
+        CollectorRegistry: 设置了 PROMETHEUS_MULTIPROC_DIR 时为汇总全部进程的注册表，否则为 REGISTRY
+    """
+    global _multiprocess_registry
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    if _multiprocess_registry is None:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(DatabasePoolCollector())
+        registry.register(AIMetricsCollector())
+        _multiprocess_registry = registry
+    return _multiprocess_registry
+
+
+def render_metrics() -> Response:
+    """以 Prometheus 文本格式输出全部指标"""
+    return Response(generate_latest(get_scrape_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def _finish_request(endpoint: str, method: str, status: int, start: float):
+    """响应输出完毕后记录请求耗时"""
+    HTTP_IN_PROGRESS.labels(endpoint).dec()
+    HTTP_REQUESTS.labels(endpoint, method, status).inc()
+    HTTP_REQUEST_DURATION.labels(endpoint, method, status).observe(time.perf_counter() - start)
+
+
+def init_metrics(app: Flask):
+    """
+    为应用注册请求指标采集
+
+    相关配置:
+        METRICS_ENABLED: 是否采集请求指标（/metrics 接口不受影响）
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_metrics():
+        """记录请求开始时间"""
+        g.metrics_endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        g.metrics_start = time.perf_counter()
+        HTTP_IN_PROGRESS.labels(g.metrics_endpoint).inc()
+
+    @app.after_request
+    def finish_request_metrics(response: Response) -> Response:
+        """在响应关闭时记录请求指标，流式响应（SSE、NDJSON）包含响应体输出时间"""
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            response.call_on_close(partial(
+                _finish_request, g.metrics_endpoint, request.method, response.status_code, start))
+        return response
+
+    app.extensions['metrics_registry'] = REGISTRY
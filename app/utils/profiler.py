@@ -0,0 +1,217 @@
+"""
+请求性能剖析工具模块
+
+此模块按采样比例或管理员请求头对单个请求运行 cProfile，将 pstats 结果和请求元数据
+（接口、路径、状态码、耗时、SQL 次数）写入 logs/profiles/，用于在生产环境定位热点而无需重新部署。
+cProfile 同一时间只剖析一个请求，其余请求正常处理不受影响
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from flask import Flask, Response, g, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = Path(__file__).parent.parent.parent / 'logs' / 'profiles'
+# 元数据中记录的耗时最多的函数数量
+TOP_FUNCTIONS = 20
+# 文件名中不允许的字符
+UNSAFE_FILENAME_PATTERN = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class RequestProfiler:
+    """请求剖析器（同一时间只剖析一个请求）"""
+
+    def __init__(self, output_dir: Path, sample_rate: float = 0.0, header: str = 'X-Profile',
+                 token: str = '', min_duration: float = 0.0, max_files: int = 200):
+        """
+        初始化剖析器
+
+        Args:
+            output_dir: 剖析结果目录
+            sample_rate: 随机采样比例（0-1）
+            header: 按需剖析的请求头名称
+            token: 请求头需携带的令牌，为空时不允许通过请求头触发
+            min_duration: 耗时低于该值（秒）的请求不保存结果
+            max_files: 最多保留的剖析结果数，超出时删除最早的结果
+        """
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.header = header
+        self.token = token
+        self.min_duration = min_duration
+        self.max_files = max_files
+        self._busy = threading.Lock()
+
+    def requested(self) -> Optional[str]:
+        """
+        判断当前请求是否需要剖析
+
+        Returns:
+            Optional[str]: 触发方式 header（请求头令牌匹配）或 sample（命中采样），不需要剖析时为 None
+        """
+        value = request.headers.get(self.header)
+        if value is not None and self.token and hmac.compare_digest(value, self.token):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def start(self, trigger: str) -> bool:
+        """
+        开始剖析当前请求
+
+        Args:
+            trigger: 触发方式
+
+        Returns:
+            bool: 是否已开始（已有请求在剖析时返回 False）
+        """
+        if not self._busy.acquire(blocking=False):
+            return False
+        profile = cProfile.Profile()
+        g.profile = profile
+        g.profile_trigger = trigger
+        g.profile_start = time.perf_counter()
+        profile.enable()
+        return True
+
+    def discard(self):
+        """放弃未完成的剖析（请求异常中断时调用）"""
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+            self._busy.release()
+
+    def stop(self, response: Response) -> Response:
+        """结束剖析并保存结果"""
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+        duration = time.perf_counter() - g.pop('profile_start')
+        self._busy.release()
+
+        if duration < self.min_duration:
+            return response
+        try:
+            profile_id = self.save(profile, response, duration)
+            response.headers['X-Profile-Id'] = profile_id
+        except Exception as e:
+            logger.error(f"保存剖析结果失败: {str(e)}", exc_info=True)
+        return response
+
+    def save(self, profile: cProfile.Profile, response: Response, duration: float) -> str:
+        """
+        写入 pstats 文件和元数据
+
+        Args:
+            profile: 已停止的剖析器
+            response: 响应对象
+            duration: 请求耗时（秒）
+
+        Returns:
+            str: 剖析结果编号（文件名前缀）
+        """
+        endpoint = request.endpoint or 'unmatched'
+        now = datetime.now()
+        profile_id = (f"{now.strftime('%Y%m%d-%H%M%S-%f')}_"
+                      f"{UNSAFE_FILENAME_PATTERN.sub('_', endpoint)}_{duration * 1000:.0f}ms")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(self.output_dir / f'{profile_id}.prof'))
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+
+        metadata = {
+            'id': profile_id,
+            'timestamp': now.isoformat(timespec='milliseconds'),
+            'method': request.method,
+            'path': request.path,
+            'query_string': request.query_string.decode('utf-8', 'replace'),
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'db_query_count': g.get('db_query_count'),
+            'db_query_time_ms': round(g.get('db_query_time', 0.0) * 1000, 2),
+            'trigger': g.get('profile_trigger'),
+            'top_functions': stream.getvalue()
+        }
+        with open(self.output_dir / f'{profile_id}.json', 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"已保存请求剖析结果: {profile_id}（{request.method} {request.path}）")
+        self._purge()
+        return profile_id
+
+    def _purge(self):
+        """删除超出保留数量的最早结果"""
+        if self.max_files <= 0:
+            return
+        files = sorted(self.output_dir.glob('*.prof'))
+        for path in files[:max(0, len(files) - self.max_files)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.json').unlink(missing_ok=True)
+
+
+def init_profiling(app: Flask):
+    """
+    为应用注册请求剖析
+
+    相关配置:
+        PROFILE_ENABLED: 是否启用请求剖析
+        PROFILE_SAMPLE_RATE: 随机采样比例（0-1），0 表示只按请求头触发
+        PROFILE_HEADER: 按需剖析的请求头名称
+        PROFILE_TOKEN: 请求头需携带的令牌，为空时不允许通过请求头触发
+        PROFILE_DIR: 剖析结果目录，默认 logs/profiles
+        PROFILE_MIN_DURATION: 耗时低于该值（秒）的请求不保存结果
+        PROFILE_MAX_FILES: 最多保留的剖析结果数
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('PROFILE_ENABLED', False):
+        return
+
+    profiler = RequestProfiler(
+        output_dir=app.config.get('PROFILE_DIR') or DEFAULT_PROFILE_DIR,
+        sample_rate=app.config.get('PROFILE_SAMPLE_RATE', 0.0),
+        header=app.config.get('PROFILE_HEADER', 'X-Profile'),
+        token=app.config.get('PROFILE_TOKEN', ''),
+        min_duration=app.config.get('PROFILE_MIN_DURATION', 0.0),
+        max_files=app.config.get('PROFILE_MAX_FILES', 200)
+    )
+    app.extensions['request_profiler'] = profiler
+
+    @app.before_request
+    def start_profiling():
+        """按采样或请求头开始剖析"""
+        trigger = profiler.requested()
+        if trigger:
+            profiler.start(trigger)
+
+    @app.after_request
+    def stop_profiling(response: Response) -> Response:
+        """结束剖析并保存结果"""
+        return profiler.stop(response)
+
+    @app.teardown_request
+    def release_profiler(exc):
+        """请求未经过 after_request 结束时释放剖析器"""
+        profiler.discard()
+
+    logger.info(f"请求剖析已启用：采样比例 {profiler.sample_rate}，"
+                f"请求头触发 {'已启用' if profiler.token else '未启用（未配置 PROFILE_TOKEN）'}")
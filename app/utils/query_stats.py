@@ -0,0 +1,118 @@
+"""
+SQL 查询统计工具模块
+
+此模块通过 SQLAlchemy 的 before_cursor_execute/after_cursor_execute 事件统计每个请求的查询次数
+和累计数据库耗时，调试模式下写入响应头；超过阈值的慢查询连同绑定参数记录日志，
+单个请求查询次数过多（常见于 N+1 查询）时记录警告
+"""
+
+import logging
+import time
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 慢查询日志中 SQL 语句和参数的最大长度
+MAX_LOGGED_STATEMENT = 2000
+MAX_LOGGED_PARAMETERS = 500
+
+DB_QUERY_DURATION = Histogram(
+    'qmt_db_query_duration_seconds', 'SQL 语句执行耗时',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5), registry=REGISTRY
+)
+DB_SLOW_QUERIES = Counter(
+    'qmt_db_slow_queries_total', '超过慢查询阈值的 SQL 语句数', registry=REGISTRY
+)
+
+_listeners_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """记录语句开始时间（同一连接上的语句按栈顺序执行）"""
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """累计请求的查询次数和耗时，超过阈值时记录慢查询"""
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+
+    if has_request_context():
+        g.db_query_count = g.get('db_query_count', 0) + 1
+        g.db_query_time = g.get('db_query_time', 0.0) + elapsed
+
+    threshold = current_app.config.get('SQL_SLOW_QUERY_THRESHOLD', 0.5) if has_app_context() else 0.5
+    if threshold and elapsed >= threshold:
+        DB_SLOW_QUERIES.inc()
+        source = f"{request.method} {request.path}" if has_request_context() else '后台任务'
+        logger.warning(
+            f"慢查询 {elapsed * 1000:.1f}ms（{source}）:\n"
+            f"{statement[:MAX_LOGGED_STATEMENT]}\n"
+            f"参数: {str(parameters)[:MAX_LOGGED_PARAMETERS]}"
+        )
+
+
+def _handle_error(exception_context):
+    """语句执行出错时丢弃其开始时间"""
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start_time'):
+        conn.info['query_start_time'].pop()
+
+
+def install_query_listeners():
+    """为所有数据库引擎注册查询耗时事件（进程内只注册一次）"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _listeners_installed = True
+
+
+def init_query_stats(app: Flask):
+    """
+    为应用注册 SQL 查询统计
+
+    相关配置:
+        SQL_QUERY_STATS_ENABLED: 是否统计查询次数和耗时
+        SQL_QUERY_STATS_HEADERS: 是否在响应头中返回统计结果，默认仅调试模式
+        SQL_SLOW_QUERY_THRESHOLD: 慢查询阈值（秒），为 0 时不记录
+        SQL_QUERY_COUNT_WARNING: 单个请求的查询次数超过该值时记录警告，为 0 时不检查
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('SQL_QUERY_STATS_ENABLED', True):
+        logger.info("SQL 查询统计未启用")
+        return
+
+    install_query_listeners()
+    show_headers = app.config.get('SQL_QUERY_STATS_HEADERS')
+    count_warning = app.config.get('SQL_QUERY_COUNT_WARNING', 30)
+
+    @app.after_request
+    def report_query_stats(response: Response) -> Response:
+        """输出本次请求的查询次数和累计耗时"""
+        count = g.get('db_query_count', 0)
+        elapsed_ms = g.get('db_query_time', 0.0) * 1000
+
+        if show_headers or (show_headers is None and current_app.debug):
+            response.headers['X-DB-Query-Count'] = str(count)
+            response.headers['X-DB-Query-Time'] = f"{elapsed_ms:.2f}"
+
+        if count_warning and count > count_warning:
+            logger.warning(
+                f"请求 {request.method} {request.path} 执行了 {count} 条 SQL（累计 {elapsed_ms:.1f}ms），"
+                f"可能存在 N+1 查询"
+            )
+        return response
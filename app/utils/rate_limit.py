@@ -0,0 +1,113 @@
+"""
+限流工具模块
+
+此模块提供AI调用的并发上限和速率限制（令牌桶），
+批量分析等场景共用同一个限流器，避免超出AI服务的调用配额
+"""
+
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+
+class RateLimiter:
+    """令牌桶限流器"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化限流器
+
+        Args:
+            rate: 每秒生成的令牌数，小于等于 0 时不限速
+            burst: 令牌桶容量，即允许的瞬时突发请求数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        获取一个令牌，令牌不足时阻塞等待
+
+        Args:
+            timeout: 最长等待时间（秒），为 None 时一直等待
+
+        Returns:
+            bool: 是否获取成功
+        """
+        if self.rate <= 0:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class ProviderThrottle:
+    """AI调用限流器：同时限制并发数和调用速率"""
+
+    def __init__(self, max_concurrency: int, rate: float, burst: int = 1):
+        """
+        初始化限流器
+
+        Args:
+            max_concurrency: 最大并发调用数
+            rate: 每秒最多发起的调用数，小于等于 0 时不限速
+            burst: 允许的瞬时突发调用数
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._rate_limiter = RateLimiter(rate, burst)
+
+    def __enter__(self) -> 'ProviderThrottle':
+        """占用一个并发名额并等待令牌"""
+        self._semaphore.acquire()
+        try:
+            self._rate_limiter.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """释放并发名额"""
+        self._semaphore.release()
+        return False
+
+
+def create_ai_throttle(config: Mapping[str, Any], processes: int = 1) -> ProviderThrottle:
+    """
+    按配置创建AI调用限流器
+
+    AI_MAX_CONCURRENCY、AI_RATE_LIMIT、AI_RATE_BURST 是整个服务的配额，
+    多个工作进程时按进程数平分（每个进程至少 1 个并发和 1 个突发名额）。
+
+    Args:
+        config: 应用配置
+        processes: 共享配额的工作进程数
+
+    Returns:
+        ProviderThrottle: 本进程使用的限流器
+    """
+    processes = max(1, processes)
+    return ProviderThrottle(
+        max_concurrency=config.get('AI_MAX_CONCURRENCY', 4) // processes,
+        rate=config.get('AI_RATE_LIMIT', 5) / processes,
+        burst=config.get('AI_RATE_BURST', 5) // processes
+    )
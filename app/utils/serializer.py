@@ -0,0 +1,237 @@
+"""
+序列化工具模块
+
+此模块提供模型序列化与JSON编码的高性能实现：
+- 时间字段的时区转换结果带缓存，列表序列化时同一时间值只转换一次
+- 支持只输出指定字段（字段投影）
+- 优先使用 orjson 编码，未安装时回退到标准库 json
+"""
+
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pytz
+from flask.json.provider import DefaultJSONProvider, _default
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时回退到标准库
+    orjson = None
+
+# 设置中国时区
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+# 统一的时间输出格式
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@lru_cache(maxsize=4096)
+def format_datetime(value: Optional[datetime]) -> Optional[str]:
+    """
+    将时间转换为中国时区并格式化为字符串
+
+    转换结果按时间值缓存，避免重复执行时区换算。
+
+    Args:
+        value: 时间对象，可以为 None
+
+    Returns:
+        Optional[str]: 格式化后的时间字符串，value 为 None 时返回 None
+    """
+    if value is None:
+        return None
+    return value.astimezone(CN_TIMEZONE).strftime(DATETIME_FORMAT)
+
+
+def get_model_columns(model_class: type) -> Tuple[Tuple[str, bool], ...]:
+    """
+    获取模型的字段列表
+
+    Args:
+        model_class: SQLAlchemy 模型类
+
+    Returns:
+        Tuple[Tuple[str, bool], ...]: (字段名, 是否为时间字段) 组成的元组
+    """
+    columns = _MODEL_COLUMNS.get(model_class)
+    if columns is None:
+        columns = tuple(
+            (attr.key, _is_datetime_column(attr))
+            for attr in inspect(model_class).column_attrs
+        )
+        _MODEL_COLUMNS[model_class] = columns
+    return columns
+
+
+def _is_datetime_column(attr) -> bool:
+    """判断映射属性是否为时间字段"""
+    try:
+        return attr.columns[0].type.python_type is datetime
+    except NotImplementedError:
+        return False
+
+
+# 模型字段缓存：模型类 -> 字段列表
+_MODEL_COLUMNS: Dict[type, Tuple[Tuple[str, bool], ...]] = {}
+
+
+def parse_fields(raw: Optional[str], model_class: type) -> Optional[List[str]]:
+    """
+    解析 fields 查询参数
+
+    Args:
+        raw: 逗号分隔的字段列表，如 "id,stock_code,action"
+        model_class: 目标模型类，用于校验字段名
+
+    Returns:
+        Optional[List[str]]: 去重后的字段列表，未指定时返回 None
+
+    Raises:
+        ValueError: 存在模型不支持的字段时抛出
+    """
+    if raw is None or not raw.strip():
+        return None
+
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+
+    valid = {key for key, _ in get_model_columns(model_class)}
+    unknown = [name for name in fields if name not in valid]
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(unknown)}")
+    return fields or None
+
+
+def load_only_option(model_class: type, fields: Iterable[str]):
+    """
+    构建只加载指定字段的查询选项，使字段投影下推到 SELECT 语句
+
+    Args:
+        model_class: 模型类
+        fields: 需要加载的字段
+
+    Returns:
+        查询选项，可用于 query.options(...)
+    """
+    return load_only(*[getattr(model_class, name) for name in fields])
+
+
+def serialize_rows(rows: Sequence[Any], fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    批量将模型对象序列化为字典列表
+
+    按字段一次性处理整列数据，时间字段在本次调用内去重转换。
+
+    Args:
+        rows: 同一模型的对象列表
+        fields: 需要输出的字段，为 None 时输出全部字段
+
+    Returns:
+        List[Dict[str, Any]]: 字典列表，字段顺序与模型定义一致
+    """
+    if not rows:
+        return []
+
+    columns = get_model_columns(type(rows[0]))
+    if fields is not None:
+        wanted = set(fields)
+        columns = tuple(column for column in columns if column[0] in wanted)
+
+    results = [{} for _ in rows]
+    memo: Dict[datetime, Optional[str]] = {}
+    for key, is_datetime in columns:
+        if is_datetime:
+            for row, item in zip(rows, results):
+                value = getattr(row, key)
+                if value is None:
+                    item[key] = None
+                    continue
+                text = memo.get(value)
+                if text is None:
+                    text = memo[value] = format_datetime(value)
+                item[key] = text
+        else:
+            for row, item in zip(rows, results):
+                item[key] = getattr(row, key)
+    return results
+
+
+def serialize_row(row: Any, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    将单个模型对象序列化为字典
+
+    Args:
+        row: 模型对象，可以为 None
+        fields: 需要输出的字段，为 None 时输出全部字段
+
+    Returns:
+        Optional[Dict[str, Any]]: 序列化后的字典，row 为 None 时返回 None
+    """
+    if row is None:
+        return None
+    return serialize_rows([row], fields)[0]
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    将对象编码为 UTF-8 JSON 字节串
+
+    Args:
+        obj: 待编码对象
+        sort_keys: 是否按键排序
+        indent: 是否缩进输出
+
+    Returns:
+        bytes: JSON 字节串
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    基于 orjson 的 Flask JSON 提供器
+
+    替换应用默认的 JSON 提供器后，jsonify 以及 success_response / error_response
+    等响应工具都会使用此编码器，无需逐个修改路由。
+    """
+
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """将对象编码为 JSON 字符串"""
+        if orjson is None or kwargs.get('cls') is not None:
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return super().dumps(obj, **kwargs)
+        sort_keys = kwargs.get('sort_keys', self.sort_keys)
+        indent = bool(kwargs.get('indent'))
+        return dumps_bytes(obj, sort_keys=sort_keys, indent=indent).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any):
+        """构建 JSON 响应，直接写入编码后的字节串"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent),
+            mimetype=self.mimetype
+        )
@@ -0,0 +1,61 @@
+"""
+启动耗时统计工具模块
+
+此模块记录应用启动各阶段（导入模块、加载配置、初始化扩展、数据库初始化、加载股票代码表、
+注册蓝图等）的耗时，启动完成后输出一行汇总日志，便于定位启动变慢的原因
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """按阶段记录启动耗时"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        """
+        初始化计时器
+
+        Args:
+            started_at: 计时起点（time.perf_counter() 的值），不传时为当前时间
+        """
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self._last = self.started_at
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str):
+        """
+        记录从上一个阶段结束到现在的耗时
+
+        Args:
+            name: 阶段名称
+        """
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        """从计时起点到最后一个阶段结束的总耗时（秒）"""
+        return self._last - self.started_at
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        获取各阶段耗时（毫秒，保留一位小数），不含耗时为 0 的阶段
+
+        Returns:
+            Dict[str, float]: 阶段名称到耗时的映射，total 为总耗时
+        """
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()
+                   if round(seconds * 1000, 1) > 0}
+        timings['total'] = round(self.total * 1000, 1)
+        return timings
+
+    def log_summary(self):
+        """输出一行启动耗时汇总日志"""
+        parts = '，'.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items()
+                         if seconds * 1000 >= 0.5)
+        logger.info(f"应用启动完成，耗时 {self.total * 1000:.0f}ms（{parts}）")
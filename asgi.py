@@ -0,0 +1,22 @@
+"""
+ASGI 入口模块
+
+持仓和AI策略分析接口以异步方式处理，其余接口转交给 Flask 应用（见 app/asgi.py）：
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 2
+
+多个工作进程时设置 PRICE_UPDATER_ENABLED=false，并单独运行 python -m app.tasks.price_updater。
+未指定 FLASK_CONFIG 时使用生产环境配置
+"""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent / '.env')
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+from app import create_app
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(create_app())
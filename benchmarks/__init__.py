@@ -0,0 +1,5 @@
+"""
+基准测试包
+
+此包包含不依赖 MySQL 和外部AI服务的性能基准测试脚本，结果写入 benchmarks/results/
+"""
@@ -0,0 +1,142 @@
+"""
+AI解析延迟基准测试
+
+将 test_data/messages.txt 中的策略消息重放到 StrategyService，统计吞吐量、重试次数和延迟分位数。
+默认使用本地模拟AI（AI_TYPE=stub），不访问网络；模拟延迟、格式错误率、超时率通过 AI_STUB_* 环境变量配置。
+
+用法：
+    python -m benchmarks.ai_latency --mode ai --repeat 5 --concurrency 4
+    AI_STUB_MALFORMED_RATE=0.2 python -m benchmarks.ai_latency --mode ai
+    python -m benchmarks.ai_latency --mode ai --prompt-version v2
+
+模式：
+    full：调用 StrategyService.analyze_strategy（含规则解析和解析缓存），衡量完整链路
+    ai：调用 StrategyService.analyze_with_ai，每条消息都经过AI处理器，衡量AI调用本身
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from .common import ROOT_DIR, create_bench_app, summarize_latencies, write_results
+
+MESSAGES_PATH = ROOT_DIR / 'test_data' / 'messages.txt'
+
+
+def load_messages() -> List[str]:
+    """按 "xxx策略：" 标题拆分测试消息"""
+    content = MESSAGES_PATH.read_text(encoding='utf-8')
+    return [item.strip() for item in re.split(r'\n(?=\S*策略：\n)', content) if item.strip()]
+
+
+def run(mode: str, repeat: int, concurrency: int, use_cache: bool) -> Dict[str, Any]:
+    """
+    执行基准测试
+
+    Args:
+        mode: full 或 ai
+        repeat: 消息重放轮数
+        concurrency: 并发线程数
+        use_cache: 是否启用解析缓存
+
+    Returns:
+        Dict[str, Any]: 测试结果
+    """
+    from ai_robot import get_ai_processor
+    from ai_robot.metrics import ai_metrics, ai_metrics_snapshot
+    from ai_robot.prompts import token_usage
+    from app.services.strategy import StrategyService
+
+    app = create_bench_app(AI_CACHE_ENABLED=use_cache)
+    service = StrategyService()
+    processor = get_ai_processor()
+    if hasattr(processor, 'reset_counters'):
+        processor.reset_counters()
+    token_usage.reset()
+    ai_metrics.reset()
+
+    analyze = service.analyze_strategy if mode == 'full' else service.analyze_with_ai
+    messages = load_messages() * repeat
+
+    def analyze_one(text: str):
+        start = time.perf_counter()
+        with app.app_context():
+            try:
+                result = analyze(text)
+                ok = 'error' not in result
+            except Exception:
+                ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(analyze_one, messages))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in outcomes]
+    errors = sum(1 for _, ok in outcomes if not ok)
+    results = {
+        'benchmark': 'ai_latency',
+        'provider': processor.provider_id,
+        'prompt_version': processor.prompt_version,
+        'mode': mode,
+        'stream': processor.stream,
+        'cache': use_cache,
+        'concurrency': concurrency,
+        'requests': len(messages),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(len(messages) / elapsed, 2) if elapsed else None,
+        'latency_ms': summarize_latencies(latencies)
+    }
+
+    # 模拟AI记录了每次尝试，可以得到重试次数
+    counters = getattr(processor, 'counters', None)
+    if counters is not None:
+        results['ai'] = dict(counters, retries=counters['attempts'] - counters['calls'])
+    results['token_usage'] = token_usage.snapshot()
+    results['metrics'] = ai_metrics_snapshot()
+    return results
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='AI解析延迟基准测试')
+    parser.add_argument('--mode', choices=('full', 'ai'), default='ai', help='测试链路，默认 ai')
+    parser.add_argument('--repeat', type=int, default=3, help='消息重放轮数，默认 3')
+    parser.add_argument('--concurrency', type=int, default=4, help='并发线程数，默认 4')
+    parser.add_argument('--no-cache', action='store_true', help='禁用解析缓存')
+    parser.add_argument('--ai-type', default='stub', help='AI类型，默认 stub（本地模拟）')
+    parser.add_argument('--prompt-version', help='提示词版本（见 ai_robot/prompts.py），默认使用处理器的默认版本')
+    parser.add_argument('--output', help='结果文件路径，默认写入 benchmarks/results/')
+    parser.add_argument('--verbose', action='store_true', help='输出处理器日志')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    os.environ['AI_TYPE'] = args.ai_type
+    if args.prompt_version:
+        os.environ['AI_PROMPT_VERSION'] = args.prompt_version
+
+    results = run(args.mode, args.repeat, args.concurrency, use_cache=not args.no_cache)
+    path = write_results('ai_latency', results, args.output)
+
+    latency = results['latency_ms']
+    print(f"提供方: {results['provider']}  提示词: {results['prompt_version']}  模式: {results['mode']}  并发: {results['concurrency']}")
+    print(f"请求数: {results['requests']}  失败: {results['errors']}  "
+          f"耗时: {results['elapsed_seconds']}s  吞吐量: {results['throughput_per_second']}/s")
+    print(f"延迟(ms): p50={latency['p50']} p90={latency['p90']} p95={latency['p95']} "
+          f"p99={latency['p99']} max={latency['max']}")
+    if 'ai' in results:
+        print(f"AI调用: {results['ai']}")
+    for usage in results['token_usage']:
+        print(f"Token: 请求 {usage['requests']} 次，平均输入 {usage['avg_prompt_tokens']}，"
+              f"平均输出 {usage['avg_completion_tokens']}（估算 {usage['estimated_requests']} 次）")
+    print(f"结果已写入: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+基准测试公共模块
+
+此模块提供基准测试使用的 SQLite 应用、模拟行情数据源、延迟分位数统计和结果输出
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from config import config
+from app.models import db
+from app.utils.serializer import FastJSONProvider
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+def create_bench_app(database_url: Optional[str] = None, **overrides) -> Flask:
+    """
+    创建使用 SQLite 的应用，并建好全部表
+
+    Args:
+        database_url: 数据库地址，不传时使用临时目录中的 SQLite 文件（支持多线程并发访问）
+        **overrides: 覆盖的配置项
+
+    Returns:
+        Flask: 应用实例
+    """
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='qmt_bench_'), 'bench.db')}"
+
+    app = Flask('benchmark')
+    app.config.from_object(config['testing'])
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_ENGINE_OPTIONS={},
+        **overrides
+    )
+    app.json = FastJSONProvider(app)
+    db.init_app(app)
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        db.create_all()
+    return app
+
+
+def register_api_blueprints(app: Flask):
+    """注册与 create_app 相同的接口蓝图"""
+    from app.routes import strategy_bp, execution_bp, position_bp, account_bp, health_bp
+    app.register_blueprint(strategy_bp, url_prefix='/api/v1')
+    app.register_blueprint(execution_bp, url_prefix='/api/v1')
+    app.register_blueprint(position_bp, url_prefix='/api/v1')
+    app.register_blueprint(account_bp, url_prefix='/api/v1')
+    app.register_blueprint(health_bp)
+
+
+class StubQuoteSource:
+    """
+    模拟行情数据源
+
+    替换 PositionService._request_quote，按新浪接口格式返回随机价格，不访问网络
+    """
+
+    def __init__(self, latency: float = 0.0, seed: Optional[int] = None):
+        """
+        初始化模拟数据源
+
+        Args:
+            latency: 每次请求的模拟延迟（秒）
+            seed: 随机种子
+        """
+        self.latency = latency
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._original = None
+
+    def __call__(self, source: str, url: str, headers: Dict[str, str]) -> SimpleNamespace:
+        """返回新浪接口格式的行情响应（第 4 个字段为最新价）"""
+        with self._lock:
+            self.requests += 1
+            price = round(self._random.uniform(5, 50), 2)
+        if self.latency:
+            time.sleep(self.latency)
+        code = url.rsplit('=', 1)[-1]
+        content = f'var hq_str_{code}="模拟股票,{price},{price},{price},{price},{price}";'
+        return SimpleNamespace(status_code=200, content=content.encode('gbk'))
+
+    def install(self):
+        """替换行情请求并清空价格缓存，使每次更新都经过数据源"""
+        from app.services.position import PositionService
+        self._original = PositionService.__dict__['_request_quote']
+        PositionService._request_quote = staticmethod(self)
+        self.clear_price_cache()
+
+    def uninstall(self):
+        """恢复真实的行情请求"""
+        from app.services.position import PositionService
+        if self._original is not None:
+            PositionService._request_quote = self._original
+            self._original = None
+
+    @staticmethod
+    def clear_price_cache():
+        """清空 PositionService 的进程内价格缓存"""
+        from app.services.position import PositionService
+        PositionService._PositionService__price_cache.clear()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    计算分位数（最近秩法）
+
+    Args:
+        sorted_values: 已排序的数值
+        pct: 百分位（0-100）
+
+    Returns:
+        float: 分位数，无数据时返回 0
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    汇总延迟分布（毫秒）
+
+    Args:
+        latencies: 每次调用的耗时（秒）
+
+    Returns:
+        Dict[str, float]: 包含 count、mean、p50、p90、p95、p99、max
+    """
+    values = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'count': len(values),
+        'mean': to_ms(sum(values) / len(values)) if values else 0.0,
+        'p50': to_ms(percentile(values, 50)),
+        'p90': to_ms(percentile(values, 90)),
+        'p95': to_ms(percentile(values, 95)),
+        'p99': to_ms(percentile(values, 99)),
+        'max': to_ms(values[-1]) if values else 0.0
+    }
+
+
+def write_results(name: str, results: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """
+    将结果写入 JSON 文件
+
+    Args:
+        name: 基准测试名称
+        results: 结果数据
+        output: 输出文件路径，不传时写入 benchmarks/results/<name>-<时间>.json
+
+    Returns:
+        Path: 输出文件路径
+    """
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    return path
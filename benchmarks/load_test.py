@@ -0,0 +1,485 @@
+"""
+HTTP 负载测试
+
+按场景以真实 HTTP 请求驱动应用：在本进程中启动多线程服务（SQLite + 模拟行情数据源 + 模拟AI），
+或通过 --url 指向已启动的服务，按阶段逐步提高并发，统计每个阶段各接口的吞吐量、
+p50/p95/p99 延迟和错误率。
+
+场景：
+    trading_day    交易日混合负载：看板轮询持仓和资金、策略搜索、创建执行记录、AI策略分析
+    dashboard      只有看板轮询（GET /positions、GET /account/funds）
+    search         只有策略搜索
+    analyze        只有AI策略分析（POST /analyze_strategy）
+
+AI策略分析默认发送规则解析不识别的自由格式文本，请求经过解析缓存和模拟AI（--ai-latency 生效）；
+--ai-text template 改为重放 test_data/messages.txt 的模板文本，由规则解析直接返回，不调用AI。
+本地服务的每个阶段记录模拟AI的调用次数。
+
+每个阶段开始前可按 --burst 模拟 09:30 开盘时的集中下单：所有并发用户同时提交 POST /executions，
+结果单独统计。
+
+用法：
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --scenario dashboard --stages 1 8 32 --duration 20
+    python -m benchmarks.load_test --burst 50 --quote-latency 0.05 --ai-latency 0.3
+    python -m benchmarks.load_test --scenario analyze --ai-latency 1.0 --stages 4
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --scenario search
+
+结果写入 benchmarks/results/load_test-<时间>.json
+"""
+
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .common import StubQuoteSource, create_bench_app, register_api_blueprints, summarize_latencies, write_results
+
+# 场景中各接口的权重
+SCENARIOS = {
+    'trading_day': {
+        'get_positions': 30,
+        'get_account_funds': 30,
+        'search_strategies': 20,
+        'create_execution': 10,
+        'analyze_strategy': 10,
+    },
+    'dashboard': {
+        'get_positions': 50,
+        'get_account_funds': 50,
+    },
+    'search': {
+        'search_strategies': 100,
+    },
+    'analyze': {
+        'analyze_strategy': 100,
+    },
+}
+
+# 单次请求超时（秒）
+REQUEST_TIMEOUT = 30
+
+# 开盘集中下单的统计名称
+BURST_ENDPOINT = 'create_execution(burst)'
+
+# 自由格式的策略文本（不含"股票名称"、"操作要求"等模板标题，规则解析不识别，需要调用AI）
+FREE_FORM_TEMPLATES = (
+    '{name}（{code}）回调到{price}元附近可以{verb}，仓位控制在{ratio}%以内',
+    '看好{name}（{code}）后续走势，{verb}{ratio}%，跌破{stop}元止损',
+    '{name}（{code}）放量突破前高，建议{verb}，目标价{target}元',
+)
+FREE_FORM_VERBS = ('买入', '加仓', '减仓', '卖出')
+
+
+class LocalServer:
+    """在后台线程中运行的多线程 HTTP 服务"""
+
+    def __init__(self, app, host: str = '127.0.0.1', port: int = 0):
+        """
+        创建服务
+
+        Args:
+            app: 应用实例
+            host: 监听地址
+            port: 监听端口，0 表示随机可用端口
+        """
+        from werkzeug.serving import make_server
+        self._server = make_server(host, port, app, threaded=True)
+        self.url = f'http://{host}:{self._server.server_port}'
+        self._thread = threading.Thread(target=self._server.serve_forever, name='load-test-server', daemon=True)
+
+    def start(self):
+        """开始处理请求"""
+        self._thread.start()
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._thread.join()
+
+
+def prepare_local_app(args) -> Tuple[Any, List[int], StubQuoteSource]:
+    """
+    创建本地测试应用并写入测试数据
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        Tuple: 应用实例、策略ID列表、已安装的模拟行情数据源
+    """
+    from app.utils.rate_limit import ProviderThrottle
+    from .services import seed_data
+
+    app = create_bench_app(AI_CACHE_ENABLED=args.ai_cache, COMPRESS_ENABLED=False)
+    app.extensions['ai_throttle'] = ProviderThrottle(
+        max_concurrency=app.config.get('AI_MAX_CONCURRENCY', 4),
+        rate=app.config.get('AI_RATE_LIMIT', 5),
+        burst=app.config.get('AI_RATE_BURST', 5)
+    )
+    register_api_blueprints(app)
+
+    seeded = seed_data(app, args.strategies, args.executions_per_strategy, args.positions, args.seed)
+    quotes = StubQuoteSource(latency=args.quote_latency, seed=args.seed)
+    quotes.install()
+    return app, seeded['strategy_ids'], quotes
+
+
+def fetch_strategy_ids(base_url: str) -> List[int]:
+    """从已启动的服务读取现有策略ID（用于 --url 模式下创建执行记录）"""
+    response = requests.get(f'{base_url}/api/v1/strategies/search',
+                            params={'fields': 'id'}, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return [item['id'] for item in response.json().get('data') or []]
+
+
+def free_form_message(rng: random.Random) -> str:
+    """
+    生成一条规则解析不识别的自由格式策略文本
+
+    Args:
+        rng: 随机数生成器
+
+    Returns:
+        str: 策略文本
+    """
+    from .services import STOCK_NAMES
+
+    index = rng.randrange(len(STOCK_NAMES))
+    price = rng.choice((10, 12, 15, 18))
+    return rng.choice(FREE_FORM_TEMPLATES).format(
+        name=STOCK_NAMES[index], code=f'{600000 + index:06d}', verb=rng.choice(FREE_FORM_VERBS),
+        price=price, ratio=rng.choice((5, 10, 20)), stop=price - 1, target=price + 3
+    )
+
+
+def build_requests(strategy_ids: List[int], messages: Optional[List[str]] = None) -> Dict[str, Callable]:
+    """
+    构建各接口的单次请求
+
+    Args:
+        strategy_ids: 创建执行记录时使用的策略ID
+        messages: AI策略分析使用的策略文本，为 None 时每次生成自由格式文本
+
+    Returns:
+        Dict[str, Callable]: 接口名称到请求函数的映射，请求函数参数为 (session, base_url, rng)
+    """
+    from .services import STOCK_NAMES
+
+    def get_positions(session, base_url, rng):
+        return session.get(f'{base_url}/api/v1/positions', timeout=REQUEST_TIMEOUT)
+
+    def get_account_funds(session, base_url, rng):
+        return session.get(f'{base_url}/api/v1/account/funds', timeout=REQUEST_TIMEOUT)
+
+    def search_strategies(session, base_url, rng):
+        params = rng.choice((
+            {'is_active': 'true'},
+            {'stock_name': rng.choice(STOCK_NAMES), 'fields': 'id,stock_code,stock_name,action'},
+            {'action': 'buy', 'order': 'asc'},
+        ))
+        return session.get(f'{base_url}/api/v1/strategies/search', params=params, timeout=REQUEST_TIMEOUT)
+
+    def create_execution(session, base_url, rng):
+        return session.post(f'{base_url}/api/v1/executions', json={
+            'strategy_id': rng.choice(strategy_ids),
+            'execution_price': round(rng.uniform(10, 20), 2),
+            'volume': 100,
+            'strategy_status': 'partial',
+            'remarks': '负载测试'
+        }, timeout=REQUEST_TIMEOUT)
+
+    def analyze_strategy(session, base_url, rng):
+        text = rng.choice(messages) if messages else free_form_message(rng)
+        return session.post(f'{base_url}/api/v1/analyze_strategy',
+                            json={'strategy_text': text}, timeout=REQUEST_TIMEOUT)
+
+    return {
+        'get_positions': get_positions,
+        'get_account_funds': get_account_funds,
+        'search_strategies': search_strategies,
+        'create_execution': create_execution,
+        'analyze_strategy': analyze_strategy,
+    }
+
+
+class Recorder:
+    """线程安全地记录每次请求的耗时和结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: str, ok: bool):
+        """
+        记录一次请求
+
+        Args:
+            endpoint: 接口名称
+            seconds: 耗时（秒）
+            status: HTTP 状态码，连接失败或超时时为异常类型名称
+            ok: 是否成功
+        """
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.status_codes[endpoint][status] += 1
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        汇总各接口的吞吐量、延迟分位数和错误率
+
+        Args:
+            elapsed: 统计时长（秒）
+
+        Returns:
+            Dict[str, Any]: 按接口汇总的结果和合计
+        """
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            count = len(latencies)
+            endpoints[endpoint] = {
+                'requests': count,
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / count, 4),
+                'throughput_per_second': round(count / elapsed, 2) if elapsed else None,
+                'latency_ms': summarize_latencies(latencies),
+                'status_codes': dict(self.status_codes[endpoint])
+            }
+
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'requests': total,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'throughput_per_second': round(total / elapsed, 2) if elapsed else None,
+            'latency_ms': summarize_latencies([value for values in self.latencies.values() for value in values]),
+            'endpoints': endpoints
+        }
+
+
+def send(recorder: Recorder, endpoint: str, request_func: Callable, session: requests.Session,
+         base_url: str, rng: random.Random):
+    """发送一次请求并记录结果（HTTP 状态码或响应中的 code 不小于 400 时视为失败）"""
+    start = time.perf_counter()
+    try:
+        response = request_func(session, base_url, rng)
+        payload = response.json() if 'json' in response.headers.get('Content-Type', '') else {}
+        elapsed = time.perf_counter() - start
+        code = payload.get('code', 200) if isinstance(payload, dict) else 200
+        ok = response.status_code < 400 and code < 400
+        recorder.record(endpoint, elapsed, str(response.status_code), ok)
+    except requests.RequestException as e:
+        recorder.record(endpoint, time.perf_counter() - start, type(e).__name__, False)
+
+
+def run_burst(base_url: str, request_func: Callable, size: int, seed: int) -> Dict[str, Any]:
+    """
+    模拟开盘集中下单：所有请求在同一时刻提交
+
+    Args:
+        base_url: 服务地址
+        request_func: 创建执行记录的请求函数
+        size: 同时提交的请求数
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 汇总结果
+    """
+    recorder = Recorder()
+    barrier = threading.Barrier(size)
+
+    def submit(index: int):
+        rng = random.Random(seed + index)
+        with requests.Session() as session:
+            barrier.wait()
+            send(recorder, BURST_ENDPOINT, request_func, session, base_url, rng)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        list(executor.map(submit, range(size)))
+    return recorder.summary(time.perf_counter() - start)
+
+
+def run_stage(base_url: str, request_funcs: Dict[str, Callable], weights: Dict[str, int],
+              concurrency: int, duration: float, think_time: float, seed: int) -> Dict[str, Any]:
+    """
+    以固定并发持续发送请求
+
+    Args:
+        base_url: 服务地址
+        request_funcs: 各接口的请求函数
+        weights: 场景中各接口的权重
+        concurrency: 并发用户数
+        duration: 持续时间（秒）
+        think_time: 每个用户两次请求之间的等待时间（秒）
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 汇总结果
+    """
+    recorder = Recorder()
+    names, name_weights = list(weights), list(weights.values())
+    deadline = time.perf_counter() + duration
+
+    def user(index: int):
+        rng = random.Random(seed + index)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                endpoint = rng.choices(names, name_weights)[0]
+                send(recorder, endpoint, request_funcs[endpoint], session, base_url, rng)
+                if think_time:
+                    time.sleep(think_time)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(user, range(concurrency)))
+    return recorder.summary(time.perf_counter() - start)
+
+
+def run(args) -> Dict[str, Any]:
+    """
+    执行负载测试
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        Dict[str, Any]: 测试结果
+    """
+    from ai_robot import get_ai_processor
+    from .ai_latency import load_messages
+
+    server: Optional[LocalServer] = None
+    quotes: Optional[StubQuoteSource] = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+        strategy_ids = fetch_strategy_ids(base_url)
+    else:
+        app, strategy_ids, quotes = prepare_local_app(args)
+        server = LocalServer(app)
+        server.start()
+        base_url = server.url
+
+    weights = SCENARIOS[args.scenario]
+    needs_strategies = args.burst or 'create_execution' in weights
+    if needs_strategies and not strategy_ids:
+        raise SystemExit('服务中没有策略，无法创建执行记录')
+
+    request_funcs = build_requests(strategy_ids, load_messages() if args.ai_text == 'template' else None)
+    # 本地服务使用模拟AI，按阶段统计实际调用次数
+    processor = None if args.url else get_ai_processor()
+    if not hasattr(processor, 'reset_counters'):
+        processor = None
+    stages = []
+    try:
+        for index, concurrency in enumerate(args.stages):
+            stage = {'concurrency': concurrency}
+            if processor is not None:
+                processor.reset_counters()
+            if args.burst:
+                stage['burst'] = run_burst(base_url, request_funcs['create_execution'], args.burst,
+                                           args.seed + index * 10000)
+            stage.update(run_stage(base_url, request_funcs, weights, concurrency, args.duration,
+                                   args.think_time, args.seed + index * 10000))
+            if processor is not None:
+                stage['ai'] = dict(processor.counters)
+            stages.append(stage)
+            print_stage(stage)
+    finally:
+        if server is not None:
+            server.stop()
+        if quotes is not None:
+            quotes.uninstall()
+
+    return {
+        'benchmark': 'load_test',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': args.url or 'local',
+        'scenario': args.scenario,
+        'weights': weights,
+        'duration_seconds': args.duration,
+        'think_time_seconds': args.think_time,
+        'burst': args.burst,
+        'quote_latency_seconds': None if args.url else args.quote_latency,
+        'quote_requests': quotes.requests if quotes else None,
+        'ai_text': args.ai_text,
+        'ai_cache': args.ai_cache,
+        'stages': stages
+    }
+
+
+def print_stage(stage: Dict[str, Any]):
+    """输出单个阶段的结果"""
+    print(f"\n并发 {stage['concurrency']}：请求 {stage['requests']}，吞吐量 {stage['throughput_per_second']}/s，"
+          f"错误率 {stage['error_rate']:.2%}")
+    print(f"{'接口':<26}{'请求数':>8}{'吞吐量/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'错误率':>9}")
+    endpoints = dict(stage['endpoints'])
+    if 'burst' in stage:
+        endpoints.update(stage['burst']['endpoints'])
+    for name, result in endpoints.items():
+        latency = result['latency_ms']
+        print(f"{name:<26}{result['requests']:>8}{result['throughput_per_second']:>10}{latency['p50']:>10}"
+              f"{latency['p95']:>10}{latency['p99']:>10}{result['error_rate']:>9.2%}")
+
+    analyze = stage['endpoints'].get('analyze_strategy')
+    if 'ai' in stage and analyze:
+        print(f"模拟AI调用 {stage['ai']['calls']} 次（尝试 {stage['ai']['attempts']} 次），"
+              f"AI策略分析请求 {analyze['requests']} 次")
+        if stage['ai']['calls'] == 0:
+            print("警告：AI策略分析请求没有调用模拟AI（均由规则解析或解析缓存返回），--ai-latency 不影响结果")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='HTTP 负载测试')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='trading_day', help='负载场景，默认 trading_day')
+    parser.add_argument('--stages', type=int, nargs='+', default=[1, 4, 16], help='各阶段的并发用户数，默认 1 4 16')
+    parser.add_argument('--duration', type=float, default=10, help='每个阶段的持续时间（秒），默认 10')
+    parser.add_argument('--think-time', type=float, default=0.0, help='每个用户两次请求之间的等待时间（秒），默认 0')
+    parser.add_argument('--burst', type=int, default=0, help='每个阶段开始前同时提交的执行记录数（模拟开盘），默认 0')
+    parser.add_argument('--url', help='已启动服务的地址，不传时在本进程中启动使用 SQLite 和模拟数据源的服务')
+    parser.add_argument('--strategies', type=int, default=500, help='本地服务写入的策略数量，默认 500')
+    parser.add_argument('--executions-per-strategy', type=int, default=5, help='每个策略的执行记录数，默认 5')
+    parser.add_argument('--positions', type=int, default=100, help='本地服务写入的持仓数量，默认 100')
+    parser.add_argument('--quote-latency', type=float, default=0.02, help='模拟行情请求延迟（秒），默认 0.02')
+    parser.add_argument('--ai-latency', type=float, help='模拟AI响应延迟（秒），默认使用 AI_STUB_LATENCY')
+    parser.add_argument('--ai-cache', action='store_true',
+                        help='启用解析缓存（默认禁用，使每次自由格式文本分析都调用模拟AI）')
+    parser.add_argument('--ai-text', choices=('free', 'template'), default='free',
+                        help='AI策略分析的文本：free 为规则解析不识别的自由格式文本，'
+                             'template 为 test_data/messages.txt 的模板文本（由规则解析返回，不调用AI），默认 free')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子，默认 42')
+    parser.add_argument('--output', help='结果文件路径，默认写入 benchmarks/results/')
+    parser.add_argument('--verbose', action='store_true', help='输出应用日志')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # 业务代码按请求输出大量 INFO 日志，会明显影响耗时
+        logging.disable(logging.INFO)
+    if not args.url:
+        os.environ['AI_TYPE'] = 'stub'
+        if args.ai_latency is not None:
+            os.environ['AI_STUB_LATENCY'] = str(args.ai_latency)
+
+    results = run(args)
+    path = write_results('load_test', results, args.output)
+    print(f"\n结果已写入: {path}")
+
+
+if __name__ == '__main__':
+    main()
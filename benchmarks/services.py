@@ -0,0 +1,294 @@
+"""
+业务接口基准测试
+
+在 SQLite 数据库上启动应用（不依赖 MySQL），使用模拟行情数据源，写入指定数量的策略、执行记录和持仓后，
+通过测试客户端调用以下接口并统计延迟分位数和每次请求的 SQL 次数：
+
+    create_execution       POST /api/v1/executions
+    update_all_positions   GET  /api/v1/positions（更新全部持仓市值）
+    get_account_funds      GET  /api/v1/account/funds
+    search_strategies      GET  /api/v1/strategies/search
+    batch_get_executions   POST /api/v1/executions/batch
+
+用法：
+    python -m benchmarks.services
+    python -m benchmarks.services --strategies 2000 --positions 300 --iterations 100
+    python -m benchmarks.services --ops search_strategies batch_get_executions --database memory
+    python -m benchmarks.services --quote-latency 0.02 --ops update_all_positions
+
+结果写入 benchmarks/results/services-<时间>.json，可用于对比不同版本的性能。
+"""
+
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from .common import StubQuoteSource, create_bench_app, register_api_blueprints, summarize_latencies, write_results
+
+OPERATIONS = (
+    'create_execution',
+    'update_all_positions',
+    'get_account_funds',
+    'search_strategies',
+    'batch_get_executions',
+)
+
+# 写入的股票名称（代码按序号生成）
+STOCK_NAMES = ('平安银行', '贵州茅台', '宁德时代', '招商银行', '中国平安', '比亚迪', '五粮液', '美的集团')
+
+
+def seed_data(app, strategies: int, executions_per_strategy: int, positions: int, seed: int) -> Dict[str, Any]:
+    """
+    写入测试数据
+
+    Args:
+        app: 应用实例
+        strategies: 策略数量
+        executions_per_strategy: 每个策略的执行记录数
+        positions: 持仓数量
+        seed: 随机种子
+
+    Returns:
+        Dict[str, Any]: 写入的数据量和策略ID列表
+    """
+    from app.models import db, AccountFunds, StockPosition, StockStrategy, StrategyExecution
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    with app.app_context():
+        # 资金充足，保证买入类执行记录不会因可用资金不足而失败
+        db.session.add(AccountFunds(
+            id=1, initial_assets=1e10, total_assets=1e10, available_funds=1e10,
+            frozen_funds=0, total_profit=0, total_profit_ratio=0
+        ))
+
+        strategy_rows = []
+        for i in range(strategies):
+            created_at = now - timedelta(minutes=strategies - i)
+            strategy_rows.append(StockStrategy(
+                stock_name=STOCK_NAMES[i % len(STOCK_NAMES)],
+                stock_code=f'{600000 + i % max(positions, 1):06d}',
+                action=rng.choice(('buy', 'add')),
+                position_ratio=rng.choice((1, 2, 5)),
+                price_min=10.0,
+                price_max=20.0,
+                reason='基准测试数据',
+                created_at=created_at,
+                updated_at=created_at,
+                is_active=rng.random() < 0.7
+            ))
+        db.session.add_all(strategy_rows)
+        db.session.flush()
+
+        execution_rows = []
+        for strategy in strategy_rows:
+            for j in range(executions_per_strategy):
+                execution_rows.append(StrategyExecution(
+                    strategy_id=strategy.id,
+                    stock_code=strategy.stock_code,
+                    stock_name=strategy.stock_name,
+                    action=strategy.action,
+                    execution_price=round(rng.uniform(10, 20), 2),
+                    volume=100,
+                    execution_result='success',
+                    execution_time=strategy.created_at + timedelta(seconds=j)
+                ))
+        db.session.add_all(execution_rows)
+
+        for i in range(positions):
+            price = round(rng.uniform(10, 20), 2)
+            db.session.add(StockPosition(
+                stock_code=f'{600000 + i:06d}',
+                stock_name=STOCK_NAMES[i % len(STOCK_NAMES)],
+                total_volume=1000,
+                original_cost=price,
+                dynamic_cost=price,
+                total_amount=price * 1000,
+                latest_price=price,
+                market_value=price * 1000,
+                original_position_ratio=5
+            ))
+        db.session.commit()
+
+        return {
+            'strategies': len(strategy_rows),
+            'executions': len(execution_rows),
+            'positions': positions,
+            'strategy_ids': [strategy.id for strategy in strategy_rows]
+        }
+
+
+def build_operations(client, strategy_ids: List[int], rng: random.Random) -> Dict[str, Callable]:
+    """
+    构建各接口的单次调用
+
+    Args:
+        client: 测试客户端
+        strategy_ids: 策略ID列表
+        rng: 随机数生成器
+
+    Returns:
+        Dict[str, Callable]: 接口名称到调用函数的映射，调用函数返回响应对象
+    """
+    def create_execution():
+        return client.post('/api/v1/executions', json={
+            'strategy_id': rng.choice(strategy_ids),
+            'execution_price': round(rng.uniform(10, 20), 2),
+            'volume': 100,
+            'strategy_status': 'partial',
+            'remarks': '基准测试'
+        })
+
+    def update_all_positions():
+        # 清空价格缓存，使每次调用都经过行情数据源
+        StubQuoteSource.clear_price_cache()
+        return client.get('/api/v1/positions')
+
+    def get_account_funds():
+        return client.get('/api/v1/account/funds')
+
+    def search_strategies():
+        params = rng.choice((
+            {'is_active': 'true'},
+            {'stock_code': f'{600000 + rng.randrange(100):06d}'},
+            {'stock_name': rng.choice(STOCK_NAMES), 'fields': 'id,stock_code,stock_name,action'},
+            {'action': 'buy', 'order': 'asc'},
+        ))
+        return client.get('/api/v1/strategies/search', query_string=params)
+
+    def batch_get_executions():
+        return client.post('/api/v1/executions/batch', json={
+            'strategy_ids': rng.sample(strategy_ids, min(20, len(strategy_ids))),
+            'limit': 5
+        })
+
+    return {
+        'create_execution': create_execution,
+        'update_all_positions': update_all_positions,
+        'get_account_funds': get_account_funds,
+        'search_strategies': search_strategies,
+        'batch_get_executions': batch_get_executions,
+    }
+
+
+def measure(operation: Callable, iterations: int, warmup: int) -> Dict[str, Any]:
+    """
+    重复调用接口并统计结果
+
+    Args:
+        operation: 单次调用函数
+        iterations: 统计的调用次数
+        warmup: 预热调用次数（不计入统计）
+
+    Returns:
+        Dict[str, Any]: 延迟分位数、失败次数、平均 SQL 次数和响应大小
+    """
+    for _ in range(warmup):
+        operation().close()
+
+    latencies, query_counts, sizes = [], [], []
+    errors = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = operation()
+        body = response.get_data()
+        latencies.append(time.perf_counter() - start)
+        response.close()
+
+        payload_code = response.json.get('code', 200) if response.is_json else 200
+        if response.status_code >= 400 or payload_code >= 400:
+            errors += 1
+        query_counts.append(int(response.headers.get('X-DB-Query-Count', 0)))
+        sizes.append(len(body))
+
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'latency_ms': summarize_latencies(latencies),
+        'avg_queries': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0,
+        'max_queries': max(query_counts, default=0),
+        'avg_response_bytes': round(sum(sizes) / len(sizes)) if sizes else 0
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    """
+    执行基准测试
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        Dict[str, Any]: 测试结果
+    """
+    from app.utils.query_stats import init_query_stats
+
+    database_url = 'sqlite://' if args.database == 'memory' else args.database
+    app = create_bench_app(database_url, SQL_QUERY_STATS_HEADERS=True, COMPRESS_ENABLED=False)
+    init_query_stats(app)
+    register_api_blueprints(app)
+
+    seeded = seed_data(app, args.strategies, args.executions_per_strategy, args.positions, args.seed)
+    quotes = StubQuoteSource(latency=args.quote_latency, seed=args.seed)
+    quotes.install()
+    try:
+        operations = build_operations(app.test_client(), seeded['strategy_ids'], random.Random(args.seed))
+        results = {}
+        for name in args.ops:
+            results[name] = measure(operations[name], args.iterations, args.warmup)
+    finally:
+        quotes.uninstall()
+
+    return {
+        'benchmark': 'services',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'database': 'memory' if args.database == 'memory' else ('file' if args.database is None else args.database),
+        'dataset': {key: value for key, value in seeded.items() if key != 'strategy_ids'},
+        'quote_latency_seconds': args.quote_latency,
+        'quote_requests': quotes.requests,
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'results': results
+    }
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='业务接口基准测试（SQLite + 模拟行情数据源）')
+    parser.add_argument('--strategies', type=int, default=500, help='策略数量，默认 500')
+    parser.add_argument('--executions-per-strategy', type=int, default=5, help='每个策略的执行记录数，默认 5')
+    parser.add_argument('--positions', type=int, default=100, help='持仓数量，默认 100')
+    parser.add_argument('--iterations', type=int, default=50, help='每个接口统计的调用次数，默认 50')
+    parser.add_argument('--warmup', type=int, default=5, help='每个接口的预热调用次数，默认 5')
+    parser.add_argument('--ops', nargs='+', choices=OPERATIONS, default=list(OPERATIONS), help='要测试的接口，默认全部')
+    parser.add_argument('--database', help='数据库地址，memory 表示内存 SQLite，默认使用临时 SQLite 文件')
+    parser.add_argument('--quote-latency', type=float, default=0.0, help='模拟行情请求延迟（秒），默认 0')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子，默认 42')
+    parser.add_argument('--output', help='结果文件路径，默认写入 benchmarks/results/')
+    parser.add_argument('--verbose', action='store_true', help='输出应用日志')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # 业务代码按请求输出大量 INFO 日志，会明显影响耗时
+        logging.disable(logging.INFO)
+
+    results = run(args)
+    path = write_results('services', results, args.output)
+
+    dataset = results['dataset']
+    print(f"数据量: 策略 {dataset['strategies']}，执行记录 {dataset['executions']}，持仓 {dataset['positions']}  "
+          f"数据库: {results['database']}")
+    print(f"{'接口':<24}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'SQL/次':>9}{'失败':>6}")
+    for name, result in results['results'].items():
+        latency = result['latency_ms']
+        print(f"{name:<24}{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}{latency['max']:>10}"
+              f"{result['avg_queries']:>9}{result['errors']:>6}")
+    print(f"结果已写入: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,38 @@
 import os
 from datetime import timedelta
 
+
+def pool_options(pool_size: int, max_overflow: int) -> dict:
+    """
+    生成数据库引擎的连接池配置，环境变量优先于各环境的默认容量
+
+    相关环境变量:
+        DB_POOL_SIZE: 连接池常驻连接数
+        DB_MAX_OVERFLOW: 高峰时允许额外建立的连接数
+        DB_POOL_TIMEOUT: 连接全部借出时等待空闲连接的最长时间（秒），默认 30
+        DB_POOL_RECYCLE: 连接使用多久后重建（秒），默认 1800，需小于 MySQL 的 wait_timeout
+        DB_POOL_PRE_PING: 借出连接前是否先 ping 检查连接可用，默认 true（断开的连接会被替换，而不是让请求报错）
+
+    Args:
+        pool_size: 默认常驻连接数
+        max_overflow: 默认溢出连接数
+
+    Returns:
+        dict: SQLALCHEMY_ENGINE_OPTIONS
+    """
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', str(pool_size))),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', str(max_overflow))),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),  # 30分钟回收连接
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'connect_args': {
+            'charset': 'utf8mb4',
+            'connect_timeout': 30,
+        }
+    }
+
+
 class BaseConfig:
     """基础配置类"""
     # Flask配置
@@ -42,17 +74,56 @@ class BaseConfig:
         f"{MYSQL_DATABASE}?charset=utf8mb4"
     )
     
-    # 数据库连接池配置
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'max_overflow': 20,
-        'pool_timeout': 30,
-        'pool_recycle': 1800,  # 30分钟回收连接
-        'connect_args': {
-            'charset': 'utf8mb4',
-            'connect_timeout': 30,
-        }
-    }
+    # 启动时是否检查数据库和表结构（连接 MySQL 创建缺少的数据库和表），默认跳过以加快启动
+    # 首次部署或新增模型后设为 true 启动一次，或执行 python scripts/init_db.py
+    DB_BOOTSTRAP = os.getenv('DB_BOOTSTRAP', 'false').lower() == 'true'
+    
+    # 数据库连接池配置（各环境按 pool_options 设置自己的容量，见 development.py/production.py/testing.py）
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=10, max_overflow=20)
+    # 启动时预先建立的连接数（不超过 pool_size），0 表示不预热，首个请求时再建立连接
+    DB_POOL_WARMUP = int(os.getenv('DB_POOL_WARMUP', '0'))
+    # 是否在创建应用时预热；Gunicorn preload 时由 gunicorn.conf.py 关闭，改为每个工作进程启动后预热
+    DB_POOL_WARMUP_ON_CREATE = os.getenv('DB_POOL_WARMUP_ON_CREATE', 'true').lower() == 'true'
+    
+    # 只读副本配置（逗号分隔的数据库地址，为空时全部读写使用主库）
+    # 列表、搜索和批量查询接口从副本读取，副本使用与主库相同的连接池配置
+    DB_READ_REPLICA_URLS = [url.strip() for url in os.getenv('DB_READ_REPLICA_URLS', '').split(',') if url.strip()]
+    DB_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', '5'))  # 客户端写入后从主库读取的时间（秒）
+    
+    # 响应压缩配置
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))  # 小于该字节数的响应不压缩
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzip 压缩级别（1-9）
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', '4'))  # brotli 压缩级别（0-11）
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_CACHE_SIZE = 128  # 压缩结果缓存条目数
+    
+    # 运行指标配置（/metrics 接口）
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'  # 是否采集请求数和延迟指标
+    
+    # SQL 查询统计配置
+    SQL_QUERY_STATS_ENABLED = os.getenv('SQL_QUERY_STATS_ENABLED', 'true').lower() == 'true'
+    SQL_QUERY_STATS_HEADERS = None  # 是否返回 X-DB-Query-Count/X-DB-Query-Time 响应头，None 表示仅调试模式
+    SQL_SLOW_QUERY_THRESHOLD = float(os.getenv('SQL_SLOW_QUERY_THRESHOLD', '0.5'))  # 慢查询阈值（秒），0 表示不记录
+    SQL_QUERY_COUNT_WARNING = int(os.getenv('SQL_QUERY_COUNT_WARNING', '30'))  # 单个请求查询次数超过该值时记录警告
+    
+    # 请求剖析配置（cProfile 结果写入 logs/profiles/）
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # 随机采样比例（0-1），0 表示只按请求头触发
+    PROFILE_HEADER = 'X-Profile'  # 按需剖析的请求头，值需与 PROFILE_TOKEN 一致
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # 为空时不允许通过请求头触发
+    PROFILE_DIR = os.getenv('PROFILE_DIR', '')  # 剖析结果目录，为空时使用 logs/profiles
+    PROFILE_MIN_DURATION = float(os.getenv('PROFILE_MIN_DURATION', '0'))  # 耗时低于该值（秒）的请求不保存结果
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))  # 最多保留的剖析结果数
+    
+    # 股价自动更新配置
+    # 是否在应用进程中启动股价自动更新；Gunicorn 多进程部署时由 gunicorn.conf.py 关闭，改由独立进程运行
+    PRICE_UPDATER_ENABLED = os.getenv('PRICE_UPDATER_ENABLED', 'true').lower() == 'true'
+    
+    # 异步接口配置（ASGI 部署，见 asgi.py）
+    ASYNC_AI_THREADS = int(os.getenv('ASYNC_AI_THREADS', '32'))  # 同时执行AI解析的线程数，其余请求以协程等待
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', '100'))  # 异步行情请求的最大连接数
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '0'))  # 处理其余（同步）接口的线程数，0 表示等于连接池 pool_size
     
     # 日志配置
     LOG_LEVEL = 'INFO'
@@ -65,6 +136,27 @@ class BaseConfig:
     # AI配置
     AI_TYPE = os.getenv('AI_TYPE', 'zhipu')
     
+    # AI解析缓存配置
+    AI_CACHE_ENABLED = os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true'
+    AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(7 * 24 * 3600)))  # 缓存有效期（秒），默认7天
+    AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '10000'))  # 最大缓存条目数，超出按最近命中时间淘汰
+    
+    # 异步策略分析任务配置
+    AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', '4'))  # 后台并发分析的任务数
+    AI_JOB_MAX_PENDING = int(os.getenv('AI_JOB_MAX_PENDING', '100'))  # 未完成任务上限，超出时拒绝提交
+    AI_JOB_RESULT_TTL = int(os.getenv('AI_JOB_RESULT_TTL', '3600'))  # 已完成任务结果保留时间（秒）
+    AI_JOB_POLL_INTERVAL = float(os.getenv('AI_JOB_POLL_INTERVAL', '1'))  # 等待其他进程的任务时读取数据库的间隔（秒）
+    AI_JOB_SSE_HEARTBEAT = 15  # SSE 心跳间隔（秒）
+    AI_JOB_SSE_TIMEOUT = int(os.getenv('AI_JOB_SSE_TIMEOUT', '120'))  # SSE 最长等待时间（秒）
+    AI_JOB_SSE_MAX_SUBSCRIBERS = int(os.getenv('AI_JOB_SSE_MAX_SUBSCRIBERS', '4'))  # 每个进程的 SSE 连接数上限，超出时返回 429
+    AI_JOB_SSE_PROGRESS_INTERVAL = 0.2  # SSE 推送流式进度的最小间隔（秒）
+    
+    # 批量策略分析配置
+    AI_BATCH_MAX_ITEMS = int(os.getenv('AI_BATCH_MAX_ITEMS', '100'))  # 单次批量分析的最大条数
+    AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', '4'))  # 同时进行的AI调用数上限（Gunicorn 部署时为全部工作进程的总数，按进程数平分）
+    AI_RATE_LIMIT = float(os.getenv('AI_RATE_LIMIT', '5'))  # 每秒最多发起的AI调用数，0 表示不限速
+    AI_RATE_BURST = int(os.getenv('AI_RATE_BURST', '5'))  # 允许的瞬时突发调用数
+    
     @staticmethod
     def init_app(app):
         """初始化应用"""
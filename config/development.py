@@ -4,7 +4,7 @@
 此模块定义了开发环境特定的配置
 """
 
-from .base import BaseConfig
+from .base import BaseConfig, pool_options
 
 class DevelopmentConfig(BaseConfig):
     """开发环境配置类"""
@@ -12,6 +12,9 @@ class DevelopmentConfig(BaseConfig):
     DEBUG = True
     TESTING = False
     
+    # 数据库连接池配置（开发服务器并发低，使用较小的连接池，不预热）
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=5, max_overflow=5)
+    
     # 日志配置
     LOG_LEVEL = 'DEBUG'
     LOG_FILE = 'dev.log' 
\ No newline at end of file
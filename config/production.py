@@ -4,7 +4,9 @@
 此模块定义了生产环境特定的配置
 """
 
-from .base import BaseConfig
+import os
+
+from .base import BaseConfig, pool_options
 
 class ProductionConfig(BaseConfig):
     """生产环境配置类"""
@@ -16,6 +18,6 @@ class ProductionConfig(BaseConfig):
     LOG_LEVEL = 'INFO'
     LOG_FILE = 'production.log'
     
-    # 数据库连接池配置
-    SQLALCHEMY_POOL_SIZE = 10
-    SQLALCHEMY_MAX_OVERFLOW = 20 
\ No newline at end of file
+    # 数据库连接池配置（每个进程 10 个常驻连接、最多 30 个，启动时建立全部常驻连接）
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=10, max_overflow=20)
+    DB_POOL_WARMUP = int(os.getenv('DB_POOL_WARMUP', str(SQLALCHEMY_ENGINE_OPTIONS['pool_size']))) 
\ No newline at end of file
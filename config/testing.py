@@ -4,7 +4,7 @@
 此模块定义了测试环境特定的配置
 """
 
-from .base import BaseConfig
+from .base import BaseConfig, pool_options
 import os
 
 class TestingConfig(BaseConfig):
@@ -20,6 +20,9 @@ class TestingConfig(BaseConfig):
         f"{os.getenv('MYSQL_DATABASE')}?charset=utf8mb4"
     )
     
+    # 数据库连接池配置（测试用例串行执行，使用较小的连接池）
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=2, max_overflow=3)
+    
     # 日志配置
     LOG_LEVEL = 'DEBUG'
     LOG_FILE = 'test.log' 
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Gunicorn 配置模块
+
+启动生产服务：
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- 使用 gthread 工作进程（多进程 × 多线程），preload_app 使应用和股票代码表在主进程加载一次，工作进程共享内存
+- 工作进程数默认按 CPU 核数计算，并受数据库最大连接数限制：
+  每个工作进程有独立的连接池，最多占用 pool_size + max_overflow 个连接
+- 每个工作进程的线程数默认等于 pool_size，稳定负载下每个线程持有一个连接而不使用溢出连接
+- 股价自动更新不在请求工作进程中运行，由主进程就绪后启动的独立进程（python -m app.tasks.price_updater）负责，
+  USR2 升级时新主进程沿用已在运行的股价更新进程
+- AI调用的并发上限和速率限制（AI_MAX_CONCURRENCY、AI_RATE_LIMIT、AI_RATE_BURST）是全部工作进程的总配额，按工作进程数平分
+- 每个工作进程启动后按 DB_POOL_WARMUP 预先建立数据库连接（生产环境默认建立 pool_size 个）
+- 设置 PROMETHEUS_MULTIPROC_DIR，/metrics 汇总全部工作进程的指标
+- kill -HUP $(cat logs/gunicorn.pid) 平滑重启工作进程（重新加载配置）；更新代码需要 kill -USR2 启动新主进程后再 kill -QUIT 旧主进程
+
+配置项（环境变量）:
+    GUNICORN_BIND: 监听地址，默认 0.0.0.0:<FLASK_RUN_PORT 或 5000>
+    GUNICORN_WORKERS: 工作进程数，默认 min(CPU 核数 × 2 + 1, 数据库连接数允许的上限)
+    GUNICORN_THREADS: 每个工作进程的线程数，默认等于连接池 pool_size
+    GUNICORN_TIMEOUT: 工作进程无响应多久后重启（秒），默认 120
+    GUNICORN_GRACEFUL_TIMEOUT: 平滑重启时等待请求完成的时间（秒），默认 30
+    GUNICORN_MAX_REQUESTS: 工作进程处理多少请求后自动重启，默认 5000，0 表示不重启
+    GUNICORN_PRICE_UPDATER: 是否启动独立的股价更新进程，默认 true
+    GUNICORN_PIDFILE: 主进程 PID 文件，默认 logs/gunicorn.pid
+    MYSQL_MAX_CONNECTIONS: MySQL 的 max_connections，默认 151
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT_DIR))
+load_dotenv(ROOT_DIR / '.env')
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+# 请求工作进程不运行股价自动更新（需在导入配置之前设置）
+os.environ['PRICE_UPDATER_ENABLED'] = 'false'
+# 主进程 preload 时不预热连接池（主进程的连接不能被工作进程使用），改在 post_fork 中预热
+os.environ['DB_POOL_WARMUP_ON_CREATE'] = 'false'
+
+
+def _process_alive(pid) -> bool:
+    """判断进程是否存在"""
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, TypeError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# 多进程指标目录（需在 preload 导入应用之前创建）
+# 主进程启动时清空上次运行留下的指标文件；HUP 重新加载配置时会再次执行本文件，此时不再清空；
+# USR2 升级时新主进程继承了旧主进程的环境变量，旧主进程及其工作进程仍在写入指标文件，此时也不清空
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', str(ROOT_DIR / 'logs' / 'prometheus'))
+_previous_master = os.environ.get('QMT_GUNICORN_MASTER_PID')
+# 是否为 USR2 启动的新主进程（旧主进程仍在运行）
+UPGRADING = _previous_master != str(os.getpid()) and _process_alive(_previous_master)
+if _previous_master != str(os.getpid()):
+    os.environ['QMT_GUNICORN_MASTER_PID'] = str(os.getpid())
+    if not UPGRADING:
+        shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from config import config as app_configs
+
+logger = logging.getLogger('gunicorn.error')
+
+# 为管理工具、迁移脚本和股价更新进程保留的数据库连接数
+RESERVED_DB_CONNECTIONS = 10
+
+
+def _pool_connections():
+    """
+    读取当前环境配置的连接池大小
+
+    Returns:
+        tuple: (pool_size, 单个进程最多占用的连接数)
+    """
+    options = app_configs[os.environ['FLASK_CONFIG']].SQLALCHEMY_ENGINE_OPTIONS
+    pool_size = options.get('pool_size', 5)
+    return pool_size, pool_size + options.get('max_overflow', 10)
+
+
+def _default_workers(per_worker_connections):
+    """按 CPU 核数计算工作进程数，并保证全部连接池之和不超过数据库最大连接数"""
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    max_connections = int(os.getenv('MYSQL_MAX_CONNECTIONS', '151'))
+    by_database = (max_connections - RESERVED_DB_CONNECTIONS) // per_worker_connections
+    return max(1, min(by_cpu, by_database))
+
+
+POOL_SIZE, PER_WORKER_CONNECTIONS = _pool_connections()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('FLASK_RUN_PORT', '5000')}")
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '0')) or _default_workers(PER_WORKER_CONNECTIONS)
+threads = int(os.getenv('GUNICORN_THREADS', '0')) or POOL_SIZE
+preload_app = True
+
+# AI策略分析可能持续数十秒，超时需大于AI调用超时和重试时间之和
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# 定期重启工作进程，限制长期运行的内存增长
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+
+pidfile = os.getenv('GUNICORN_PIDFILE', str(ROOT_DIR / 'logs' / 'gunicorn.pid'))
+os.makedirs(os.path.dirname(pidfile), exist_ok=True)
+# 股价更新进程的 PID 文件，USR2 升级后的新主进程据此判断是否已有股价更新进程在运行
+PRICE_UPDATER_PIDFILE = os.path.join(os.path.dirname(pidfile), 'price_updater.pid')
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """主进程启动时输出进程、线程和数据库连接数"""
+    total = workers * PER_WORKER_CONNECTIONS
+    logger.info(f"工作进程 {workers} 个 × 线程 {threads} 个，数据库连接最多 {total} 个"
+                f"（每个进程 {PER_WORKER_CONNECTIONS} 个）")
+    if threads > PER_WORKER_CONNECTIONS:
+        logger.warning(f"线程数 {threads} 大于单个进程的连接数上限 {PER_WORKER_CONNECTIONS}，"
+                       f"高峰时请求会等待空闲连接（最长 pool_timeout 秒）")
+    ai_concurrency = app_configs[os.environ['FLASK_CONFIG']].AI_MAX_CONCURRENCY
+    if ai_concurrency < workers:
+        logger.warning(f"AI_MAX_CONCURRENCY={ai_concurrency} 小于工作进程数 {workers}，"
+                       f"每个进程至少允许 1 个AI调用，实际并发上限为 {workers}")
+
+
+def _read_price_updater_pid():
+    """读取仍在运行的股价更新进程的 PID，不存在时返回 None"""
+    try:
+        with open(PRICE_UPDATER_PIDFILE) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+    return pid if _process_alive(pid) else None
+
+
+def when_ready(server):
+    """主进程就绪后启动独立的股价更新进程（保存在主进程对象上，HUP 重新加载配置后仍可访问）"""
+    if os.getenv('GUNICORN_PRICE_UPDATER', 'true').lower() != 'true':
+        logger.info("未启动股价更新进程（GUNICORN_PRICE_UPDATER=false）")
+        return
+    # USR2 升级时旧主进程启动的股价更新进程仍在运行，由新主进程接管，不重复启动
+    running_pid = _read_price_updater_pid() if UPGRADING else None
+    if running_pid is not None:
+        server.price_updater_pid = running_pid
+        logger.info(f"股价更新进程已在运行: pid {running_pid}，不再重复启动")
+        return
+    server.price_updater = subprocess.Popen([sys.executable, '-m', 'app.tasks.price_updater'], cwd=ROOT_DIR)
+    server.price_updater_pid = server.price_updater.pid
+    with open(PRICE_UPDATER_PIDFILE, 'w') as f:
+        f.write(str(server.price_updater.pid))
+    logger.info(f"股价更新进程已启动: pid {server.price_updater.pid}")
+
+
+def post_fork(server, worker):
+    """
+    丢弃从主进程继承的数据库连接，避免多个进程共用同一个连接，然后预热本进程的连接池；
+    AI调用的并发上限和速率限制按工作进程数平分
+    """
+    from app.models import db
+    from app.utils.db_pool import warm_up_pool
+    from app.utils.rate_limit import create_ai_throttle
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    warm_up_pool(app)
+    app.extensions['ai_throttle'] = create_ai_throttle(app.config, server.num_workers)
+
+
+def child_exit(server, worker):
+    """工作进程退出后合并其多进程指标文件"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    """主进程退出时停止股价更新进程（USR2 升级后退出的旧主进程保留股价更新进程，交给新主进程）"""
+    pid = getattr(server, 'price_updater_pid', None)
+    if pid is None:
+        return
+    if server.pidfile is not None and server.pidfile.fname.endswith('.oldbin'):
+        logger.info(f"新主进程已接管股价更新进程: pid {pid}")
+        return
+
+    price_updater = getattr(server, 'price_updater', None)
+    if price_updater is not None:
+        if price_updater.poll() is None:
+            price_updater.terminate()
+            try:
+                price_updater.wait(timeout=graceful_timeout)
+            except subprocess.TimeoutExpired:
+                price_updater.kill()
+    elif _process_alive(pid):
+        # 接管的股价更新进程不是本进程的子进程，只能通过信号停止
+        os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + graceful_timeout
+        while _process_alive(pid) and time.monotonic() < deadline:
+            time.sleep(0.5)
+        if _process_alive(pid):
+            os.kill(pid, signal.SIGKILL)
+
+    try:
+        os.remove(PRICE_UPDATER_PIDFILE)
+    except OSError:
+        pass
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(pid)
@@ -0,0 +1,192 @@
+"""
+股票代码表生成脚本
+
+此脚本从东方财富行情列表接口拉取沪深A股（主板、创业板、科创板）和港股（主板、创业板）的全部代码和名称，
+生成拼音首字母后写入本地股票代码表（默认 ai_robot/data/stock_symbols.csv，表头 code,name,pinyin,market）。
+文件以临时文件整体替换，运行中的服务在 60 秒内自动重新加载。
+
+用法：
+    python scripts/build_symbol_master.py
+    python scripts/build_symbol_master.py --markets SH SZ --output /data/stock_symbols.csv
+
+拼音首字母由 pypinyin 生成；未安装时沿用原代码表中同一代码的拼音，新增股票的拼音为空（只影响拼音查询）。
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 未安装 pypinyin 时沿用原代码表的拼音
+    lazy_pinyin = None
+
+# 获取项目根目录
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from ai_robot.symbol_master import DEFAULT_SYMBOL_PATH
+
+logger = logging.getLogger(__name__)
+
+# 东方财富行情列表接口（f12 为代码，f14 为名称）
+CLIST_URL = 'https://push2.eastmoney.com/api/qt/clist/get'
+
+# 各市场的板块筛选条件，按写入顺序排列（A股在前，名称相同时查询优先返回A股）
+MARKET_FILTERS = {
+    'SH': 'm:1+t:2,m:1+t:23',  # 沪市主板、科创板
+    'SZ': 'm:0+t:6,m:0+t:80',  # 深市主板、创业板
+    'HK': 'm:116+t:3,m:116+t:4',  # 港股主板、创业板
+}
+
+# 全量拉取时的最少记录数，少于该值时视为接口异常，不覆盖现有代码表
+MIN_RECORDS = 1000
+
+REQUEST_TIMEOUT = 10
+
+
+def fetch_market(market: str, page_size: int = 100) -> Iterator[Dict[str, str]]:
+    """
+    分页拉取单个市场的股票代码和名称
+
+    Args:
+        market: 市场（SH/SZ/HK）
+        page_size: 每页条数
+
+    Returns:
+        Iterator[Dict[str, str]]: 包含 code、name、market 的记录
+    """
+    page = 1
+    fetched = 0
+    while True:
+        response = requests.get(CLIST_URL, params={
+            'pn': page, 'pz': page_size, 'np': 1, 'fltt': 2, 'po': 0, 'fid': 'f12',
+            'fs': MARKET_FILTERS[market], 'fields': 'f12,f14'
+        }, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json().get('data') or {}
+        items = data.get('diff') or []
+        for item in items:
+            code, name = str(item.get('f12') or '').strip(), str(item.get('f14') or '').strip()
+            if code and name and name != '-':
+                yield {'code': code, 'name': name, 'market': market}
+        fetched += len(items)
+        if not items or fetched >= int(data.get('total') or 0):
+            return
+        page += 1
+
+
+def pinyin_initials(name: str) -> Optional[str]:
+    """
+    生成名称的拼音首字母（如 "万科A" -> "WKA"，"*ST康美" -> "STKM"）
+
+    Args:
+        name: 股票名称
+
+    Returns:
+        Optional[str]: 大写拼音首字母，未安装 pypinyin 时返回 None
+    """
+    if lazy_pinyin is None:
+        return None
+    initials = ''.join(lazy_pinyin(name, style=Style.FIRST_LETTER))
+    return ''.join(char for char in initials if char.isascii() and char.isalnum()).upper()
+
+
+def load_existing_pinyin(path: Path) -> Dict[str, str]:
+    """读取现有代码表中各代码的拼音首字母"""
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            return {row['code']: row.get('pinyin') or '' for row in csv.DictReader(f) if row.get('code')}
+    except OSError:
+        return {}
+
+
+def build_records(markets: List[str], existing_pinyin: Dict[str, str], page_size: int = 100) -> List[Dict[str, str]]:
+    """
+    拉取各市场的股票并生成代码表记录（同一代码只保留第一条）
+
+    Args:
+        markets: 市场列表
+        existing_pinyin: 现有代码表的拼音首字母，未安装 pypinyin 时使用
+        page_size: 每页条数
+
+    Returns:
+        List[Dict[str, str]]: 代码表记录
+    """
+    records = []
+    seen = set()
+    for market in markets:
+        count = 0
+        for record in fetch_market(market, page_size):
+            if record['code'] in seen:
+                continue
+            seen.add(record['code'])
+            pinyin = pinyin_initials(record['name'])
+            record['pinyin'] = pinyin if pinyin is not None else existing_pinyin.get(record['code'], '')
+            records.append(record)
+            count += 1
+        logger.info(f"{market}: {count} 条")
+    return records
+
+
+def write_symbols(records: List[Dict[str, str]], path: Path):
+    """
+    写入代码表（先写临时文件再替换，读取方不会读到写了一半的文件）
+
+    Args:
+        records: 代码表记录
+        path: 代码表文件路径
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['code', 'name', 'pinyin', 'market'])
+            writer.writeheader()
+            writer.writerows(records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='生成本地股票代码表')
+    parser.add_argument('--output', default=os.getenv('SYMBOL_MASTER_PATH') or str(DEFAULT_SYMBOL_PATH),
+                        help='代码表文件路径，默认 SYMBOL_MASTER_PATH 或 ai_robot/data/stock_symbols.csv')
+    parser.add_argument('--markets', nargs='+', choices=list(MARKET_FILTERS), default=list(MARKET_FILTERS),
+                        help='拉取的市场，默认 SH SZ HK')
+    parser.add_argument('--min-records', type=int, default=MIN_RECORDS,
+                        help=f'记录数少于该值时不覆盖现有代码表，默认 {MIN_RECORDS}')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    output = Path(args.output)
+    if lazy_pinyin is None:
+        logger.warning("未安装 pypinyin，新增股票的拼音首字母为空（pip install pypinyin）")
+
+    try:
+        records = build_records(args.markets, load_existing_pinyin(output))
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"拉取股票列表失败，未更新代码表: {str(e)}")
+        return 1
+
+    if len(records) < args.min_records:
+        logger.error(f"只拉取到 {len(records)} 条记录（少于 {args.min_records}），未更新代码表")
+        return 1
+
+    write_symbols(records, output)
+    logger.info(f"股票代码表已更新: {output}，共 {len(records)} 条记录")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
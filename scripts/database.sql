@@ -90,6 +90,34 @@ CREATE TABLE IF NOT EXISTS stock_positions (
     INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='股票持仓表';
 
+-- 创建策略解析缓存表
+CREATE TABLE IF NOT EXISTS strategy_parse_cache (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT '缓存ID',
+    cache_key VARCHAR(64) NOT NULL COMMENT '缓存键（规范化文本+模型+提示词版本的SHA256）',
+    provider VARCHAR(255) NOT NULL COMMENT 'AI提供方及模型（组合处理器为各提供方标识的组合）',
+    prompt_version VARCHAR(20) NOT NULL COMMENT '提示词版本',
+    result TEXT NOT NULL COMMENT '解析结果JSON',
+    hit_count INT NOT NULL DEFAULT 0 COMMENT '命中次数',
+    expires_at DATETIME NOT NULL COMMENT '过期时间',
+    last_hit_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '最近命中时间',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    UNIQUE KEY uk_cache_key (cache_key),
+    INDEX idx_last_hit_at (last_hit_at),
+    INDEX idx_expires_at (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='策略解析缓存表';
+
+-- 创建策略分析任务表（多进程部署时共享异步分析任务的状态和结果）
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id VARCHAR(32) NOT NULL PRIMARY KEY COMMENT '任务ID',
+    status VARCHAR(20) NOT NULL COMMENT '任务状态：pending/running/succeeded/failed',
+    result TEXT COMMENT '解析结果JSON',
+    error TEXT COMMENT '错误信息',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '提交时间',
+    started_at DATETIME COMMENT '开始执行时间',
+    finished_at DATETIME COMMENT '结束时间',
+    INDEX idx_finished_at (finished_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='策略分析任务表';
+
 -- 创建数据库用户并授权（如果需要）
 -- CREATE USER IF NOT EXISTS 'qmt_user'@'localhost' IDENTIFIED BY 'your_password';
 -- GRANT ALL PRIVILEGES ON stock_strategy.* TO 'qmt_user'@'localhost';
@@ -0,0 +1,47 @@
+"""
+数据库初始化脚本
+
+此脚本用于检查数据库和表结构：数据库不存在时创建数据库，并创建缺少的表（不删除已有数据）。
+应用启动时默认不再执行该检查，首次部署或新增模型后执行本脚本
+"""
+
+import os
+import sys
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# 获取项目根目录
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# 加载环境变量
+env_path = ROOT_DIR / '.env'
+if env_path.exists():
+    load_dotenv(env_path, override=True)
+else:
+    print("警告：找不到 .env 文件！")
+    sys.exit(1)
+
+# 只初始化数据库，不启动股价自动更新（需在导入配置之前设置）
+os.environ['PRICE_UPDATER_ENABLED'] = 'false'
+os.environ['DB_BOOTSTRAP'] = 'false'
+
+from app import bootstrap_database, create_app
+
+
+def main():
+    """创建应用并检查数据库和表结构"""
+    app = create_app()
+    bootstrap_database(app)
+    print("数据库初始化完成！")
+
+
+if __name__ == '__main__':
+    main()
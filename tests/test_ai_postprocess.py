@@ -0,0 +1,183 @@
+"""
+AI响应后处理测试模块
+
+此模块测试AI响应的 JSON 清理与 Schema 验证，并对单条响应的后处理耗时做微基准测试
+（基准测试标记为 benchmark，只记录耗时不做断言，可用 -m "not benchmark" 跳过）
+"""
+
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from jsonschema import validate
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from ai_robot.metrics import AIMetrics, ai_metrics, classify_error
+from ai_robot.prompts import PROMPTS, estimate_messages_tokens
+from ai_robot.stream_parser import JsonObjectDetector
+from ai_robot.stub import StubAIProcessor
+
+logger = logging.getLogger(__name__)
+
+# 模拟的AI原始响应（包含 Markdown 代码块和注释）
+AI_RESPONSE = """```json
+{
+    "stock_name": "贵州茅台",
+    "stock_code": "600519",  // 股票代码
+    "action": "buy",
+    "position_ratio": 10,
+    "price_min": 1500,
+    "price_max": 1600,
+    "take_profit_price": 1700,
+    "stop_loss_price": 1450,
+    /* 其他条件 */
+    "other_conditions": null,
+    "reason": "估值回落至合理区间"
+}
+```"""
+
+ITERATIONS = 500
+
+
+def _offline_processor() -> StubAIProcessor:
+    """创建不访问网络的处理器，只用于测试后处理逻辑"""
+    return StubAIProcessor(latency=0, jitter=0, seed=1)
+
+
+@pytest.fixture(scope='module')
+def processor():
+    """创建处理器"""
+    return _offline_processor()
+
+
+def test_clean_and_validate_response(processor):
+    """测试带注释的AI响应能被清理并通过验证"""
+    result = processor.clean_json_content(AI_RESPONSE)
+
+    assert result['stock_code'] == '600519'
+    assert result['take_profit_price'] == 1700
+    assert processor.validate_json_schema(result)
+
+
+def test_invalid_result_rejected(processor):
+    """测试不符合 Schema 的结果验证失败"""
+    assert not processor.validate_json_schema({'stock_name': '贵州茅台', 'stock_code': '600519', 'action': 'short'})
+    assert not processor.validate_json_schema({'stock_name': '贵州茅台', 'stock_code': '6005190'})
+    assert not processor.validate_json_schema({'stock_name': '贵州茅台', 'stock_code': '600519', 'foo': 1})
+
+
+def test_extract_stock_code(processor):
+    """测试从策略文本中提取股票代码"""
+    assert processor.extract_stock_code('贵州茅台（600519）买入') == '600519'
+    assert processor.extract_stock_code('贵州茅台买入') is None
+
+
+def test_stream_detector_finds_object_end():
+    """测试流式检测在 JSON 对象结束处返回，忽略字符串和注释中的括号"""
+    text = '结果：{"reason": "突破{箱体}\\"}", // 注释 }\n "stock_code": "600519" /* } */}后续说明'
+    end = text.index('}后续说明')
+
+    detector = JsonObjectDetector()
+    positions = [i for i, char in enumerate(text) if detector.feed(char)]
+    assert positions[0] == end
+
+
+def test_stream_detector_chunked_response(processor):
+    """测试分段输入时在对象结束处停止，截断后的文本解析结果与完整响应相同"""
+    detector = JsonObjectDetector()
+    received = ''
+    for i in range(0, len(AI_RESPONSE), 5):
+        chunk = AI_RESPONSE[i:i + 5]
+        received += chunk
+        if detector.feed(chunk):
+            break
+
+    assert len(received) < len(AI_RESPONSE)
+    assert processor.clean_json_content(received) == processor.clean_json_content(AI_RESPONSE)
+
+
+def test_prompt_versions(monkeypatch):
+    """测试各提示词版本的消息构建，精简版本的输入 token 更少"""
+    tokens = {}
+    for version, prompt in PROMPTS.items():
+        monkeypatch.setenv('AI_PROMPT_VERSION', version)
+        processor = _offline_processor()
+        assert processor.prompt_version == version
+        messages = processor.build_messages('买入贵州茅台', attempt=1)
+        assert len(messages) == 3
+        assert messages[-1]['content'] == prompt.retry_hint.format(attempt=2)
+        tokens[version] = estimate_messages_tokens(messages)
+
+    assert tokens['v2'] < tokens['v1'] / 2
+
+
+def test_ai_metrics(processor):
+    """测试验证失败、无效响应按提供方计数，延迟按桶累积"""
+    before = ai_metrics.snapshot().get(processor.provider_id, {}).get('counters', {})
+    assert not processor.validate_json_schema({'stock_name': '贵州茅台', 'stock_code': 'N/A'})
+    with pytest.raises(ValueError):
+        processor.clean_json_content('无法解析')
+    after = ai_metrics.snapshot()[processor.provider_id]['counters']
+    assert after['validation_failures'] == before.get('validation_failures', 0) + 1
+    assert after['invalid_responses'] == before.get('invalid_responses', 0) + 1
+
+    metrics = AIMetrics()
+    metrics.observe_request('test', 0.3)
+    metrics.observe_request('test', 3, classify_error(TimeoutError()))
+    metrics.observe_request('test', 0.2, classify_error(RuntimeError()))
+    snapshot = metrics.snapshot()['test']
+    assert snapshot['counters']['requests'] == 3
+    assert snapshot['counters']['timeouts'] == 1
+    assert snapshot['counters']['api_errors'] == 1
+    buckets = {bucket['le']: bucket['count'] for bucket in snapshot['request_latency_seconds']['buckets']}
+    assert buckets[0.25] == 1 and buckets[0.5] == 2 and buckets[5] == 3
+
+
+@pytest.mark.benchmark
+def test_postprocess_benchmark(processor):
+    """微基准：单条AI响应的清理与验证耗时"""
+    processor.clean_json_content(AI_RESPONSE)  # 预热
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        result = processor.clean_json_content(AI_RESPONSE)
+        assert processor.validate_json_schema(result)
+    per_response = (time.perf_counter() - start) / ITERATIONS
+
+    logger.info(f"单条响应后处理耗时: {per_response * 1e6:.1f} 微秒")
+
+
+@pytest.mark.benchmark
+def test_compiled_validator_benchmark(processor):
+    """微基准：预构建的验证器与每次构建验证器的 jsonschema.validate 对比"""
+    result = processor.clean_json_content(AI_RESPONSE)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        validate(instance=result, schema=processor.schema)
+    uncompiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        assert processor.schema_validator.is_valid(result)
+    compiled = time.perf_counter() - start
+
+    logger.info(f"Schema 验证耗时: 每次构建 {uncompiled / ITERATIONS * 1e6:.1f} 微秒，"
+                f"预构建 {compiled / ITERATIONS * 1e6:.1f} 微秒")
+
+
+def test_provider_sdks_imported_lazily():
+    """导入AI包时不加载各提供方 SDK 和 jsonschema（首次使用时才导入，加快应用启动）"""
+    code = (
+        "import sys, ai_robot\n"
+        "loaded = [m for m in ('zhipuai', 'openai', 'jsonschema') if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+        "assert ai_robot.StubAIProcessor.__module__ == 'ai_robot.stub'\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=project_root, check=True)
@@ -0,0 +1,78 @@
+"""
+AI处理器注册表测试模块
+
+此模块测试进程内共享的AI处理器：并发获取时只创建一个实例，进程退出时统一关闭
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import ai_robot
+from ai_robot import get_ai_processor, shutdown_ai_processors
+
+
+class _FakeProcessor:
+    """记录关闭次数的AI处理器"""
+
+    def __init__(self, ai_type: str):
+        self.ai_type = ai_type
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture()
+def created(monkeypatch):
+    """以假处理器替换处理器创建函数，返回创建过的AI类型列表"""
+    created = []
+
+    def build(ai_type):
+        created.append(ai_type)
+        return _FakeProcessor(ai_type)
+
+    shutdown_ai_processors()
+    monkeypatch.setattr(ai_robot, '_build_ai_processor', build)
+    yield created
+    shutdown_ai_processors()
+
+
+def test_get_ai_processor_shared(created, monkeypatch):
+    """测试同一AI类型返回同一个实例，并发首次获取时只创建一次"""
+    barrier = threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        return get_ai_processor('zhipu')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        processors = list(executor.map(lambda _: get(), range(8)))
+    assert created == ['zhipu']
+    assert all(processor is processors[0] for processor in processors)
+
+    # AI类型不区分大小写，未指定时从环境变量读取
+    monkeypatch.setenv('AI_TYPE', 'ZHIPU')
+    assert get_ai_processor() is processors[0]
+    assert get_ai_processor(' Zhipu ') is processors[0]
+    assert get_ai_processor('deepseek') is not processors[0]
+    assert created == ['zhipu', 'deepseek']
+
+
+def test_shutdown_ai_processors(created):
+    """测试关闭时调用每个处理器的 close 并清空注册表，之后重新创建"""
+    processors = [get_ai_processor('zhipu'), get_ai_processor('deepseek')]
+
+    shutdown_ai_processors()
+    assert [processor.closed for processor in processors] == [1, 1]
+    assert ai_robot._processors == {}
+
+    assert get_ai_processor('zhipu') is not processors[0]
+    assert created == ['zhipu', 'deepseek', 'zhipu']
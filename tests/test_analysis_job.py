@@ -0,0 +1,141 @@
+"""
+异步策略分析任务测试模块
+
+此模块使用 SQLite 测试任务提交与查询、排队上限、结果过期，
+以及多进程部署时从数据库查询其他进程提交的任务（以两个任务管理器模拟两个工作进程）
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db, AnalysisJobRecord
+from app.routes import strategy_bp
+from app.services.analysis_job import AnalysisJobManager, StoredAnalysisJob
+
+RESULT = {'stock_name': '贵州茅台', 'stock_code': '600519', 'action': 'buy'}
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """创建使用 SQLite 的应用"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'jobs.db'}", AI_JOB_SSE_HEARTBEAT=0.05)
+    db.init_app(app)
+    app.register_blueprint(strategy_bp, url_prefix='/api/v1')
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        db.create_all()
+    return app
+
+
+def _manager(app, **kwargs) -> AnalysisJobManager:
+    """创建任务管理器并注册到应用"""
+    manager = AnalysisJobManager(app, max_workers=2, poll_interval=0.05, **kwargs)
+    app.extensions['analysis_jobs'] = manager
+    return manager
+
+
+def _analyze(strategy_text, on_progress=None):
+    """立即返回结果的分析函数"""
+    return dict(RESULT)
+
+
+def test_submit_and_query_from_other_process(app):
+    """测试任务结果写入数据库，其他进程的任务管理器可以查询"""
+    manager = _manager(app)
+    job = manager.submit('买入贵州茅台', _analyze)
+    assert job.wait(5) and job.result == RESULT
+
+    other = AnalysisJobManager(app, poll_interval=0.05)
+    stored = other.get(job.id)
+    assert isinstance(stored, StoredAnalysisJob)
+    assert stored.status == 'succeeded' and stored.result == RESULT
+    assert other.get('missing') is None
+
+    # 查询落到其他进程时，轮询接口和 SSE 同样返回结果
+    app.extensions['analysis_jobs'] = other
+    client = app.test_client()
+    data = client.get(f'/api/v1/analyze_strategy/jobs/{job.id}').get_json()['data']
+    assert data['result'] == RESULT
+    # 时间按中国时区格式化，与本进程的任务一致
+    expected = job.to_dict()
+    assert data['created_at'] == expected['created_at'] and data['finished_at'] == expected['finished_at']
+    assert data['duration'] >= 0
+    events = client.get(f'/api/v1/analyze_strategy/jobs/{job.id}/events').get_data(as_text=True)
+    assert 'event: result' in events
+    manager.shutdown()
+
+
+def test_stored_job_waits_for_other_process(app):
+    """测试其他进程的任务在运行中时，快照定时从数据库读取到结束状态"""
+    release = threading.Event()
+    manager = _manager(app)
+    job = manager.submit('买入贵州茅台', lambda text, on_progress=None: release.wait(5) and dict(RESULT))
+
+    stored = AnalysisJobManager(app, poll_interval=0.05).get(job.id)
+    assert not stored.done
+    version = stored.version
+    release.set()
+    assert stored.wait(5)
+    assert stored.version > version and stored.result == RESULT
+    manager.shutdown()
+
+
+def test_pending_limit_returns_429(app):
+    """测试未完成任务数达到上限时拒绝提交"""
+    release = threading.Event()
+    manager = _manager(app, max_pending=1)
+    manager.submit('买入贵州茅台', lambda text, on_progress=None: release.wait(5) and dict(RESULT))
+
+    response = app.test_client().post('/api/v1/analyze_strategy/jobs', json={'strategy_text': '买入五粮液'})
+    assert response.status_code == 429
+    release.set()
+    manager.shutdown(wait=True)
+
+
+def test_sse_subscriber_limit(app):
+    """测试 SSE 连接数达到上限时返回 429，连接关闭后释放名额"""
+    manager = _manager(app, max_subscribers=1)
+    job = manager.submit('买入贵州茅台', _analyze)
+    assert job.wait(5)
+    client = app.test_client()
+
+    assert manager.acquire_subscriber()
+    assert client.get(f'/api/v1/analyze_strategy/jobs/{job.id}/events').status_code == 429
+    manager.release_subscriber()
+
+    response = client.get(f'/api/v1/analyze_strategy/jobs/{job.id}/events')
+    assert response.status_code == 200
+    response.close()
+    assert manager.acquire_subscriber()
+    manager.shutdown()
+
+
+def test_expired_jobs_removed(app):
+    """测试已完成任务超过保留时间后查询不到，数据库记录被清理"""
+    manager = _manager(app, result_ttl=0)
+    job = manager.submit('买入贵州茅台', _analyze)
+    assert job.wait(5)
+
+    manager.submit('买入五粮液', _analyze).wait(5)
+    assert job.id not in manager._jobs
+    assert manager.get(job.id) is None
+
+    assert manager.purge_expired_records() == 2
+    with app.app_context():
+        assert AnalysisJobRecord.query.count() == 0
+    manager.shutdown()
@@ -0,0 +1,75 @@
+"""
+异步接口测试模块
+
+此模块测试 ASGI 应用的持仓接口（并发获取行情后更新市值）以及其余请求转交给 Flask 处理
+（使用临时 SQLite 数据库和 httpx 模拟传输层，不依赖 MySQL 和外部行情接口）
+"""
+
+import sys
+from pathlib import Path
+
+import httpx
+from flask import Flask
+from sqlalchemy import event
+from starlette.testclient import TestClient
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.asgi import create_asgi_app
+from app.models import db, StockPosition
+from app.services.position import PositionService
+
+
+def _quote_handler(request: httpx.Request) -> httpx.Response:
+    """按新浪接口格式返回固定价格 12.5"""
+    code = str(request.url).rsplit('=', 1)[-1]
+    return httpx.Response(200, content=f'var hq_str_{code}="测试,12.5,12.5,12.5,12.5";'.encode('gbk'))
+
+
+def _create_app(tmp_path) -> Flask:
+    """创建使用 SQLite 的应用并写入两条持仓"""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'asgi.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={},
+        COMPRESS_ENABLED=False
+    )
+    db.init_app(app)
+
+    @app.route('/flask-only')
+    def flask_only():
+        return 'flask'
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', lambda conn, record: conn.create_collation(
+            'utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b)))
+        db.create_all()
+        for code in ('600000', '000001'):
+            db.session.add(StockPosition(
+                stock_code=code, stock_name='测试', total_volume=100, original_cost=10,
+                dynamic_cost=10, total_amount=1000, latest_price=10, market_value=1000
+            ))
+        db.session.commit()
+    return app
+
+
+def test_async_positions(tmp_path):
+    """测试异步持仓接口按行情价格更新市值，响应格式与同步接口一致"""
+    PositionService._PositionService__price_cache.clear()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_quote_handler))
+    asgi_app = create_asgi_app(_create_app(tmp_path), http_client=client)
+
+    with TestClient(asgi_app) as test_client:
+        response = test_client.get('/api/v1/positions', params={'fields': 'stock_code,latest_price,market_value'})
+        assert response.status_code == 200
+        data = response.json()['data']
+        assert {item['stock_code'] for item in data} == {'600000', '000001'}
+        assert all(item['latest_price'] == 12.5 and item['market_value'] == 1250 for item in data)
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+        assert test_client.get('/api/v1/positions/600000').json()['data']['market_value'] == 1250
+        assert test_client.get('/api/v1/positions/300750').status_code == 404
+        assert test_client.get('/api/v1/positions', params={'fields': 'unknown'}).status_code == 400
+        assert test_client.get('/flask-only').text == 'flask'
@@ -0,0 +1,167 @@
+"""
+组合AI处理器测试模块
+
+此模块使用模拟的提供方测试 race/failover 调度、调用统计和熔断，
+以及并发请求在线程池中排队时不会被误判为提供方超时
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from ai_robot.base import BaseAIProcessor
+from ai_robot.composite import CompositeAIProcessor, ProviderStats, _ProviderCall
+
+RESULT = {'stock_name': '贵州茅台', 'stock_code': '600519', 'action': 'buy'}
+
+
+class _FakeProvider(BaseAIProcessor):
+    """按固定延迟返回结果或失败的模拟提供方"""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        super().__init__()
+        self.provider_name = name
+        self.model_name = None
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def call_ai_api(self, user_input, retry_count=0, cancel_event=None, max_retries=None, on_progress=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            return {'error': self.FAILURE_MESSAGE}
+        return {**RESULT, 'reason': self.provider_name}
+
+    def create_completion(self, messages, stream):
+        raise RuntimeError('模拟提供方不调用接口')
+
+
+def test_provider_stats_circuit_breaker():
+    """测试连续失败达到阈值后熔断，成功后恢复"""
+    stats = ProviderStats(failure_threshold=2, cooldown=60)
+    stats.record(True, 1.0)
+    stats.record(False, 2.0)
+    assert stats.available
+    stats.record(False, 2.0)
+    assert not stats.available
+    assert stats.sort_key()[0] is True
+    assert stats.to_dict()['failures'] == 2
+
+    stats.record_cancelled()
+    assert stats.to_dict()['cancelled'] == 1 and stats.calls == 3
+
+    stats.record(True, 1.0)
+    assert stats.available and stats.consecutive_failures == 0
+
+
+def test_failover_switches_provider():
+    """测试首选提供方失败或超时后切换到下一个，熔断的提供方排到最后"""
+    broken = _FakeProvider('broken', fail=True)
+    healthy = _FakeProvider('healthy')
+    composite = CompositeAIProcessor([broken, healthy], mode='failover', timeout=1)
+    try:
+        assert composite.call_ai_api('买入贵州茅台')['reason'] == 'healthy'
+    finally:
+        composite.close()
+
+    slow = _FakeProvider('slow', delay=0.5)
+    composite = CompositeAIProcessor([slow, healthy], mode='failover', timeout=0.1)
+    try:
+        assert composite.call_ai_api('买入贵州茅台')['reason'] == 'healthy'
+        assert composite.get_stats()['slow']['failures'] == 1
+
+        for _ in range(2):
+            composite.stats['slow'].record(False, 0.1)
+        assert [p.provider_id for p in composite.ranked_providers()] == ['healthy', 'slow']
+    finally:
+        composite.close()
+
+
+def test_race_uses_first_valid_result():
+    """测试竞速采用先返回的有效结果，失败的提供方由后备提供方补充"""
+    fast = _FakeProvider('fast', delay=0.05)
+    slow = _FakeProvider('slow', delay=0.5)
+    composite = CompositeAIProcessor([slow, fast], mode='race', race_width=2, timeout=1)
+    try:
+        assert composite.call_ai_api('买入贵州茅台')['reason'] == 'fast'
+    finally:
+        composite.close()
+
+    broken = _FakeProvider('broken', fail=True)
+    backup = _FakeProvider('backup')
+    composite = CompositeAIProcessor([broken, backup], mode='race', race_width=1, timeout=1)
+    try:
+        assert composite.call_ai_api('买入贵州茅台')['reason'] == 'backup'
+        assert composite.get_stats()['broken']['failures'] == 1
+    finally:
+        composite.close()
+
+
+def test_queued_calls_not_counted_as_timeouts():
+    """测试并发请求超过线程池大小时，排队时间不计入超时，正常的提供方不会被熔断"""
+    providers = [_FakeProvider('zhipu', delay=0.3), _FakeProvider('deepseek', delay=0.3)]
+    composite = CompositeAIProcessor(providers, mode='failover', timeout=0.6)
+    try:
+        with ThreadPoolExecutor(max_workers=32) as callers:
+            results = list(callers.map(composite.call_ai_api, ['买入贵州茅台'] * 32))
+    finally:
+        composite.close()
+
+    assert not any(composite.is_failure(result) for result in results)
+    for stats in composite.get_stats().values():
+        assert stats['failures'] == 0 and stats['available']
+
+
+def test_cancelled_before_start_not_run():
+    """测试排队期间被取消的调用不再执行，也不计入失败"""
+    provider = _FakeProvider('zhipu')
+    composite = CompositeAIProcessor([provider])
+    try:
+        call = _ProviderCall(1)
+        call.cancel_event.set()
+        result = composite._call_provider(provider, '买入贵州茅台', call)
+    finally:
+        composite.close()
+
+    assert result['error'] == composite.CANCELLED_MESSAGE
+    assert provider.calls == 0
+    stats = composite.get_stats()['zhipu']
+    assert stats['calls'] == 0 and stats['cancelled'] == 1
+
+
+def test_cancel_event_stops_race():
+    """测试调用方取消后竞速立即返回"""
+    composite = CompositeAIProcessor([_FakeProvider('slow', delay=0.5)], mode='race', timeout=5)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    try:
+        assert composite._race(composite.providers, '买入贵州茅台', cancel_event)['error'] == \
+            composite.CANCELLED_MESSAGE
+    finally:
+        composite.close()
+
+
+def test_create_completion_required():
+    """测试未实现聊天补全接口的处理器不能实例化，组合处理器明确拒绝直接调用"""
+    class _NoCompletion(BaseAIProcessor):
+        def call_ai_api(self, user_input, retry_count=0, cancel_event=None, max_retries=None, on_progress=None):
+            return dict(RESULT)
+
+    with pytest.raises(TypeError):
+        _NoCompletion()
+
+    composite = CompositeAIProcessor([_FakeProvider('zhipu')])
+    try:
+        with pytest.raises(TypeError, match='call_ai_api'):
+            composite.request_completion([{'role': 'user', 'content': '买入贵州茅台'}])
+    finally:
+        composite.close()
@@ -0,0 +1,133 @@
+"""
+响应压缩测试模块
+
+此模块测试 Accept-Encoding 协商、最小压缩大小、Vary 响应头、流式响应不压缩以及压缩结果缓存
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from flask import Flask, Response, jsonify
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.utils import compression
+from app.utils.compression import CompressionCache, choose_encoding, init_compression
+
+# 超过最小压缩大小的响应数据
+LARGE_DATA = [{'id': i, 'stock_name': '贵州茅台', 'stock_code': '600519'} for i in range(100)]
+
+
+def _accept(header: str) -> Accept:
+    """解析 Accept-Encoding 请求头"""
+    return parse_accept_header(header, Accept)
+
+
+def _create_app(**config) -> Flask:
+    """创建注册了压缩处理的测试应用"""
+    app = Flask(__name__)
+    app.config.update(COMPRESS_MIN_SIZE=1024, **config)
+    init_compression(app)
+
+    @app.route('/large')
+    def large():
+        return jsonify(LARGE_DATA)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'id': 1})
+
+    @app.route('/stream')
+    def stream():
+        return Response((json.dumps(item) + '\n' for item in LARGE_DATA), mimetype='application/json')
+
+    return app
+
+
+def test_choose_encoding(monkeypatch):
+    """测试优先选择 brotli，客户端不接受或未安装 brotli 时回退到 gzip"""
+    assert choose_encoding(_accept('gzip, deflate, br')) == 'br'
+    assert choose_encoding(_accept('gzip, br;q=0')) == 'gzip'
+    assert choose_encoding(_accept('identity')) is None
+    assert choose_encoding(_accept('')) is None
+
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert choose_encoding(_accept('br, gzip')) == 'gzip'
+    assert choose_encoding(_accept('br')) is None
+
+
+def test_compress_large_response():
+    """测试超过最小大小的 JSON 响应按协商结果压缩，并添加 Vary 响应头"""
+    client = _create_app().test_client()
+
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data())) == LARGE_DATA
+
+    response = client.get('/large', headers={'Accept-Encoding': 'br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(compression.brotli.decompress(response.get_data())) == LARGE_DATA
+
+
+def test_skip_small_and_uncompressible_responses():
+    """测试小响应、不接受压缩的请求和流式响应不压缩，可压缩类型的响应仍带 Vary 响应头"""
+    client = _create_app().test_client()
+
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    response = client.get('/large')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_json() == LARGE_DATA
+
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_data(as_text=True).splitlines()) == len(LARGE_DATA)
+
+
+def test_compression_disabled():
+    """测试关闭压缩后不注册压缩处理"""
+    app = _create_app(COMPRESS_ENABLED=False)
+    assert 'compression_cache' not in app.extensions
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_compression_cache_reused(monkeypatch):
+    """测试相同内容和编码只压缩一次"""
+    calls = []
+    compress_body = compression.compress_body
+    monkeypatch.setattr(compression, 'compress_body', lambda *args: calls.append(args[1]) or compress_body(*args))
+    client = _create_app().test_client()
+
+    first = client.get('/large', headers={'Accept-Encoding': 'gzip'}).get_data()
+    second = client.get('/large', headers={'Accept-Encoding': 'gzip'}).get_data()
+    assert first == second
+    assert calls == ['gzip']
+
+
+def test_compression_cache_lru():
+    """测试缓存超过容量时淘汰最久未使用的条目，容量为 0 时不缓存"""
+    cache = CompressionCache(max_entries=2)
+    cache.set((b'a', 'gzip'), b'1')
+    cache.set((b'b', 'gzip'), b'2')
+    assert cache.get((b'a', 'gzip')) == b'1'
+    cache.set((b'c', 'gzip'), b'3')
+    assert cache.get((b'b', 'gzip')) is None
+    assert cache.get((b'a', 'gzip')) == b'1' and cache.get((b'c', 'gzip')) == b'3'
+
+    cache.clear()
+    assert cache.get((b'a', 'gzip')) is None
+
+    disabled = CompressionCache(max_entries=0)
+    disabled.set((b'a', 'gzip'), b'1')
+    assert disabled.get((b'a', 'gzip')) is None
@@ -0,0 +1,75 @@
+"""
+批量查询执行记录测试模块
+
+此模块使用 SQLite 测试按策略批量查询执行记录：每个策略的数量上限在 SQL 中生效，
+字符串形式的策略ID被转换为整数，无法转换时返回 400
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db, StrategyExecution
+from app.routes import execution_bp
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """创建包含两个策略执行记录的应用（策略 1 有 3 条，策略 2 有 1 条）"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'executions.db'}")
+    db.init_app(app)
+    app.register_blueprint(execution_bp, url_prefix='/api/v1')
+
+    base = datetime(2024, 3, 1, 9, 30)
+    rows = [(1, 0), (1, 1), (1, 2), (2, 0)]
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(StrategyExecution.__table__.insert(), [{
+                'strategy_id': strategy_id, 'stock_code': '600519', 'stock_name': '贵州茅台', 'action': 'buy',
+                'execution_price': 1500 + minutes, 'volume': 100, 'execution_result': 'success',
+                'execution_time': base + timedelta(minutes=minutes), 'created_at': base, 'updated_at': base
+            } for strategy_id, minutes in rows])
+    return app
+
+
+def test_batch_limit_per_strategy(app):
+    """测试每个策略只返回最近的 limit 条记录，且限制在 SQL 中执行"""
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = app.test_client().post('/api/v1/executions/batch', json={'strategy_ids': [1, 2, 3], 'limit': 2})
+    data = response.get_json()['data']
+
+    assert [item['execution_price'] for item in data['1']] == [1502, 1501]
+    assert [item['execution_price'] for item in data['2']] == [1500]
+    assert data['3'] == []
+    assert any('ROW_NUMBER' in statement.upper() for statement in statements)
+
+
+def test_batch_string_ids(app):
+    """测试字符串形式的策略ID可以查询，无法转换的参数返回 400"""
+    client = app.test_client()
+
+    data = client.post('/api/v1/executions/batch', json={'strategy_ids': ['1', '1']}).get_json()
+    assert data['code'] == 200 and len(data['data']['1']) == 3
+
+    assert client.post('/api/v1/executions/batch', json={'strategy_ids': ['abc']}).get_json()['code'] == 400
+    assert client.post('/api/v1/executions/batch', json={'strategy_ids': [1], 'limit': 0}).get_json()['code'] == 400
@@ -0,0 +1,146 @@
+"""
+运行指标测试模块
+
+此模块测试请求指标采集、/metrics 接口的文本格式输出、SQL 查询统计、连接池指标和请求剖析（使用 SQLite，不依赖 MySQL）
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import exc, text
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db
+from app.utils.db_pool import TimedQueuePool, warm_up_pool
+from app.utils.metrics import REGISTRY, init_metrics, observe_quote_latency, record_quote_result, render_metrics
+from app.utils.profiler import init_profiling
+from app.utils.query_stats import init_query_stats
+
+
+def _create_app() -> Flask:
+    """创建只包含测试路由的应用"""
+    app = Flask(__name__)
+    init_metrics(app)
+
+    @app.route('/metrics-test/ok')
+    def ok():
+        return 'ok'
+
+    @app.route('/metrics')
+    def metrics():
+        return render_metrics()
+
+    return app
+
+
+def _sample(name, labels):
+    """读取指标当前值，不存在时为 0"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_metrics():
+    """测试按接口和状态码统计请求数，未匹配路由归为 unmatched，响应关闭后进行中请求数归零"""
+    client = _create_app().test_client()
+    ok_labels = {'endpoint': 'ok', 'method': 'GET', 'status': '200'}
+    missing_labels = {'endpoint': 'unmatched', 'method': 'GET', 'status': '404'}
+    before = _sample('qmt_http_requests_total', ok_labels), _sample('qmt_http_requests_total', missing_labels)
+
+    client.get('/metrics-test/ok').close()
+    client.get('/metrics-test/missing').close()
+
+    assert _sample('qmt_http_requests_total', ok_labels) == before[0] + 1
+    assert _sample('qmt_http_requests_total', missing_labels) == before[1] + 1
+    assert _sample('qmt_http_request_duration_seconds_count', ok_labels) >= 1
+    assert _sample('qmt_http_requests_in_progress', {'endpoint': 'ok'}) == 0
+
+
+def test_metrics_exposition():
+    """测试 /metrics 以 Prometheus 文本格式输出行情数据源指标"""
+    record_quote_result('sina', 'success')
+    observe_quote_latency('sina', 0.12)
+
+    response = _create_app().test_client().get('/metrics')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert 'qmt_quote_source_requests_total{result="success",source="sina"}' in body
+    assert 'qmt_quote_source_latency_seconds_bucket{le="0.25",source="sina"}' in body
+    assert '# TYPE qmt_http_request_duration_seconds histogram' in body
+
+
+def test_query_stats_headers():
+    """测试调试模式下响应头返回本次请求的查询次数和累计耗时"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQL_QUERY_STATS_HEADERS'] = True
+    db.init_app(app)
+    init_query_stats(app)
+
+    @app.route('/query-test/<int:count>')
+    def run_queries(count):
+        for _ in range(count):
+            db.session.execute(text('SELECT 1'))
+        return 'ok'
+
+    client = app.test_client()
+    response = client.get('/query-test/3')
+    assert response.headers['X-DB-Query-Count'] == '3'
+    assert float(response.headers['X-DB-Query-Time']) >= 0
+    assert client.get('/query-test/0').headers['X-DB-Query-Count'] == '0'
+
+
+def test_profiling_by_header(tmp_path):
+    """测试携带正确令牌的请求被剖析并写入 pstats 和元数据，令牌错误时不剖析"""
+    app = Flask(__name__)
+    app.config.update(PROFILE_ENABLED=True, PROFILE_TOKEN='secret', PROFILE_DIR=str(tmp_path))
+    init_profiling(app)
+
+    @app.route('/profile-test')
+    def profiled():
+        return 'ok'
+
+    client = app.test_client()
+    assert 'X-Profile-Id' not in client.get('/profile-test', headers={'X-Profile': 'wrong'}).headers
+
+    profile_id = client.get('/profile-test', headers={'X-Profile': 'secret'}).headers['X-Profile-Id']
+    assert (tmp_path / f'{profile_id}.prof').exists()
+    metadata = json.loads((tmp_path / f'{profile_id}.json').read_text(encoding='utf-8'))
+    assert metadata['endpoint'] == 'profiled'
+    assert metadata['trigger'] == 'header'
+    assert metadata['status'] == 200
+
+
+def test_pool_warmup_and_wait_metrics(tmp_path):
+    """测试连接池预热建立常驻连接，连接全部借出时等待超时被计数"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'pool.db'}"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': TimedQueuePool, 'metrics_label': 'pool-test',
+        'pool_size': 2, 'max_overflow': 0, 'pool_timeout': 0.05
+    }
+    db.init_app(app)
+    labels = {'bind': 'pool-test'}
+    waits = _sample('qmt_db_pool_wait_seconds_count', labels)
+
+    assert warm_up_pool(app, connections=5) == 2
+    with app.app_context():
+        assert db.engine.pool.checkedin() == 2
+
+        held = [db.engine.connect() for _ in range(2)]
+        with pytest.raises(exc.TimeoutError):
+            db.engine.connect()
+        for conn in held:
+            conn.close()
+
+        db.engine.dispose()
+        assert db.engine.pool.metrics_label == 'pool-test'
+
+    assert _sample('qmt_db_pool_timeouts_total', labels) == 1
+    assert _sample('qmt_db_pool_wait_seconds_count', labels) == waits + 5
@@ -0,0 +1,82 @@
+"""
+策略解析缓存测试模块
+
+此模块使用 SQLite 测试缓存键的文本规范化、过期时间和按最近命中时间的容量淘汰
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db, StrategyParseCache
+from app.services.parse_cache import ParseCacheService, make_cache_key, normalize_strategy_text
+
+RESULT = {'stock_name': '贵州茅台', 'stock_code': '600519', 'action': 'buy'}
+# 默认组合处理器的提供方标识
+COMPOSITE_PROVIDER = 'composite:zhipu:glm-4-flash+deepseek:deepseek-chat'
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """创建使用 SQLite 的应用"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'cache.db'}")
+    db.init_app(app)
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        db.create_all()
+        yield app
+
+
+def test_normalized_text_shares_key(app):
+    """测试全角字符和空白不同的文本命中同一条缓存，提供方或提示词版本不同时不命中"""
+    assert normalize_strategy_text('  买入　贵州茅台\n\n仓位１０％ ') == '买入 贵州茅台 仓位10%'
+    assert make_cache_key('买入 贵州茅台', 'zhipu', 'v1') != make_cache_key('买入 贵州茅台', 'zhipu', 'v2')
+
+    cache = ParseCacheService()
+    cache.set('买入 贵州茅台', COMPOSITE_PROVIDER, 'v1', RESULT)
+    assert cache.get('买入\n\n贵州茅台  ', COMPOSITE_PROVIDER, 'v1') == RESULT
+    assert cache.get('买入 贵州茅台', 'zhipu:glm-4-flash', 'v1') is None
+
+    entry = StrategyParseCache.query.one()
+    assert entry.provider == COMPOSITE_PROVIDER and entry.hit_count == 1
+    # SQLite 不检查字符串长度，单独确认列宽可容纳组合处理器的提供方标识（MySQL 中超长会导致写入失败）
+    assert StrategyParseCache.__table__.c.provider.type.length > len(COMPOSITE_PROVIDER)
+
+
+def test_expired_entry_removed(app):
+    """测试过期的缓存不返回并被删除，错误结果不缓存"""
+    cache = ParseCacheService()
+    app.config['AI_CACHE_TTL'] = -1
+    cache.set('买入贵州茅台', 'zhipu', 'v1', RESULT)
+    cache.set('你好', 'zhipu', 'v1', {'error': '与股票交易无关，暂不处理'})
+    assert StrategyParseCache.query.count() == 1
+
+    assert cache.get('买入贵州茅台', 'zhipu', 'v1') is None
+    assert StrategyParseCache.query.count() == 0
+
+
+def test_evict_least_recently_hit(app):
+    """测试超出容量时淘汰最近命中时间最早的缓存"""
+    app.config['AI_CACHE_MAX_ENTRIES'] = 2
+    cache = ParseCacheService()
+    for text in ('买入贵州茅台', '买入五粮液', '买入平安银行'):
+        cache.set(text, 'zhipu', 'v1', RESULT)
+    assert cache.get('买入贵州茅台', 'zhipu', 'v1') == RESULT
+
+    assert cache.evict() == 1
+    assert cache.get('买入五粮液', 'zhipu', 'v1') is None
+    assert cache.get('买入贵州茅台', 'zhipu', 'v1') == RESULT
+    assert cache.get('买入平安银行', 'zhipu', 'v1') == RESULT
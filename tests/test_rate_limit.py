@@ -0,0 +1,166 @@
+"""
+AI调用限流测试模块
+
+此模块测试令牌桶和并发上限、限流作用于每次AI接口请求（包括重试和组合处理器的并发调用），
+以及批量分析接口的去重和逐条返回
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from ai_robot import request_throttle
+from ai_robot.composite import CompositeAIProcessor
+from ai_robot.stub import StubAIProcessor
+from app.models import db
+from app.routes import strategy_bp
+from app.utils.rate_limit import ProviderThrottle, RateLimiter, create_ai_throttle
+
+
+class _CountingThrottle:
+    """记录进入次数的限流器"""
+
+    def __init__(self):
+        self.entered = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.entered += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def _stub(**kwargs) -> StubAIProcessor:
+    """创建无延迟的模拟处理器"""
+    return StubAIProcessor(**{'latency': 0, 'jitter': 0, 'seed': 1, **kwargs})
+
+
+def test_rate_limiter_burst_and_timeout():
+    """测试突发名额用完后等待令牌，超时返回 False"""
+    limiter = RateLimiter(rate=1, burst=2)
+    assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.05)
+
+    unlimited = RateLimiter(rate=0)
+    assert all(unlimited.acquire(timeout=0) for _ in range(100))
+
+
+def test_provider_throttle_limits_concurrency():
+    """测试同时进入限流器的线程数不超过并发上限"""
+    throttle = ProviderThrottle(max_concurrency=2, rate=0)
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with throttle:
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+
+def test_create_ai_throttle_splits_quota():
+    """测试多个工作进程平分并发和速率配额"""
+    throttle = create_ai_throttle({'AI_MAX_CONCURRENCY': 8, 'AI_RATE_LIMIT': 4, 'AI_RATE_BURST': 4}, processes=4)
+    assert throttle.max_concurrency == 2
+    assert throttle._rate_limiter.rate == 1 and throttle._rate_limiter.burst == 1
+
+
+def test_throttle_applies_to_each_retry():
+    """测试每次重试都重新占用限流器"""
+    processor = _stub(malformed_rate=1)
+    throttle = _CountingThrottle()
+    with request_throttle(throttle):
+        assert processor.is_failure(processor.call_ai_api('买入贵州茅台'))
+    assert throttle.entered == processor.max_retries == processor.counters['attempts']
+
+    # 上下文之外的调用不受限流
+    processor.call_ai_api('买入贵州茅台')
+    assert throttle.entered == processor.max_retries
+
+
+def test_throttle_applies_to_race_providers():
+    """测试组合处理器同时调用的每个提供方都占用限流器"""
+    providers = [_stub(), _stub()]
+    composite = CompositeAIProcessor(providers, mode='race', cancel_losers=False, timeout=5)
+    throttle = _CountingThrottle()
+    try:
+        with request_throttle(throttle):
+            assert not composite.is_failure(composite.call_ai_api('买入贵州茅台'))
+        # 未取消的落后提供方仍会完成请求
+        deadline = time.monotonic() + 5
+        while sum(p.counters['attempts'] for p in providers) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert throttle.entered == 2
+    finally:
+        composite.close()
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+@pytest.fixture()
+def batch_app(tmp_path, monkeypatch):
+    """创建使用 SQLite 和模拟AI处理器的应用"""
+    processor = _stub()
+    monkeypatch.setattr('app.services.strategy.get_ai_processor', lambda: processor)
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'batch.db'}", AI_CACHE_ENABLED=False)
+    db.init_app(app)
+    app.register_blueprint(strategy_bp, url_prefix='/api/v1')
+    app.extensions['ai_throttle'] = ProviderThrottle(max_concurrency=2, rate=0)
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        db.create_all()
+    app.processor = processor
+    return app
+
+
+def test_batch_route_dedup_and_summary(batch_app):
+    """测试批量分析对仅空白或全半角不同的文本只调用一次AI，每条输入都有结果，最后一行为汇总"""
+    texts = ['买入 贵州茅台(600519)', '买入  贵州茅台（600519） ', '卖出五粮液(000858)', '买入 贵州茅台(600519)']
+    response = batch_app.test_client().post('/api/v1/analyze_strategy/batch', json={'strategy_texts': texts})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    items, summary = lines[:-1], lines[-1]
+    assert sorted(item['index'] for item in items) == list(range(len(texts)))
+    assert all(item['source'] == 'ai' and 'data' in item for item in items)
+    by_index = {item['index']: item['data'] for item in items}
+    assert by_index[0] == by_index[1] == by_index[3]
+    assert by_index[0]['stock_code'] == '600519' and by_index[2]['stock_code'] == '000858'
+    assert batch_app.processor.counters['calls'] == 2
+    assert summary == {'done': True, 'total': 4, 'succeeded': 4, 'failed': 0}
+
+
+def test_batch_route_rejects_invalid_input(batch_app):
+    """测试策略文本列表为空或包含空文本时返回 400"""
+    client = batch_app.test_client()
+    assert client.post('/api/v1/analyze_strategy/batch', json={'strategy_texts': []}).status_code == 400
+    assert client.post('/api/v1/analyze_strategy/batch', json={'strategy_texts': ['买入', ' ']}).status_code == 400
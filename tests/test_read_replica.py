@@ -0,0 +1,94 @@
+"""
+只读副本路由测试模块
+
+此模块使用两个 SQLite 文件分别作为主库和只读副本（内容不同以区分查询来源），
+测试只读方法从副本读取、写入后本次请求和携带 Cookie 的后续请求从主库读取
+"""
+
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db, StockPosition
+from app.services.position import PositionService
+from app.utils.db_pool import configure_pool
+from app.utils.db_routing import STICKY_COOKIE, init_read_replicas
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+def _position(stock_code: str) -> StockPosition:
+    """构造一条持仓记录"""
+    return StockPosition(
+        stock_code=stock_code, stock_name='测试', total_volume=100, original_cost=10,
+        dynamic_cost=10, total_amount=1000, latest_price=10, market_value=1000
+    )
+
+
+def _create_app(tmp_path) -> Flask:
+    """创建主库和副本各有一条不同持仓的应用"""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={},
+        DB_READ_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replica.db'}"],
+        DB_REPLICA_STICKY_SECONDS=5
+    )
+    configure_pool(app)
+    db.init_app(app)
+    init_read_replicas(app)
+    service = PositionService()
+
+    @app.route('/positions')
+    def positions():
+        return jsonify(sorted(item['stock_code'] for item in service.get_all_positions(['stock_code'])))
+
+    @app.route('/positions/<stock_code>', methods=['POST'])
+    def add_position(stock_code):
+        db.session.add(_position(stock_code))
+        db.session.commit()
+        return jsonify(sorted(item['stock_code'] for item in service.get_all_positions(['stock_code'])))
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'connect', _register_collation)
+            db.metadata.create_all(engine)
+        db.session.add(_position('600000'))
+        db.session.commit()
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(StockPosition.__table__.insert(), [{
+                'stock_code': '000001', 'stock_name': '副本', 'total_volume': 100, 'original_cost': 10,
+                'dynamic_cost': 10, 'total_amount': 1000, 'latest_price': 10, 'market_value': 1000
+            }])
+    return app
+
+
+def test_read_replica_routing(tmp_path):
+    """测试只读方法从副本读取，写入后本次请求和携带 Cookie 的后续请求从主库读取"""
+    app = _create_app(tmp_path)
+    client = app.test_client()
+
+    assert client.get('/positions').get_json() == ['000001']
+
+    response = client.post('/positions/300750')
+    assert response.get_json() == ['300750', '600000']
+    assert STICKY_COOKIE in response.headers['Set-Cookie']
+
+    # 测试客户端保存了 Cookie，复制延迟内继续从主库读取
+    assert client.get('/positions').get_json() == ['300750', '600000']
+
+    client.delete_cookie(STICKY_COOKIE)
+    assert client.get('/positions').get_json() == ['000001']
+
+    # 后台任务（无请求上下文）的只读方法同样使用副本
+    with app.app_context():
+        assert [item['stock_code'] for item in PositionService().get_all_positions(['stock_code'])] == ['000001']
@@ -0,0 +1,115 @@
+"""
+规则解析器测试模块
+
+此模块使用 test_data/messages.txt 中的模板消息测试结构化策略文本的规则解析
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+from jsonschema import validate
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from ai_robot.rule_parser import RuleBasedParser
+
+MESSAGES_PATH = project_root / 'test_data' / 'messages.txt'
+
+
+def load_messages():
+    """按 "xxx策略：" 标题拆分测试消息"""
+    content = MESSAGES_PATH.read_text(encoding='utf-8')
+    return [item.strip() for item in re.split(r'\n(?=\S*策略：\n)', content) if item.strip()]
+
+
+@pytest.fixture(scope='module')
+def parser():
+    """创建规则解析器"""
+    return RuleBasedParser()
+
+
+@pytest.fixture(scope='module')
+def schema():
+    """获取AI处理器使用的JSON Schema"""
+    from ai_robot.base import BaseAIProcessor
+
+    return BaseAIProcessor.schema
+
+
+def test_parse_all_template_messages(parser, schema):
+    """测试所有模板消息都能被规则解析，且结果符合 Schema"""
+    messages = load_messages()
+    assert len(messages) == 10
+
+    for message in messages:
+        result = parser.parse(message)
+        assert result is not None, message
+        validate(instance=result, schema=schema)
+
+
+def test_parse_buy_message(parser):
+    """测试买入消息的字段提取"""
+    result = parser.parse(load_messages()[0])
+
+    assert result['stock_name'] == '平安银行'
+    assert result['stock_code'] == '000001'
+    assert result['action'] == 'buy'
+    assert result['position_ratio'] == 20
+    assert result['price_min'] == 12.5
+    assert result['price_max'] == 13.2
+    assert result['stop_loss_price'] == 11.8
+    assert result['take_profit_price'] == 14.5
+    assert result['reason'].startswith('股价突破60日均线')
+
+
+def test_parse_actions(parser):
+    """测试各类操作要求的映射"""
+    actions = [parser.parse(message)['action'] for message in load_messages()]
+    assert actions == ['buy', 'buy', 'sell', 'sell', 'add', 'add', 'trim', 'trim', 'hold', 'hold']
+
+
+def test_parse_hold_message(parser):
+    """测试持有操作的仓位为 0 且没有价格区间"""
+    result = parser.parse(load_messages()[8])
+
+    assert result['stock_name'] == '五粮液'
+    assert result['position_ratio'] == 0
+    assert result['price_min'] is None
+    assert result['price_max'] is None
+    assert result['stop_loss_price'] == 145
+    assert result['take_profit_price'] == 185
+
+
+def test_free_text_falls_back(parser):
+    """测试自由文本不走规则解析"""
+    text = "我想买入贵州茅台，价格在1500到1600之间，止盈价1700，止损价1450，使用10%的仓位"
+    assert parser.parse(text) is None
+
+
+def test_multiple_messages_fall_back(parser):
+    """测试包含多只股票的文本不走规则解析"""
+    messages = load_messages()
+    assert parser.parse('\n\n'.join(messages[:2])) is None
+
+
+def test_unknown_action_falls_back(parser):
+    """测试无法识别的操作要求交给 AI 处理"""
+    message = load_messages()[0].replace('**操作要求**：买入', '**操作要求**：逢低布局')
+    assert parser.parse(message) is None
+
+
+def test_clear_position_ratio(parser):
+    """测试清仓未给出建议数量时仓位为 100，建议数量中的清仓描述同样为 100"""
+    message = load_messages()[2]
+    cleared = re.sub(r'\*\*操作要求\*\*：卖出', '**操作要求**：清仓', message)
+    cleared = re.sub(r'\n[^\n]*\*\*建议数量\*\*[^\n]*', '', cleared)
+    result = parser.parse(cleared)
+    assert result['action'] == 'sell'
+    assert result['position_ratio'] == 100
+
+    message = re.sub(r'(\*\*建议数量\*\*：)[^\n]*', r'\1获利了结', message)
+    assert parser.parse(message)['position_ratio'] == 100
@@ -0,0 +1,153 @@
+"""
+序列化工具测试模块
+
+此模块测试时间格式化、批量序列化与 JSON 提供器的输出与原有实现一致，
+以及列表接口的 fields 字段投影（使用 SQLite，不依赖 MySQL）
+"""
+
+import json
+import sys
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import pytz
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.models import db, StockStrategy
+from app.routes import strategy_bp
+from app.utils import serializer
+from app.utils.serializer import FastJSONProvider, format_datetime, parse_fields, serialize_row, serialize_rows
+
+CN_TIMEZONE = pytz.timezone('Asia/Shanghai')
+
+
+def _baseline_format(value):
+    """原有 to_dict 中的时间格式化方式"""
+    return value.astimezone(CN_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _register_collation(dbapi_connection, connection_record):
+    """为 SQLite 注册模型中使用的 MySQL 排序规则"""
+    dbapi_connection.create_collation('utf8mb4_unicode_ci', lambda a, b: (a > b) - (a < b))
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """创建使用 SQLite 的应用"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'serializer.db'}"
+    db.init_app(app)
+    app.register_blueprint(strategy_bp, url_prefix='/api/v1')
+    with app.app_context():
+        event.listen(db.engine, 'connect', _register_collation)
+        # 只在当前应用的数据库建表（共享的 db 上可能注册了其他 bind 的表）
+        db.metadata.create_all(db.engine)
+        yield app
+
+
+def test_format_datetime_matches_baseline():
+    """测试带时区和不带时区的时间格式化结果与原有实现一致"""
+    values = [
+        datetime(2024, 1, 2, 3, 4, 5),
+        datetime(2024, 6, 30, 23, 59, 59, tzinfo=pytz.utc),
+        CN_TIMEZONE.localize(datetime(2024, 12, 31, 8, 0, 0)),
+    ]
+    for value in values:
+        assert format_datetime(value) == _baseline_format(value)
+    assert format_datetime(None) is None
+
+
+def test_serialize_rows_matches_to_dict(app):
+    """测试批量序列化结果与模型 to_dict 一致，指定字段时只输出这些字段"""
+    db.session.add_all([
+        StockStrategy(stock_name='贵州茅台', stock_code='600519', action='buy', position_ratio=10,
+                      price_min=1500, reason='估值回落'),
+        StockStrategy(stock_name='五粮液', stock_code='000858', action='sell', position_ratio=100),
+    ])
+    db.session.commit()
+    strategies = StockStrategy.query.order_by(StockStrategy.id).all()
+
+    rows = serialize_rows(strategies)
+    assert rows == [strategy.to_dict() for strategy in strategies]
+    assert rows[0]['created_at'] == _baseline_format(strategies[0].created_at)
+    assert serialize_row(strategies[1]) == strategies[1].to_dict()
+    assert serialize_row(None) is None
+
+    assert serialize_rows(strategies, ['stock_code', 'id']) == [
+        {'id': strategy.id, 'stock_code': strategy.stock_code} for strategy in strategies
+    ]
+    assert serialize_rows([]) == []
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_provider_matches_default(monkeypatch, use_orjson):
+    """测试 JSON 提供器（orjson 和标准库回退）的编码结果与 Flask 默认提供器一致，中文不转义"""
+    if not use_orjson:
+        monkeypatch.setattr(serializer, 'orjson', None)
+    payload = {
+        'code': 200,
+        'message': '获取成功',
+        'data': [{'id': 1, 'price': 1500.5, 'volume': Decimal('100.10'), 'active': True, 'remarks': None}],
+        'time': datetime(2024, 1, 2, 3, 4, 5),
+        'day': date(2024, 1, 2),
+        'token': uuid.UUID(int=1),
+    }
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    app.json = FastJSONProvider(app)
+    assert json.loads(app.json.dumps(payload)) == json.loads(default.dumps(payload))
+    assert '获取成功' in app.json.dumps(payload)
+
+    with app.app_context():
+        response = jsonify(payload)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == json.loads(default.dumps(payload))
+    assert '获取成功'.encode('utf-8') in response.get_data()
+
+
+def test_parse_fields():
+    """测试 fields 参数去重、忽略空白，未指定时返回 None，存在未知字段时抛出 ValueError"""
+    assert parse_fields(None, StockStrategy) is None
+    assert parse_fields(' ', StockStrategy) is None
+    assert parse_fields('id, stock_code,,id,action', StockStrategy) == ['id', 'stock_code', 'action']
+    with pytest.raises(ValueError, match='foo'):
+        parse_fields('id,foo', StockStrategy)
+
+
+def test_strategies_fields_projection(app):
+    """测试策略列表按 fields 只查询和返回指定字段，未知字段返回 400"""
+    db.session.add(StockStrategy(stock_name='贵州茅台', stock_code='600519', action='buy', position_ratio=10,
+                                 reason='估值回落'))
+    db.session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = app.test_client().get('/api/v1/strategies?fields=id,stock_code,action')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == [{'id': 1, 'stock_code': '600519', 'action': 'buy'}]
+    # 字段投影下推到 SELECT，未请求的大文本字段不被查询
+    select = next(statement for statement in statements if 'stock_strategies' in statement)
+    assert 'stock_code' in select and 'reason' not in select and 'other_conditions' not in select
+
+    response = app.test_client().get('/api/v1/strategies?fields=id,foo')
+    assert response.status_code == 400
+    assert 'foo' in response.get_json()['message']
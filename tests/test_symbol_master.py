@@ -0,0 +1,140 @@
+"""
+本地股票代码表测试模块
+
+此模块测试代码表只做精确匹配，前缀匹配仅在远程接口未命中且结果唯一时作为兜底，
+以及代码表生成脚本（模拟行情列表接口）
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from ai_robot import symbol_master as symbol_master_module
+from ai_robot.stub import StubAIProcessor
+from ai_robot.symbol_master import SymbolMaster
+from scripts import build_symbol_master
+
+
+@pytest.fixture()
+def master():
+    """加载默认代码表"""
+    master = SymbolMaster()
+    assert master.load() > 0
+    return master
+
+
+def test_lookup_exact_only(master):
+    """测试代码、名称、拼音首字母精确命中，名称前缀和部分代码不命中"""
+    assert master.lookup('000725') == ('000725', '京东方A')
+    assert master.lookup('京东方A') == ('000725', '京东方A')
+    assert master.lookup('zsyh') == ('600036', '招商银行')
+
+    assert master.lookup('京东') is None
+    assert master.lookup('6') is None
+    assert master.lookup('00072') is None
+    assert master.lookup('平安') is None
+
+
+def test_lookup_prefix_unambiguous(master):
+    """测试前缀兜底只返回唯一匹配，拒绝部分代码和单个字符"""
+    assert master.lookup_prefix('贵州') == ('600519', '贵州茅台')
+    assert master.lookup_prefix('6005') is None
+    assert master.lookup_prefix('京') is None
+
+    master.add('000026', '平安测试')
+    assert master.lookup_prefix('平安') is None
+
+
+def test_a_share_preferred_over_hk(master):
+    """测试A股与港股同名或拼音相同时，查询返回A股"""
+    assert master.lookup('招商银行') == ('600036', '招商银行')
+    assert master.lookup('ZSYH') == ('600036', '招商银行')
+    assert master.lookup_prefix('招商') == ('600036', '招商银行')
+    assert master.lookup('03968') == ('03968', '招商银行')
+    assert master.lookup('腾讯控股') == ('00700', '腾讯控股')
+
+
+def test_get_stock_info_prefers_remote(master, monkeypatch):
+    """测试本地未精确命中时先查询远程接口，远程未命中才使用唯一的前缀匹配"""
+    monkeypatch.setattr(symbol_master_module, '_symbol_master', master)
+    processor = StubAIProcessor(latency=0)
+
+    class _Response:
+        text = 'var suggestvalue="京东,11,jd,JD,京东集团;";'
+
+        def raise_for_status(self):
+            pass
+
+    requested = []
+
+    def fake_get(url, timeout):
+        requested.append(url)
+        return _Response()
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    assert processor.get_stock_info('京东') == ('jd', '京东集团')
+    assert len(requested) == 1
+
+    def failing_get(url, timeout):
+        raise requests.ConnectionError('网络不可用')
+
+    monkeypatch.setattr(requests, 'get', failing_get)
+    assert processor.get_stock_info('贵州') == ('600519', '贵州茅台')
+    assert processor.get_stock_info('6') is None
+
+
+def _fake_clist(pages):
+    """模拟行情列表接口：按市场筛选条件和页码返回数据"""
+    requested = []
+
+    class _Response:
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.payload
+
+    def fake_get(url, params, timeout):
+        requested.append((params['fs'], params['pn']))
+        market_pages = pages[params['fs']]
+        total = sum(len(page) for page in market_pages)
+        diff = market_pages[params['pn'] - 1] if params['pn'] <= len(market_pages) else []
+        return _Response({'data': {'total': total, 'diff': [{'f12': code, 'f14': name} for code, name in diff]}})
+
+    return fake_get, requested
+
+
+def test_build_symbol_master(tmp_path, monkeypatch):
+    """测试分页拉取各市场、保留已有拼音、记录过少时不覆盖代码表，生成的文件可以直接加载"""
+    filters = build_symbol_master.MARKET_FILTERS
+    fake_get, requested = _fake_clist({
+        filters['SH']: [[('600036', '招商银行'), ('600519', '贵州茅台')], [('688981', '中芯国际')]],
+        filters['SZ']: [[('000001', '平安银行'), ('000002', '-')]],
+        filters['HK']: [[('03968', '招商银行')]],
+    })
+    monkeypatch.setattr(requests, 'get', fake_get)
+    monkeypatch.setattr(build_symbol_master, 'lazy_pinyin', None)
+    output = tmp_path / 'stock_symbols.csv'
+    output.write_text('code,name,pinyin,market\n600519,贵州茅台,GZMT,SH\n', encoding='utf-8')
+
+    assert build_symbol_master.main(['--output', str(output), '--min-records', '10']) == 1
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 2
+
+    assert build_symbol_master.main(['--output', str(output), '--min-records', '5']) == 0
+    assert (filters['SH'], 2) in requested
+
+    master = SymbolMaster(output)
+    assert master.load() == 5
+    assert master.get_by_code('688981').market == 'SH'
+    assert master.lookup('GZMT') == ('600519', '贵州茅台')
+    assert master.lookup('招商银行') == ('600036', '招商银行')
+    assert master.get_by_code('000002') is None
@@ -0,0 +1,20 @@
+"""
+WSGI 入口模块
+
+生产环境通过 Gunicorn 加载此模块（配置见 gunicorn.conf.py）：
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+未指定 FLASK_CONFIG 时使用生产环境配置
+"""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent / '.env')
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+from app import create_app
+
+app = create_app()